@@ -47,7 +47,8 @@ class PeerWorkflowItemInline(admin.StackedInline):
 class PeerWorkflowAdmin(admin.ModelAdmin):
     list_display = (
         'id', 'student_id', 'item_id', 'course_id', 'submission_uuid',
-        'created_at', 'completed_at', 'grading_completed_at',
+        'created_at', 'completed_at', 'grading_completed_at', 'review_count',
+        'num_assessed', 'num_assessments_received',
     )
     search_fields = (
         'id',  'student_id', 'item_id', 'course_id', 'submission_uuid',
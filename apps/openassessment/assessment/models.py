@@ -10,17 +10,28 @@ need to then generate a matching migration for it using:
     ./manage.py schemamigration openassessment.assessment --auto
 
 """
-from collections import defaultdict
-from copy import deepcopy
+from collections import defaultdict, namedtuple
 from hashlib import sha1
 import json
 
-from django.core.cache import cache
 from django.db import models
 from django.utils.timezone import now
 from django.utils.translation import ugettext as _
 import math
 
+from submissions.caching import ImmutableCache
+
+# NumPy makes computing medians for a whole item much faster,
+# but it is optional: without it, we fall back to pure Python.
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# The scores of a set of completed assessments, by criterion.
+SCORES_BY_CRITERION_CACHE = ImmutableCache("assessment.scores_by_criterion")
+
 
 class InvalidOptionSelection(Exception):
     """
@@ -58,8 +69,7 @@ class Rubric(models.Model):
     @property
     def points_possible(self):
         """The total number of points that could be earned in this Rubric."""
-        criteria_points = [crit.points_possible for crit in self.criteria.all()]
-        return sum(criteria_points) if criteria_points else 0
+        return CompiledRubric.from_content_hash(self.content_hash).points_possible
 
     @staticmethod
     def content_hash_from_dict(rubric_dict):
@@ -73,7 +83,8 @@ class Rubric(models.Model):
         database, the child object needs to have the ID of the parent, meaning
         that Rubric would have to have already been created and persisted.
         """
-        rubric_dict = deepcopy(rubric_dict)
+        # We only remove top-level keys, so a shallow copy is enough.
+        rubric_dict = dict(rubric_dict)
 
         # Neither "id" nor "content_hash" would count towards calculating the
         # content_hash.
@@ -106,57 +117,28 @@ class Rubric(models.Model):
             InvalidOptionSelection: the selected options do not match the rubric.
 
         """
-        # Cache based on the content_hash, not the id. It's slightly safer, and
-        # we don't have to worry about invalidation of the cache while running
-        # tests.
-        rubric_criteria_dict_cache_key = (
-            "assessment.rubric_criteria_dict.{}".format(self.content_hash)
-        )
-
-        # Create a dict of dicts that maps:
-        # criterion names --> option names --> option ids
-        #
-        # If we've already generated one of these for this rubric, grab it from
-        # the cache instead of hitting the database again.
-        rubric_criteria_dict = cache.get(rubric_criteria_dict_cache_key)
-
-        if not rubric_criteria_dict:
-            rubric_criteria_dict = defaultdict(dict)
+        return set(self.options_ids_by_criterion(options_selected).values())
 
-            # Select all criteria and options for this rubric
-            # We use `select_related()` to minimize the number of database queries
-            rubric_options = CriterionOption.objects.filter(
-                criterion__rubric=self
-            ).select_related()
+    def options_ids_by_criterion(self, options_selected):
+        """Given a mapping of selected options, return the option ID for each criterion.
 
-            # Construct dictionaries for each option in the rubric
-            for option in rubric_options:
-                rubric_criteria_dict[option.criterion.name][option.name] = option.id
+        Args:
+            options_selected (dict): Mapping of criteria names to the names of
+                the option that was selected for that criterion.
 
-            # Save it in our cache
-            cache.set(rubric_criteria_dict_cache_key, rubric_criteria_dict)
+        Returns:
+            dict mapping criterion names to option ids
 
-        # Validate: are options selected for each criterion in the rubric?
-        if len(options_selected) != len(rubric_criteria_dict):
-            msg = _("Incorrect number of options for this rubric ({actual} instead of {expected})").format(
-                actual=len(options_selected), expected=len(rubric_criteria_dict))
-            raise InvalidOptionSelection(msg)
+        Examples:
+            >>> options_selected = {"secret": "yes", "safe": "no"}
+            >>> rubric.options_ids_by_criterion(options_selected)
+            {"secret": 10, "safe": 12}
 
-        # Look up each selected option
-        option_id_set = set()
-        for criterion_name, option_name in options_selected.iteritems():
-            if (criterion_name in rubric_criteria_dict and
-                option_name in rubric_criteria_dict[criterion_name]
-            ):
-                option_id = rubric_criteria_dict[criterion_name][option_name]
-                option_id_set.add(option_id)
-            else:
-                msg = _("{criterion}: {option} not found in rubric").format(
-                    criterion=criterion_name, option=option_name
-                )
-                raise InvalidOptionSelection(msg)
+        Raises:
+            InvalidOptionSelection: the selected options do not match the rubric.
 
-        return option_id_set
+        """
+        return CompiledRubric.from_content_hash(self.content_hash).options_ids_by_criterion(options_selected)
 
 
 class Criterion(models.Model):
@@ -229,6 +211,147 @@ class CriterionOption(models.Model):
         return repr(self)
 
 
+class CompiledRubric(namedtuple("CompiledRubric", [
+    "rubric_id", "content_hash", "criterion_names", "option_ids",
+    "option_points", "criterion_points_possible", "points_possible",
+])):
+    """The parts of a :class:`Rubric` we need to score assessments, in a compact form.
+
+    Rubrics never change once they are written, so this is built once for
+    each rubric and cached, first in a bounded cache in this process and
+    then in the Django cache, keyed by the rubric's content hash.
+
+    Fields:
+        rubric_id (int): The primary key of the `Rubric`.
+        content_hash (str): The content hash of the `Rubric`.
+        criterion_names (tuple): The names of the criteria, in order.
+        option_ids (dict): Criterion names --> option names --> option IDs.
+        option_points (dict): Criterion names --> option names --> points.
+        criterion_points_possible (dict): Criterion names --> the most points
+            that can be earned for the criterion.
+        points_possible (int): The most points that can be earned for the rubric.
+
+    The dictionaries are shared by every user of the cache, so never change them.
+    """
+    __slots__ = ()
+
+    # The number of rubrics kept in each process
+    LOCAL_CACHE_SIZE = 256
+
+    _cache = ImmutableCache(
+        "assessment.compiled_rubric", local_size=LOCAL_CACHE_SIZE, copy_values=False
+    )
+
+    @classmethod
+    def from_content_hash(cls, content_hash):
+        """Return the compiled rubric for the rubric with a content hash.
+
+        Args:
+            content_hash (str): The content hash of the rubric.
+
+        Returns:
+            CompiledRubric
+
+        Raises:
+            Rubric.DoesNotExist: There is no rubric with this content hash.
+
+        """
+        # A rubric without options is still being created, so we don't
+        # cache it until it is complete.
+        return cls._cache.get_or_compute(
+            content_hash, lambda: cls._compile(content_hash),
+            should_cache=lambda compiled: compiled.option_ids
+        )
+
+    @classmethod
+    def _compile(cls, content_hash):
+        """Build the compiled rubric for a content hash from the database."""
+        # Select all criteria and options for this rubric in one query
+        options = CriterionOption.objects.filter(
+            criterion__rubric__content_hash=content_hash
+        ).order_by('criterion__order_num', 'order_num').values_list(
+            'criterion__rubric_id', 'criterion__name', 'name', 'id', 'points'
+        )
+
+        rubric_id = None
+        criterion_names = []
+        option_ids = defaultdict(dict)
+        option_points = defaultdict(dict)
+        for rubric_id, criterion_name, option_name, option_id, points in options:
+            if criterion_name not in option_ids:
+                criterion_names.append(criterion_name)
+            option_ids[criterion_name][option_name] = option_id
+            option_points[criterion_name][option_name] = points
+
+        # The rubric still needs to exist if it has no options
+        if rubric_id is None:
+            rubric_id = Rubric.objects.get(content_hash=content_hash).id
+
+        criterion_points_possible = dict(
+            (criterion_name, max(points.values()))
+            for criterion_name, points in option_points.iteritems()
+        )
+        return cls(
+            rubric_id=rubric_id,
+            content_hash=content_hash,
+            criterion_names=tuple(criterion_names),
+            option_ids=dict(option_ids),
+            option_points=dict(option_points),
+            criterion_points_possible=criterion_points_possible,
+            points_possible=sum(criterion_points_possible.values()),
+        )
+
+    def rubric(self):
+        """Return a `Rubric` model for this rubric without querying the database."""
+        return Rubric(id=self.rubric_id, content_hash=self.content_hash)
+
+    def options_ids_by_criterion(self, options_selected):
+        """Given a mapping of selected options, return the option ID for each criterion.
+
+        See `Rubric.options_ids_by_criterion()`.
+
+        Raises:
+            InvalidOptionSelection: the selected options do not match the rubric.
+
+        """
+        # Validate: are options selected for each criterion in the rubric?
+        if len(options_selected) != len(self.option_ids):
+            msg = _("Incorrect number of options for this rubric ({actual} instead of {expected})").format(
+                actual=len(options_selected), expected=len(self.option_ids))
+            raise InvalidOptionSelection(msg)
+
+        # Look up each selected option
+        option_ids = dict()
+        for criterion_name, option_name in options_selected.iteritems():
+            if (criterion_name in self.option_ids and
+                option_name in self.option_ids[criterion_name]
+            ):
+                option_ids[criterion_name] = self.option_ids[criterion_name][option_name]
+            else:
+                msg = _("{criterion}: {option} not found in rubric").format(
+                    criterion=criterion_name, option=option_name
+                )
+                raise InvalidOptionSelection(msg)
+
+        return option_ids
+
+    def points_earned(self, options_selected):
+        """Return the points earned for a valid selection of options.
+
+        Args:
+            options_selected (dict): Mapping of criterion names to the names of
+                the options selected, already validated against the rubric.
+
+        Returns:
+            int
+
+        """
+        return sum(
+            self.option_points[criterion_name][option_name]
+            for criterion_name, option_name in options_selected.iteritems()
+        )
+
+
 class Assessment(models.Model):
     """An evaluation made against a particular Submission and Rubric.
 
@@ -248,16 +371,28 @@ class Assessment(models.Model):
 
     feedback = models.TextField(max_length=10000, default="", blank=True)
 
+    # Assessments never change once they are created, so their points are
+    # stored when they are created rather than added up from the parts and
+    # rubric on every access.  Assessments created before these columns were
+    # added have NULL values until the `backfill_assessment_points`
+    # management command has been run; until then, we calculate the points.
+    stored_points_earned = models.PositiveIntegerField(null=True, blank=True, db_column="points_earned")
+    stored_points_possible = models.PositiveIntegerField(null=True, blank=True, db_column="points_possible")
+
     class Meta:
         ordering = ["-scored_at", "-id"]
 
     @property
     def points_earned(self):
+        if self.stored_points_earned is not None:
+            return self.stored_points_earned
         parts = [part.points_earned for part in self.parts.all()]
         return sum(parts) if parts else 0
 
     @property
     def points_possible(self):
+        if self.stored_points_possible is not None:
+            return self.stored_points_possible
         return self.rubric.points_possible
 
     def to_float(self):
@@ -340,6 +475,77 @@ class Assessment(models.Model):
             )
         return median_score
 
+    @classmethod
+    def get_median_scores_by_key(cls, scores):
+        """Determine median scores for many groups of scores at once.
+
+        This is the batched version of `get_median_score_dict()`, used to
+        score a whole item without a query and a sort for each submission.
+        The medians are the same as `get_median_score()` gives, including
+        rounding the average of the two middle scores up.
+
+        Args:
+            scores (iterable): (key, criterion name, points) tuples, where the
+                key identifies the group (usually a submission).  This can be
+                a query iterator, since it is only read once.
+
+        Returns:
+            (dict): A dictionary mapping each key to a dictionary with
+                criterion name keys and median score values.
+
+        Examples:
+            >>> scores = [
+            >>>     ("abc123", "foo", 1), ("abc123", "foo", 2),
+            >>>     ("abc123", "bar", 6), ("def456", "foo", 5),
+            >>> ]
+            >>> Assessment.get_median_scores_by_key(scores)
+            {"abc123": {"foo": 2, "bar": 6}, "def456": {"foo": 5}}
+
+        """
+        if numpy is None:
+            return cls._get_median_scores_by_key_python(scores)
+
+        # Number each (key, criterion) group, and keep the points in an array
+        groups = dict()
+        group_ids = []
+        points = []
+        for key, criterion_name, criterion_points in scores:
+            group_ids.append(groups.setdefault((key, criterion_name), len(groups)))
+            points.append(criterion_points)
+        if not groups:
+            return dict()
+
+        group_ids = numpy.array(group_ids, dtype=numpy.int64)
+        points = numpy.array(points, dtype=numpy.int64)
+
+        # Sort by group, then by points, so each group's scores are
+        # contiguous and in order; the middle ones are then easy to find.
+        sorted_points = points[numpy.lexsort((points, group_ids))]
+        counts = numpy.bincount(group_ids, minlength=len(groups))
+        starts = numpy.cumsum(counts) - counts
+        lower = sorted_points[starts + (counts - 1) // 2]
+        upper = sorted_points[starts + counts // 2]
+
+        # For an odd count these are the same score; for an even count,
+        # floor division by two of the sum plus one rounds the average up.
+        medians = (lower + upper + 1) // 2
+
+        median_scores = defaultdict(dict)
+        for (key, criterion_name), group_id in groups.iteritems():
+            median_scores[key][criterion_name] = int(medians[group_id])
+        return dict(median_scores)
+
+    @classmethod
+    def _get_median_scores_by_key_python(cls, scores):
+        """Pure Python version of `get_median_scores_by_key()`."""
+        scores_by_key = defaultdict(lambda: defaultdict(list))
+        for key, criterion_name, criterion_points in scores:
+            scores_by_key[key][criterion_name].append(criterion_points)
+        return dict(
+            (key, cls.get_median_score_dict(scores_dict))
+            for key, scores_dict in scores_by_key.iteritems()
+        )
+
     @classmethod
     def scores_by_criterion(cls, assessments):
         """Create a dictionary of lists for scores associated with criterion
@@ -367,23 +573,22 @@ class Assessment(models.Model):
         if not assessments:
             return []
 
-        # Generate a cache key that represents all the assessments we're being
-        # asked to grab scores from (comma separated list of assessment IDs)
-        cache_key = "assessments.scores_by_criterion.{}".format(
-            ",".join(str(assessment.id) for assessment in assessments)
+        # The scores are cached for this set of assessments, in any order
+        assessment_ids = tuple(sorted(assessment.id for assessment in assessments))
+        return SCORES_BY_CRITERION_CACHE.get_or_compute(
+            assessment_ids, lambda: cls._scores_by_criterion(assessment_ids)
         )
-        scores = cache.get(cache_key)
-        if scores:
-            return scores
 
+    @classmethod
+    def _scores_by_criterion(cls, assessment_ids):
+        """Load the scores for `scores_by_criterion` from the database in one query."""
         scores = defaultdict(list)
-        for assessment in assessments:
-            for part in assessment.parts.all().select_related("option__criterion"):
-                criterion_name = part.option.criterion.name
-                scores[criterion_name].append(part.option.points)
-
-        cache.set(cache_key, scores)
-        return scores
+        parts = AssessmentPart.objects.filter(
+            assessment__in=assessment_ids
+        ).order_by('assessment', 'id').values_list('option__criterion__name', 'option__points')
+        for criterion_name, points in parts:
+            scores[criterion_name].append(points)
+        return dict(scores)
 
 
 class AssessmentPart(models.Model):
@@ -423,7 +628,9 @@ class AssessmentPart(models.Model):
 
         Args:
             assessment (Assessment): The assessment model we're adding parts to.
-            option_ids (list of int): List of primary keys for options the user selected.
+            option_ids (dict): Mapping of criterion names to the primary keys
+                of the options the user selected, as returned by
+                `Rubric.options_ids_by_criterion()`.
 
         Kwargs:
             criterion_feedback (dict): Dictionary mapping criterion names
@@ -435,18 +642,18 @@ class AssessmentPart(models.Model):
             None
 
         """
+        criterion_feedback = criterion_feedback or dict()
+
+        # The feedback is written along with the parts, so this is a single query
         cls.objects.bulk_create([
-            cls(assessment=assessment, option_id=option_id)
-            for option_id in option_ids
+            cls(
+                assessment=assessment,
+                option_id=option_id,
+                feedback=criterion_feedback.get(criterion_name, u"")[0:cls.MAX_FEEDBACK_SIZE],
+            )
+            for criterion_name, option_id in option_ids.iteritems()
         ])
 
-        if criterion_feedback is not None:
-            for criterion_name, feedback in criterion_feedback.iteritems():
-                feedback = feedback[0:cls.MAX_FEEDBACK_SIZE]
-                assessment.parts.filter(
-                    option__criterion__name=criterion_name
-                ).update(feedback=feedback)
-
 
 class AssessmentFeedbackOption(models.Model):
     """
@@ -534,6 +741,23 @@ class PeerWorkflow(models.Model):
     completed_at = models.DateTimeField(null=True, db_index=True)
     grading_completed_at = models.DateTimeField(null=True, db_index=True)
 
+    # Number of completed assessments plus open leases on this submission.
+    # This is the peer assessment queue: the peer API keeps it current when
+    # workflow items are handed out, completed, or expire, so that choosing
+    # the next submission to review never has to count workflow items.
+    # Use the `rebuild_peer_queue` management command to recalculate it.
+    # Over grading relies on an index over (course_id, item_id, review_count, id),
+    # which is created by a South migration.
+    review_count = models.PositiveIntegerField(default=0, db_index=True)
+
+    # Number of peer submissions this student has assessed, and number of
+    # completed assessments of this student's submission.  These are updated
+    # when an assessment is created, so that checking the workflow
+    # requirements never has to count workflow items.
+    # The `rebuild_peer_queue` management command also recalculates these.
+    num_assessed = models.PositiveIntegerField(default=0)
+    num_assessments_received = models.PositiveIntegerField(default=0)
+
     class Meta:
         ordering = ["created_at", "id"]
 
@@ -565,14 +789,29 @@ class PeerWorkflowItem(models.Model):
     # This WorkflowItem was used to determine the final score for the Workflow.
     scored = models.BooleanField(default=False)
 
+    # This WorkflowItem is an open lease counted in the author's `review_count`.
+    # Cleared when the assessment is completed, or when the lease expires and
+    # is released by the `expire_peer_leases` management command.
+    leased = models.BooleanField(default=False, db_index=True)
+    lease_expires_at = models.DateTimeField(null=True, db_index=True)
+
+    # This WorkflowItem was created by `assign_peer_reviews` and has not yet
+    # been handed out to the scorer.  It is counted in the author's
+    # `review_count` and becomes a lease when the scorer requests a submission.
+    preassigned = models.BooleanField(default=False, db_index=True)
+
     @classmethod
     def get_scored_assessments(cls, submission_uuid):
+        return cls.get_scored_assessments_for_submissions([submission_uuid])
+
+    @classmethod
+    def get_scored_assessments_for_submissions(cls, submission_uuids):
         return Assessment.objects.filter(
-            pk__in=[
-                item.assessment.pk for item in PeerWorkflowItem.objects.filter(
-                    submission_uuid=submission_uuid, scored=True
-                )
-            ]
+            pk__in=list(
+                PeerWorkflowItem.objects.filter(
+                    submission_uuid__in=submission_uuids, scored=True
+                ).values_list('assessment', flat=True)
+            )
         )
 
     class Meta:
@@ -583,7 +822,7 @@ class PeerWorkflowItem(models.Model):
             "PeerWorkflowItem(scorer={0.scorer}, author={0.author}, "
             "submission_uuid={0.submission_uuid}, "
             "started_at={0.started_at}, assessment={0.assessment}, "
-            "scored={0.scored})"
+            "scored={0.scored}, lease_expires_at={0.lease_expires_at})"
         ).format(self)
 
     def __unicode__(self):
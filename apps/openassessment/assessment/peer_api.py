@@ -5,29 +5,42 @@ the workflow for a given submission.
 
 """
 import copy
+from collections import defaultdict
 import logging
 from datetime import timedelta
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
 from django.utils import timezone
 from django.utils.translation import ugettext as _
-from django.db import DatabaseError
+from django.db import DatabaseError, connection, transaction
+from django.db.models import F, Q
 from dogapi import dog_stats_api
 import random
 
 from openassessment.assessment.models import (
-    Assessment, AssessmentFeedback, AssessmentPart,
-    InvalidOptionSelection, PeerWorkflow, PeerWorkflowItem,
+    Assessment, AssessmentFeedback, AssessmentPart, CompiledRubric,
+    InvalidOptionSelection, PeerWorkflow, PeerWorkflowItem, Rubric,
 )
+from openassessment.assessment.signals import assessment_created
 from openassessment.assessment.serializers import (
-    AssessmentSerializer, AssessmentFeedbackSerializer, RubricSerializer,
-    full_assessment_dict, rubric_from_dict, serialize_assessments,
+    AssessmentFeedbackSerializer, RubricSerializer,
+    full_assessment_dict_from_options, full_assessment_dicts, rubric_from_dict,
 )
 from submissions import api as sub_api
+from submissions.caching import request_cached, clears_request_cache
 
 logger = logging.getLogger("openassessment.assessment.peer_api")
 
 PEER_TYPE = "PE"
+
+# How long a scorer can hold on to a submission before it is returned to
+# the peer queue by `release_expired_leases()`.
 TIME_LIMIT = timedelta(hours=8)
 
+# How long a submission pre-assigned by `assign_peer_reviews()` is kept for
+# the scorer before it, too, is returned to the peer queue.
+PREASSIGNMENT_TIME_LIMIT = timedelta(days=7)
+
 
 class PeerAssessmentError(Exception):
     """Generic Peer Assessment Error
@@ -77,7 +90,7 @@ def is_complete(submission_uuid, requirements):
         workflow = PeerWorkflow.objects.get(submission_uuid=submission_uuid)
         if workflow.completed_at is not None:
             return True
-        elif _num_peers_graded(workflow) >= requirements["must_grade"]:
+        elif workflow.num_assessed >= requirements["must_grade"]:
             workflow.completed_at = timezone.now()
             workflow.save()
             return True
@@ -86,6 +99,46 @@ def is_complete(submission_uuid, requirements):
         return False
 
 
+def get_complete_submission_uuids(submission_uuids, requirements):
+    """
+    Find which of many submissions have completed the peer step.
+
+    This gives the same answer as calling `is_complete()` for each
+    submission, with a single query.  Unlike `is_complete()`, it does
+    not record when the step was completed.
+
+    Args:
+        submission_uuids (list of str): The UUIDs of the submissions.
+        requirements (dict): Dictionary with the key "must_grade", as for
+            `is_complete()`.
+
+    Returns:
+        set of the UUIDs of the submissions that have completed the peer step.
+
+    Raises:
+        PeerAssessmentInternalError: Raised when there is an internal error
+            while reading the peer workflows.
+
+    """
+    if not submission_uuids:
+        return set()
+
+    try:
+        return set(
+            PeerWorkflow.objects.filter(
+                submission_uuid__in=submission_uuids
+            ).filter(
+                Q(completed_at__isnull=False) | Q(num_assessed__gte=requirements["must_grade"])
+            ).values_list('submission_uuid', flat=True)
+        )
+    except DatabaseError:
+        error_message = _(u"Error checking whether {} submissions completed the peer step".format(
+            len(submission_uuids)
+        ))
+        logger.exception(error_message)
+        raise PeerAssessmentInternalError(error_message)
+
+
 def get_score(submission_uuid, requirements):
     """
     Retrieve a score for a submission if requirements have been satisfied.
@@ -104,37 +157,135 @@ def get_score(submission_uuid, requirements):
 
     workflow = PeerWorkflow.objects.get(submission_uuid=submission_uuid)
 
+    submission_finished = workflow.num_assessments_received >= requirements["must_be_graded_by"]
+    if not submission_finished:
+        return None
+
     # This query will use the ordering defined by the assessment model
     # (descending scored_at, then descending id)
-    items = workflow.graded_by.filter(
+    items = list(workflow.graded_by.filter(
         assessment__submission_uuid=submission_uuid,
         assessment__score_type=PEER_TYPE
-    ).order_by('assessment')
+    ).select_related('assessment__rubric').order_by('assessment'))
+
+    # Mark the most recent assessments as scored.  We cannot use update()
+    # after taking a slice, and selecting the first n assessments in a
+    # subquery would generate a LIMIT in a subquery, which is not supported
+    # by some versions of MySQL.  So we update the items we already have by ID.
+    num_scored = requirements["must_be_graded_by"]
+    newly_scored = [item.id for item in items[:num_scored] if not item.scored]
+    if newly_scored:
+        PeerWorkflowItem.objects.filter(id__in=newly_scored).update(scored=True)
+
+    # The median uses every scored assessment, including any scored before
+    scored_assessments = [
+        item.assessment for num, item in enumerate(items)
+        if item.scored or num < num_scored
+    ]
+    median_scores = Assessment.get_median_score_dict(
+        Assessment.scores_by_criterion(scored_assessments)
+    )
+    return {
+        "points_earned": sum(median_scores.values()),
+        "points_possible": items[0].assessment.rubric.points_possible,
+    }
 
-    submission_finished = items.count() >= requirements["must_be_graded_by"]
-    if not submission_finished:
-        return None
 
-    # Unfortunately, we cannot use update() after taking a slice,
-    # so we need to update the and save the items individually.
-    # One might be tempted to first query for the first n assessments,
-    # then select items that have those assessments.
-    # However, this generates a SQL query with a LIMIT in a subquery,
-    # which is not supported by some versions of MySQL.
-    # Although this approach generates more database queries, the number is likely to
-    # be relatively small (at least 1 and very likely less than 5).
-    for scored_item in items[:requirements["must_be_graded_by"]]:
-        scored_item.scored = True
-        scored_item.save()
+def get_scores(submission_uuids, requirements):
+    """
+    Retrieve the scores for many submissions at once.
 
-    return {
-        "points_earned": sum(
-            get_assessment_median_scores(submission_uuid).values()
-        ),
-        "points_possible": items[0].assessment.points_possible,
-    }
+    This gives the same scores as calling `get_score()` for each submission,
+    including marking the assessments used as scored, but takes a fixed
+    number of queries however many submissions there are.
+
+    Args:
+        submission_uuids (list of str): The UUIDs of the submissions.
+        requirements (dict): Description of requirements for receiving a score,
+            as for `get_score()`.
 
+    Returns:
+        dict mapping the UUIDs of the submissions that can be scored to
+        dicts with keys "points_earned" and "points_possible".  Submissions
+        that do not meet the requirements are left out.
 
+    Raises:
+        PeerAssessmentInternalError: Raised when there is an internal error
+            while retrieving the scores.
+
+    Examples:
+        >>> get_scores(["abc123", "def456"], {"must_grade": 3, "must_be_graded_by": 3})
+        {"abc123": {"points_earned": 6, "points_possible": 14}}
+
+    """
+    try:
+        # As in `is_complete()`, a workflow that was marked complete stays
+        # complete even if the requirements have since changed.
+        submissions_by_workflow = dict(
+            PeerWorkflow.objects.filter(
+                submission_uuid__in=submission_uuids,
+                num_assessments_received__gte=requirements["must_be_graded_by"],
+            ).filter(
+                Q(completed_at__isnull=False) | Q(num_assessed__gte=requirements["must_grade"])
+            ).values_list('id', 'submission_uuid')
+        )
+        if not submissions_by_workflow:
+            return dict()
+
+        items = PeerWorkflowItem.objects.filter(
+            author__in=submissions_by_workflow.keys(),
+            assessment__isnull=False,
+            assessment__score_type=PEER_TYPE,
+        ).order_by().values_list(
+            'id', 'author_id', 'scored', 'assessment__scored_at', 'assessment_id', 'assessment__rubric_id'
+        )
+        items_by_author = defaultdict(list)
+        for item in items:
+            items_by_author[item[1]].append(item)
+
+        # As in `get_score()`, the most recent assessments are marked as
+        # scored, and the score uses the rubric of the latest one.
+        newly_scored = []
+        rubric_by_author = dict()
+        for author_id, author_items in items_by_author.iteritems():
+            author_items.sort(key=lambda item: (item[3], item[4]), reverse=True)
+            rubric_by_author[author_id] = author_items[0][5]
+            newly_scored.extend(
+                item[0] for item in author_items[:requirements["must_be_graded_by"]]
+                if not item[2]
+            )
+        if newly_scored:
+            PeerWorkflowItem.objects.filter(id__in=newly_scored).update(scored=True)
+
+        # Take the median of the points of every scored assessment, by criterion
+        parts = PeerWorkflowItem.objects.filter(
+            author__in=items_by_author.keys(), scored=True
+        ).order_by().values_list(
+            'author_id', 'assessment__parts__option__criterion__name', 'assessment__parts__option__points'
+        )
+        median_scores_by_author = Assessment.get_median_scores_by_key(parts)
+
+        points_possible = dict(
+            (rubric_id, CompiledRubric.from_content_hash(content_hash).points_possible)
+            for rubric_id, content_hash in Rubric.objects.filter(
+                id__in=set(rubric_by_author.values())
+            ).values_list('id', 'content_hash')
+        )
+
+        scores = dict()
+        for author_id, median_scores in median_scores_by_author.iteritems():
+            scores[submissions_by_workflow[author_id]] = {
+                "points_earned": sum(median_scores.values()),
+                "points_possible": points_possible[rubric_by_author[author_id]],
+            }
+        return scores
+    except DatabaseError:
+        error_message = _(u"Error getting the scores for submissions {}".format(submission_uuids))
+        logger.exception(error_message)
+        raise PeerAssessmentInternalError(error_message)
+
+
+@clears_request_cache
 def create_assessment(
         scorer_submission_uuid,
         scorer_id,
@@ -143,7 +294,8 @@ def create_assessment(
         overall_feedback,
         rubric_dict,
         num_required_grades,
-        scored_at=None):
+        scored_at=None,
+        rubric_content_hash=None):
     """Creates an assessment on the given submission.
 
     Assessments are created based on feedback associated with a particular
@@ -171,6 +323,8 @@ def create_assessment(
         scored_at (datetime): Optional argument to override the time in which
             the assessment took place. If not specified, scored_at is set to
             now.
+        rubric_content_hash (str): The content hash of `rubric_dict`, if it
+            is already known, so that the rubric need not be hashed again.
 
     Returns:
         dict: the Assessment model, serialized as a dict.
@@ -189,61 +343,72 @@ def create_assessment(
         >>> create_assessment("1", "Tim", options_selected, criterion_feedback, feedback, rubric_dict)
     """
     try:
-        rubric = rubric_from_dict(rubric_dict)
+        rubric = rubric_from_dict(rubric_dict, content_hash=rubric_content_hash)
+        compiled_rubric = CompiledRubric.from_content_hash(rubric.content_hash)
 
         # Validate that the selected options matched the rubric
         # and raise an error if this is not the case
         try:
-            option_ids = rubric.options_ids(options_selected)
+            option_ids = compiled_rubric.options_ids_by_criterion(options_selected)
         except InvalidOptionSelection as ex:
             msg = _("Selected options do not match the rubric: {error}").format(error=ex.message)
             raise PeerAssessmentRequestError(msg)
 
-        scorer_workflow = PeerWorkflow.objects.get(submission_uuid=scorer_submission_uuid)
-
-        peer_workflow_item = _get_latest_open_workflow_item(scorer_workflow)
-        if peer_workflow_item is None:
-            message = _(
-                u"There are no open assessments associated with the scorer's "
-                u"submission UUID {}.".format(scorer_submission_uuid)
+        # Everything we write is committed together.  The scorer's open
+        # workflow item is locked, so that two requests submitting the same
+        # assessment can't both close it.
+        with transaction.commit_on_success():
+            peer_workflow_item = _get_open_workflow_item_for_update(scorer_submission_uuid)
+
+            assessment = Assessment(
+                rubric=rubric,
+                scorer_id=scorer_id,
+                submission_uuid=peer_workflow_item.submission_uuid,
+                score_type=PEER_TYPE,
+                feedback=overall_feedback[0:Assessment.MAXSIZE],
+                stored_points_earned=compiled_rubric.points_earned(options_selected),
+                stored_points_possible=compiled_rubric.points_possible,
             )
-            logger.error(message)
-            raise PeerAssessmentWorkflowError(message)
-
-        peer_submission_uuid = peer_workflow_item.author.submission_uuid
-        peer_assessment = {
-            "rubric": rubric.id,
-            "scorer_id": scorer_id,
-            "submission_uuid": peer_submission_uuid,
-            "score_type": PEER_TYPE,
-            "feedback": overall_feedback[0:Assessment.MAXSIZE],
-        }
+            if scored_at is not None:
+                assessment.scored_at = scored_at
 
-        if scored_at is not None:
-            peer_assessment["scored_at"] = scored_at
+            # We validate the fields ourselves rather than using the
+            # django-rest-framework serializer, which queries for the rubric.
+            try:
+                assessment.full_clean(exclude=['rubric'])
+            except ValidationError as ex:
+                raise PeerAssessmentRequestError(ex.message_dict)
+            assessment.save()
 
-        peer_serializer = AssessmentSerializer(data=peer_assessment)
+            AssessmentPart.add_to_assessment(assessment, option_ids, criterion_feedback=criterion_feedback)
 
-        if not peer_serializer.is_valid():
-            raise PeerAssessmentRequestError(peer_serializer.errors)
+            # Close the active assessment
+            _close_workflow_item(peer_workflow_item, assessment, num_required_grades)
 
-        assessment = peer_serializer.save()
+        cache.delete(_prefetched_submission_cache_key(scorer_submission_uuid))
 
-        # We do this to do a run around django-rest-framework serializer
-        # validation, which would otherwise require two DB queries per
-        # option to do validation. We already validated these options above.
-        AssessmentPart.add_to_assessment(assessment, option_ids, criterion_feedback=criterion_feedback)
+        # The scorer may have finished the peer step, and the author
+        # may have received enough assessments to be scored.
+        assessment_created.send(
+            sender=Assessment,
+            submission_uuids=[scorer_submission_uuid, assessment.submission_uuid]
+        )
 
-        # Close the active assessment
-        _close_active_assessment(scorer_workflow, peer_submission_uuid, assessment, num_required_grades)
-        assessment_dict = full_assessment_dict(assessment)
-        _log_assessment(assessment, scorer_workflow)
+        # The parts we just wrote are described by the (cached) rubric,
+        # so we don't need to read them back.
+        assessment_dict = full_assessment_dict_from_options(
+            assessment,
+            RubricSerializer.serialized_from_cache(rubric),
+            options_selected,
+            criterion_feedback
+        )
+        _log_assessment(assessment, assessment_dict, peer_workflow_item)
 
         return assessment_dict
     except DatabaseError:
         error_message = _(
-            u"An error occurred while creating assessment {} by: {}"
-            .format(assessment_dict, scorer_id)
+            u"An error occurred while creating an assessment for submission {} by: {}"
+            .format(scorer_submission_uuid, scorer_id)
         )
         logger.exception(error_message)
         raise PeerAssessmentInternalError(error_message)
@@ -256,6 +421,7 @@ def create_assessment(
         raise PeerAssessmentWorkflowError(message)
 
 
+@request_cached()
 def get_rubric_max_scores(submission_uuid):
     """Gets the maximum possible value for each criterion option
 
@@ -281,11 +447,8 @@ def get_rubric_max_scores(submission_uuid):
             return None
 
         assessment = assessments[0]
-        rubric_dict = RubricSerializer.serialized_from_cache(assessment.rubric)
-        return {
-            criterion["name"]: criterion["points_possible"]
-            for criterion in rubric_dict["criteria"]
-        }
+        rubric = CompiledRubric.from_content_hash(assessment.rubric.content_hash)
+        return dict(rubric.criterion_points_possible)
     except DatabaseError:
         error_message = _(
             u"Error getting rubric options max scores for submission uuid "
@@ -295,6 +458,7 @@ def get_rubric_max_scores(submission_uuid):
         raise PeerAssessmentInternalError(error_message)
 
 
+@request_cached()
 def get_assessment_median_scores(submission_uuid):
     """Get the median score for each rubric criterion
 
@@ -321,7 +485,7 @@ def get_assessment_median_scores(submission_uuid):
     """
     try:
         workflow = PeerWorkflow.objects.get(submission_uuid=submission_uuid)
-        items = workflow.graded_by.filter(scored=True)
+        items = workflow.graded_by.filter(scored=True).select_related('assessment')
         assessments = [item.assessment for item in items]
         scores = Assessment.scores_by_criterion(assessments)
         return Assessment.get_median_score_dict(scores)
@@ -331,6 +495,51 @@ def get_assessment_median_scores(submission_uuid):
         raise PeerAssessmentInternalError(error_message)
 
 
+def get_median_scores_for_item(course_id, item_id):
+    """Get the median score for each rubric criterion for a whole item
+
+    This gives the same medians as calling `get_assessment_median_scores()`
+    for every submission to the item, but reads the scores of all the
+    assessments in a single query, for grade exports and rescoring.
+    Submissions without any scored assessments are left out.
+
+    Args:
+        course_id (str): The course the item is in.
+        item_id (str): The item whose submissions are assessed.
+
+    Returns:
+        (dict): A dictionary mapping submission UUIDs to dictionaries of
+            rubric criterion names, with a median score of the peer assessments.
+
+    Raises:
+        PeerAssessmentInternalError: If any error occurs while retrieving
+            information to form the median scores, an error is raised.
+
+    Examples:
+        >>> get_median_scores_for_item("ora2/1/1", "peer-assessment-problem")
+        {"abc123": {"clarity": 2, "accuracy": 1}}
+
+    """
+    try:
+        parts = PeerWorkflowItem.objects.filter(
+            author__course_id=course_id,
+            author__item_id=item_id,
+            scored=True,
+        ).order_by().values_list(
+            'author__submission_uuid',
+            'assessment__parts__option__criterion__name',
+            'assessment__parts__option__points',
+        ).iterator()
+        return Assessment.get_median_scores_by_key(parts)
+    except DatabaseError:
+        error_message = _(
+            u"Error getting assessment median scores for item {} in course {}".format(item_id, course_id)
+        )
+        logger.exception(error_message)
+        raise PeerAssessmentInternalError(error_message)
+
+
+@request_cached()
 def has_finished_required_evaluating(submission_uuid, required_assessments):
     """Check if a student still needs to evaluate more submissions
 
@@ -366,11 +575,12 @@ def has_finished_required_evaluating(submission_uuid, required_assessments):
     done = False
     peers_graded = 0
     if workflow:
-        peers_graded = _num_peers_graded(workflow)
+        peers_graded = workflow.num_assessed
         done = (peers_graded >= required_assessments)
     return done, peers_graded
 
 
+@request_cached()
 def get_assessments(submission_uuid, scored_only=True, limit=None):
     """Retrieve the assessments for a submission.
 
@@ -427,7 +637,7 @@ def get_assessments(submission_uuid, scored_only=True, limit=None):
                 submission_uuid=submission_uuid,
                 score_type=PEER_TYPE
             )[:limit]
-        return serialize_assessments(assessments)
+        return full_assessment_dicts(assessments)
     except DatabaseError:
         error_message = _(
             u"Error getting assessments for submission {}".format(submission_uuid)
@@ -436,6 +646,57 @@ def get_assessments(submission_uuid, scored_only=True, limit=None):
         raise PeerAssessmentInternalError(error_message)
 
 
+def get_scored_assessments_for_submissions(submission_uuids):
+    """
+    Retrieve the assessments used to score many submissions at once.
+
+    This gives the same assessments as calling `get_assessments()` with
+    `scored_only=True` for each submission, but takes a fixed number of
+    queries however many submissions there are.
+
+    Args:
+        submission_uuids (list of str): The UUIDs of the submissions.
+
+    Returns:
+        dict mapping the UUIDs of the submissions that have scored
+        assessments to lists of assessment dicts, as returned by
+        `get_assessments()`.  Submissions without scored assessments
+        are left out.
+
+    Raises:
+        PeerAssessmentInternalError: Raised when there is an internal error
+            while retrieving the assessments.
+
+    Examples:
+        >>> get_scored_assessments_for_submissions(["abc123", "def456"])
+        {
+            "abc123": [
+                {
+                    'points_earned': 6,
+                    'points_possible': 12,
+                    'scored_at': datetime.datetime(2014, 1, 29, 17, 14, 52, 649284 tzinfo=<UTC>),
+                    'scorer': u"Tim",
+                    'feedback': u'Your submission was thrilling.'
+                }
+            ]
+        }
+
+    """
+    try:
+        assessments = PeerWorkflowItem.get_scored_assessments_for_submissions(submission_uuids)
+        assessments_by_submission = defaultdict(list)
+        for assessment_dict in full_assessment_dicts(assessments):
+            assessments_by_submission[assessment_dict["submission_uuid"]].append(assessment_dict)
+        return dict(assessments_by_submission)
+    except DatabaseError:
+        error_message = _(
+            u"Error getting the scored assessments for submissions {}".format(submission_uuids)
+        )
+        logger.exception(error_message)
+        raise PeerAssessmentInternalError(error_message)
+
+
+@clears_request_cache
 def get_submission_to_assess(
         submission_uuid,
         graded_by,
@@ -526,6 +787,242 @@ def get_submission_to_assess(
         return None
 
 
+@clears_request_cache
+def prefetch_submission_to_assess(submission_uuid, graded_by, over_grading=False):
+    """Get the next submission to peer evaluate ahead of time.
+
+    Hands out the next submission exactly as `get_submission_to_assess` does,
+    and caches it so that the next time the student's peer step is rendered,
+    `get_prefetched_submission` can return it without running the peer queue.
+    The cached submission expires with its lease, and is cleared when the
+    student creates an assessment.
+
+    Args:
+        submission_uuid (str): The submission UUID from the student
+            requesting a submission for assessment.
+        graded_by (int): The number of assessments a submission
+            requires before it has completed the peer assessment process.
+        over_grading (bool): Allows over grading to be performed if no submission
+            requires assessments. Defaults to False.
+
+    Returns:
+        dict: The peer submission for assessment, or None.
+
+    Raises:
+        PeerAssessmentInternalError: Raised when there is an internal error
+            retrieving peer workflow information.
+        PeerAssessmentWorkflowError: Raised when the student item is not in
+            the proper workflow state to retrieve a peer submission.
+
+    Examples:
+        >>> prefetch_submission_to_assess("abc123", 3, True)
+        {
+            'student_item': 2,
+            'attempt_number': 1,
+            'submitted_at': datetime.datetime(2014, 1, 29, 23, 14, 52, 649284, tzinfo=<UTC>),
+            'created_at': datetime.datetime(2014, 1, 29, 17, 14, 52, 668850, tzinfo=<UTC>),
+            'answer': u'The answer is 42.'
+        }
+
+    """
+    peer_submission = get_submission_to_assess(submission_uuid, graded_by, over_grading)
+    cache_key = _prefetched_submission_cache_key(submission_uuid)
+    if peer_submission:
+        cache.set(cache_key, peer_submission, int(TIME_LIMIT.total_seconds()))
+    else:
+        cache.delete(cache_key)
+    return peer_submission
+
+
+def get_prefetched_submission(submission_uuid):
+    """Get the submission prefetched for a student to peer evaluate.
+
+    Args:
+        submission_uuid (str): The submission UUID of the student who
+            will assess the prefetched submission.
+
+    Returns:
+        dict: The peer submission returned by the last call to
+            `prefetch_submission_to_assess`, or None if there isn't one,
+            the lease on it has expired, or the student has assessed it.
+
+    Examples:
+        >>> get_prefetched_submission("abc123")
+        {
+            'student_item': 2,
+            'attempt_number': 1,
+            'submitted_at': datetime.datetime(2014, 1, 29, 23, 14, 52, 649284, tzinfo=<UTC>),
+            'created_at': datetime.datetime(2014, 1, 29, 17, 14, 52, 668850, tzinfo=<UTC>),
+            'answer': u'The answer is 42.'
+        }
+
+    """
+    return cache.get(_prefetched_submission_cache_key(submission_uuid))
+
+
+@clears_request_cache
+def get_submissions_to_assess(submission_uuids, graded_by):
+    """Get submissions to peer evaluate for many students at once.
+
+    Assigns each student the submission that `get_submission_to_assess` would
+    give them, following the same rules: students are never given their own
+    submission or one they have already assessed, a student with an open
+    or pre-assigned assessment is given that, and no submission is handed out
+    more than `graded_by` times.  This is intended for handing out reviews to
+    a whole cohort at once (for example, when setting up load tests); it
+    does not over grade.
+
+    Rather than running the peer queue query once per student, this loads the
+    queue for each item once, assigns submissions in memory, and creates the
+    workflow items with a single bulk insert.
+
+    Args:
+        submission_uuids (list of str): The submission UUIDs of the students
+            requesting submissions for assessment.
+        graded_by (int): The number of assessments a submission
+            requires before it has completed the peer assessment process.
+
+    Returns:
+        dict: Mapping of each student's submission UUID to the UUID of the
+            submission they should assess, or None if there is nothing
+            left for them to assess.
+
+    Raises:
+        PeerAssessmentWorkflowError: Raised when one of the students does not
+            have a peer workflow.
+        PeerAssessmentInternalError: Raised when there is an internal error
+            retrieving or creating the peer workflow information.
+
+    Examples:
+        >>> get_submissions_to_assess(["abc123", "def456"], 3)
+        {"abc123": "def456", "def456": "abc123"}
+
+    """
+    try:
+        scorers = list(PeerWorkflow.objects.filter(submission_uuid__in=submission_uuids))
+        missing_uuids = set(submission_uuids) - set(scorer.submission_uuid for scorer in scorers)
+        if missing_uuids:
+            raise PeerAssessmentWorkflowError(_(
+                u"A Peer Assessment Workflow does not exist for the specified "
+                u"submissions: {}".format(u", ".join(sorted(missing_uuids)))
+            ))
+
+        # Find what each scorer has open, and what they have already assessed
+        assignments = dict()
+        assessed = defaultdict(set)
+        open_items = dict()
+        preassigned_items = dict()
+        existing_items = PeerWorkflowItem.objects.filter(
+            scorer__in=[scorer.id for scorer in scorers]
+        ).order_by('id').values_list(
+            'id', 'scorer_id', 'author_id', 'submission_uuid', 'assessment_id', 'leased', 'preassigned'
+        )
+        for item_id, scorer_id, author_id, submission_uuid, assessment_id, leased, preassigned in existing_items:
+            if assessment_id is not None:
+                assessed[scorer_id].add(author_id)
+            elif leased:
+                assignments[scorer_id] = submission_uuid
+            elif preassigned:
+                preassigned_items.setdefault(scorer_id, (item_id, submission_uuid))
+            else:
+                open_items[(scorer_id, author_id)] = item_id
+
+        # Scorers with pre-assigned submissions are handed the next one
+        for scorer_id, (item_id, submission_uuid) in preassigned_items.items():
+            if scorer_id in assignments:
+                del preassigned_items[scorer_id]
+            else:
+                assignments[scorer_id] = submission_uuid
+
+        scorers_by_item = defaultdict(list)
+        for scorer in scorers:
+            if scorer.id not in assignments:
+                scorers_by_item[(scorer.course_id, scorer.item_id)].append(scorer)
+
+        # Walk each item's peer queue in order, handing out submissions
+        # until they have as many leases and assessments as they need.
+        new_leases = []
+        for (course_id, item_id), item_scorers in scorers_by_item.iteritems():
+            queue = list(
+                PeerWorkflow.objects.filter(
+                    course_id=course_id,
+                    item_id=item_id,
+                    grading_completed_at__isnull=True,
+                    review_count__lt=graded_by,
+                ).order_by('created_at', 'id').values_list(
+                    'id', 'student_id', 'submission_uuid', 'review_count'
+                )
+            )
+            remaining = dict((author[0], graded_by - author[3]) for author in queue)
+            head = 0
+            for scorer in sorted(item_scorers, key=lambda workflow: (workflow.created_at, workflow.id)):
+                # Submissions at the front of the queue are used up first
+                while head < len(queue) and remaining[queue[head][0]] <= 0:
+                    head += 1
+                for index in xrange(head, len(queue)):
+                    author_id, student_id, submission_uuid, __ = queue[index]
+                    if (remaining[author_id] > 0 and student_id != scorer.student_id
+                            and author_id not in assessed[scorer.id]):
+                        remaining[author_id] -= 1
+                        assignments[scorer.id] = submission_uuid
+                        new_leases.append((scorer.id, author_id, submission_uuid))
+                        break
+
+        # Lease the assigned submissions, re-opening expired workflow items
+        # rather than creating duplicates.
+        started_at = timezone.now()
+        lease = dict(started_at=started_at, lease_expires_at=started_at + TIME_LIMIT, leased=True)
+        reopened_ids = [
+            open_items[new_lease[:2]] for new_lease in new_leases
+            if new_lease[:2] in open_items
+        ]
+        if preassigned_items:
+            PeerWorkflowItem.objects.filter(
+                id__in=[preassigned[0] for preassigned in preassigned_items.itervalues()]
+            ).update(preassigned=False, **lease)
+        if reopened_ids:
+            PeerWorkflowItem.objects.filter(id__in=reopened_ids).update(**lease)
+        PeerWorkflowItem.objects.bulk_create([
+            PeerWorkflowItem(
+                scorer_id=lease_scorer_id,
+                author_id=lease_author_id,
+                submission_uuid=lease_submission_uuid,
+                **lease
+            )
+            for lease_scorer_id, lease_author_id, lease_submission_uuid in new_leases
+            if (lease_scorer_id, lease_author_id) not in open_items
+        ])
+
+        # Count the new leases in the authors' peer queue counts
+        leases_by_author = defaultdict(int)
+        for __, author_id, __ in new_leases:
+            leases_by_author[author_id] += 1
+        authors_by_leases = defaultdict(list)
+        for author_id, num_leases in leases_by_author.iteritems():
+            authors_by_leases[num_leases].append(author_id)
+        for num_leases, author_ids in authors_by_leases.iteritems():
+            PeerWorkflow.objects.filter(pk__in=author_ids).update(
+                review_count=F('review_count') + num_leases
+            )
+    except DatabaseError:
+        error_message = _(
+            u"An internal error occurred while assigning peer submissions "
+            u"for {} students".format(len(submission_uuids))
+        )
+        logger.exception(error_message)
+        raise PeerAssessmentInternalError(error_message)
+
+    for scorer in scorers:
+        if scorer.id in assignments:
+            _log_workflow(assignments[scorer.id], scorer, False)
+
+    return dict(
+        (scorer.submission_uuid, assignments.get(scorer.id))
+        for scorer in scorers
+    )
+
+
+@clears_request_cache
 def create_peer_workflow(submission_uuid):
     """Create a new peer workflow for a student item and submission.
 
@@ -567,6 +1064,7 @@ def create_peer_workflow(submission_uuid):
         raise PeerAssessmentInternalError(error_message)
 
 
+@clears_request_cache
 def create_peer_workflow_item(scorer_submission_uuid, submission_uuid):
     """
     Begin peer-assessing a particular submission.
@@ -588,6 +1086,7 @@ def create_peer_workflow_item(scorer_submission_uuid, submission_uuid):
     _create_peer_workflow_item(workflow, submission_uuid)
 
 
+@request_cached()
 def get_assessment_feedback(submission_uuid):
     """
     Retrieve a feedback on an assessment.
@@ -617,6 +1116,7 @@ def get_assessment_feedback(submission_uuid):
         raise PeerAssessmentInternalError(error_message)
 
 
+@clears_request_cache
 def set_assessment_feedback(feedback_dict):
     """
     Set a feedback object for an assessment to have some new values.
@@ -673,6 +1173,205 @@ def set_assessment_feedback(feedback_dict):
         raise PeerAssessmentInternalError(msg)
 
 
+@clears_request_cache
+def assign_peer_reviews(course_id, item_id, must_grade, must_be_graded_by):
+    """Pre-assign peer reviews for every submission to an item.
+
+    Intended to be run once, when submissions to an item with a hard
+    deadline have closed.  Builds a balanced reviewer to author graph: the
+    peer workflows are shuffled into a ring, and each student is assigned the
+    students following them on the ring until they have enough to grade.
+    Students who already have assessments or open leases are only assigned
+    what they still need, and submissions are only assigned as many times
+    as they still need to be graded.
+
+    The assignments are stored as pre-assigned `PeerWorkflowItem`s, which
+    `get_submission_to_assess` hands out (in order) before falling back to
+    the peer queue.  Students who submit after the assignment has been made
+    use the peer queue as usual.  Assignments that haven't been handed out
+    after `PREASSIGNMENT_TIME_LIMIT` are released by `release_expired_leases()`.
+
+    Args:
+        course_id (unicode): The course containing the item.
+        item_id (unicode): The peer assessed item.
+        must_grade (int): The number of submissions each student must assess.
+        must_be_graded_by (int): The number of assessments each submission
+            requires before it has completed the peer assessment process.
+
+    Returns:
+        int: The number of reviews assigned.
+
+    Raises:
+        PeerAssessmentInternalError: Raised when there is an internal error
+            while creating the assignments.
+
+    Examples:
+        >>> assign_peer_reviews(u"edX/DemoX/Demo_Course", u"peer-assessment-problem", 5, 3)
+        1500
+
+    """
+    try:
+        workflows = list(
+            PeerWorkflow.objects.filter(course_id=course_id, item_id=item_id).values_list(
+                'id', 'student_id', 'submission_uuid', 'review_count',
+                'num_assessed', 'grading_completed_at'
+            )
+        )
+        if not workflows:
+            return 0
+
+        # Count what each student already has to grade, and which pairs
+        # of students already have a workflow item.
+        existing_pairs = set()
+        num_open = defaultdict(int)
+        existing_items = PeerWorkflowItem.objects.filter(
+            author__course_id=course_id, author__item_id=item_id
+        ).values_list('scorer_id', 'author_id', 'assessment_id', 'leased', 'preassigned')
+        for scorer_id, author_id, assessment_id, leased, preassigned in existing_items:
+            existing_pairs.add((scorer_id, author_id))
+            if assessment_id is None and (leased or preassigned):
+                num_open[scorer_id] += 1
+
+        needed = dict()
+        capacity = dict()
+        for workflow_id, __, __, review_count, num_assessed, grading_completed_at in workflows:
+            needed[workflow_id] = must_grade - num_assessed - num_open[workflow_id]
+            if grading_completed_at is None:
+                capacity[workflow_id] = max(must_be_graded_by - review_count, 0)
+            else:
+                capacity[workflow_id] = 0
+        total_capacity = sum(capacity.itervalues())
+
+        # Walk the ring one step further each round, assigning each student
+        # who still needs submissions the author that many places ahead.
+        random.shuffle(workflows)
+        ring_size = len(workflows)
+        scorers = [index for index in range(ring_size) if needed[workflows[index][0]] > 0]
+        assignments = []
+        for offset in range(1, ring_size):
+            if not scorers or total_capacity <= 0:
+                break
+            for index in scorers:
+                scorer_id, scorer_student_id = workflows[index][:2]
+                author_id, author_student_id, author_submission_uuid = workflows[(index + offset) % ring_size][:3]
+                if (capacity[author_id] > 0 and author_student_id != scorer_student_id
+                        and (scorer_id, author_id) not in existing_pairs):
+                    assignments.append((scorer_id, author_id, author_submission_uuid))
+                    capacity[author_id] -= 1
+                    needed[scorer_id] -= 1
+                    total_capacity -= 1
+            scorers = [index for index in scorers if needed[workflows[index][0]] > 0]
+
+        expires_at = timezone.now() + PREASSIGNMENT_TIME_LIMIT
+        PeerWorkflowItem.objects.bulk_create([
+            PeerWorkflowItem(
+                scorer_id=assigned_scorer_id,
+                author_id=assigned_author_id,
+                submission_uuid=assigned_submission_uuid,
+                preassigned=True,
+                lease_expires_at=expires_at,
+            )
+            for assigned_scorer_id, assigned_author_id, assigned_submission_uuid in assignments
+        ])
+
+        # Count the assignments in the authors' peer queue counts
+        reviews_by_author = defaultdict(int)
+        for __, author_id, __ in assignments:
+            reviews_by_author[author_id] += 1
+        authors_by_reviews = defaultdict(list)
+        for author_id, num_reviews in reviews_by_author.iteritems():
+            authors_by_reviews[num_reviews].append(author_id)
+        for num_reviews, author_ids in authors_by_reviews.iteritems():
+            PeerWorkflow.objects.filter(pk__in=author_ids).update(
+                review_count=F('review_count') + num_reviews
+            )
+    except DatabaseError:
+        error_message = _(
+            u"An internal error occurred while assigning peer reviews "
+            u"for ({}, {})".format(course_id, item_id)
+        )
+        logger.exception(error_message)
+        raise PeerAssessmentInternalError(error_message)
+
+    _log_assigned_reviews(course_id, item_id, len(assignments))
+    return len(assignments)
+
+
+@clears_request_cache
+def release_expired_leases():
+    """Return expired leases on peer submissions to the peer queue.
+
+    Submissions handed out for peer assessment are leased to the scorer
+    until `lease_expires_at`. Expired leases stay in place until this is
+    called (periodically, by the `expire_peer_leases` management command),
+    so that the peer queue queries only need to check the lease flag.
+    Pre-assigned submissions that were never handed out expire the same way.
+
+    Returns:
+        dict: Mapping of (course_id, item_id) tuples to the number of
+            leases released for that item.
+
+    Raises:
+        PeerAssessmentInternalError: Raised when there is an internal error
+            while releasing the leases.
+
+    Examples:
+        >>> release_expired_leases()
+        {(u"edX/DemoX/Demo_Course", u"peer-assessment-problem"): 3}
+
+    """
+    try:
+        expired_items = PeerWorkflowItem.objects.filter(
+            Q(leased=True) | Q(preassigned=True),
+            lease_expires_at__lte=timezone.now(),
+        ).order_by().values_list('id', 'author_id', 'author__course_id', 'author__item_id')
+
+        items_by_author = defaultdict(list)
+        author_items = dict()
+        for workflow_item_id, author_id, course_id, item_id in expired_items:
+            items_by_author[author_id].append(workflow_item_id)
+            author_items[author_id] = (course_id, item_id)
+
+        # Only count the leases this call actually clears, in case an
+        # assessment was completed (or another sweep ran) in the meantime.
+        authors_by_released = defaultdict(list)
+        for author_id, workflow_item_ids in items_by_author.iteritems():
+            released = PeerWorkflowItem.objects.filter(
+                Q(leased=True) | Q(preassigned=True),
+                id__in=workflow_item_ids,
+            ).update(leased=False, preassigned=False)
+            if released:
+                authors_by_released[released].append(author_id)
+
+        released_counts = defaultdict(int)
+        for released, author_ids in authors_by_released.iteritems():
+            PeerWorkflow.objects.filter(
+                pk__in=author_ids, review_count__gte=released
+            ).update(review_count=F('review_count') - released)
+            for author_id in author_ids:
+                released_counts[author_items[author_id]] += released
+    except DatabaseError:
+        error_message = _(u"An internal error occurred while releasing expired peer leases")
+        logger.exception(error_message)
+        raise PeerAssessmentInternalError(error_message)
+
+    _log_released_leases(released_counts)
+    return dict(released_counts)
+
+
+def _prefetched_submission_cache_key(submission_uuid):
+    """Return the cache key for the submission prefetched for a scorer.
+
+    Args:
+        submission_uuid (str): The scorer's submission UUID.
+
+    Returns:
+        str
+
+    """
+    return u"peer_api.prefetched_submission.{}".format(submission_uuid)
+
+
 def _get_workflow_by_submission_uuid(submission_uuid):
     """Get the Peer Workflow associated with the given submission UUID.
 
@@ -751,6 +1450,18 @@ def _create_peer_workflow_item(workflow, submission_uuid):
             submission_uuid=submission_uuid
         )
         workflow_item.started_at = timezone.now()
+
+        # A new lease (or one re-opened after it expired) takes a place
+        # in the author's peer queue count.  Pre-assigned items already
+        # have their place.
+        if workflow_item.assessment_id is None:
+            workflow_item.lease_expires_at = workflow_item.started_at + TIME_LIMIT
+            if not workflow_item.leased:
+                workflow_item.leased = True
+                if not workflow_item.preassigned:
+                    _increment_review_count(peer_workflow.id)
+                workflow_item.preassigned = False
+
         workflow_item.save()
         return workflow_item
     except DatabaseError:
@@ -767,7 +1478,9 @@ def _find_active_assessments(workflow):
 
     Before retrieving a new submission for a peer assessor, check to see if that
     assessor already has a submission out for assessment. If an unfinished
-    assessment is found that has not expired, return the associated submission.
+    assessment is found that is still leased, return the associated submission.
+    Otherwise, if the assessor has been pre-assigned submissions by
+    `assign_peer_reviews()`, return the next one.
 
     TODO: If a user begins an assessment, then resubmits, this will never find
     the unfinished assessment. Is this OK?
@@ -792,11 +1505,17 @@ def _find_active_assessments(workflow):
         "1"
 
     """
-    workflows = workflow.graded.filter(
+    # A scorer has at most one lease and a handful of pre-assigned items
+    # open, so pick the lease (or else the first assignment) here rather
+    # than having the database sort them.
+    open_items = workflow.graded.filter(
+        Q(leased=True) | Q(preassigned=True),
         assessment__isnull=True,
-        started_at__gt=timezone.now() - TIME_LIMIT
-    )
-    return workflows[0].submission_uuid if workflows else None
+    ).order_by()
+    if not open_items:
+        return None
+    item = min(open_items, key=lambda item: (not item.leased, item.id))
+    return item.submission_uuid
 
 
 def _get_submission_for_review(workflow, graded_by, over_grading=False):
@@ -830,7 +1549,6 @@ def _get_submission_for_review(workflow, graded_by, over_grading=False):
         "1"
 
     """
-    timeout = (timezone.now() - TIME_LIMIT).strftime("%Y-%m-%d %H:%M:%S")
     # The follow query behaves as the Peer Assessment Queue. This will
     # find the next submission (via PeerWorkflow) in this course / question
     # that:
@@ -839,6 +1557,16 @@ def _get_submission_for_review(workflow, graded_by, over_grading=False):
     #  3) Is not something you have already scored.
     #  4) Does not have a combination of completed assessments or open
     #     assessments equal to or more than the requirement.
+    #
+    # The combined count of completed and open assessments is maintained
+    # on the workflow as `review_count`. Expired leases are returned to
+    # the queue in bulk by `release_expired_leases()`.
+    #
+    # The queue is read in order from the index over (course_id, item_id,
+    # grading_completed_at, created_at).  Comparing `review_count + 0`
+    # rather than the column keeps both SQLite and MySQL from using the
+    # over grading index for the range check instead, which would mean
+    # sorting every candidate; `test_query_plans` checks the plan.
     try:
         peer_workflows = list(PeerWorkflow.objects.raw(
             "select pw.id, pw.submission_uuid "
@@ -847,27 +1575,21 @@ def _get_submission_for_review(workflow, graded_by, over_grading=False):
             "and pw.course_id=%s "
             "and pw.student_id<>%s "
             "and pw.grading_completed_at is NULL "
+            "and pw.review_count + 0 < %s "
             "and pw.id not in ("
             "   select pwi.author_id "
             "   from assessment_peerworkflowitem pwi "
             "   where pwi.scorer_id=%s "
             "   and pwi.assessment_id is not NULL "
             ") "
-            "and ("
-            "   select count(pwi.id) as c "
-            "   from assessment_peerworkflowitem pwi "
-            "   where pwi.author_id=pw.id "
-            "   and (pwi.assessment_id is not NULL or pwi.started_at > %s) "
-            ") < %s "
             "order by pw.created_at, pw.id "
             "limit 1; ",
             [
                 workflow.item_id,
                 workflow.course_id,
                 workflow.student_id,
+                graded_by,
                 workflow.id,
-                timeout,
-                graded_by
             ]
         ))
         if not peer_workflows:
@@ -894,27 +1616,41 @@ def _get_submission_for_over_grading(workflow):
     # that:
     #  1) Does not belong to you
     #  2) Is not something you have already scored
+    #  3) Has the fewest assessments (completed or open) of the candidates
+    #
+    # Rather than loading every candidate to choose one, we find the range of
+    # ids among the least-graded candidates and probe it at a random point.
+    # Each query returns a single row, no matter how many students
+    # submitted to this item.
     try:
-        query = list(PeerWorkflow.objects.raw(
-            "select pw.id, pw.submission_uuid "
-            "from assessment_peerworkflow pw "
-            "where course_id=%s "
-            "and item_id=%s "
-            "and student_id<>%s "
-            "and pw.id not in ( "
-                "select pwi.author_id "
-                "from assessment_peerworkflowitem pwi "
-                "where pwi.scorer_id=%s); ",
-            [workflow.course_id, workflow.item_id, workflow.student_id, workflow.id]
-        ))
-        workflow_count = len(query)
-        if workflow_count < 1:
+        candidates = PeerWorkflow.objects.filter(
+            course_id=workflow.course_id,
+            item_id=workflow.item_id,
+        ).exclude(
+            student_id=workflow.student_id
+        ).exclude(
+            id__in=PeerWorkflowItem.objects.filter(scorer=workflow).values('author_id')
+        )
+
+        # Each of these is a single ordered lookup on the index over
+        # (course_id, item_id, review_count, id).
+        first = candidates.order_by('review_count', 'id').values_list('review_count', 'id')[:1]
+        if not first:
             return None
 
-        random_int = random.randint(0, workflow_count - 1)
-        random_workflow = query[random_int]
+        review_count, min_id = first[0]
+        candidates = candidates.filter(review_count=review_count)
+        last = candidates.order_by('-id').values_list('id', flat=True)[:1]
+        if not last:
+            return None
 
-        return random_workflow.submission_uuid
+        pivot = random.randint(min_id, last[0])
+
+        # The candidate with the largest id is always at or past the pivot
+        submission_uuids = candidates.filter(id__gte=pivot).order_by('id').values_list(
+            'submission_uuid', flat=True
+        )[:1]
+        return submission_uuids[0] if submission_uuids else None
     except DatabaseError:
         error_message = _(
             u"An internal error occurred while retrieving a peer submission "
@@ -924,126 +1660,148 @@ def _get_submission_for_over_grading(workflow):
         raise PeerAssessmentInternalError(error_message)
 
 
-def _get_latest_open_workflow_item(workflow):
-    """Gets the latest open workflow item for a given workflow.
+def _get_open_workflow_item_for_update(scorer_submission_uuid):
+    """Lock the latest open workflow item of a scorer.
 
-    If there is an open workflow item for the given workflow, return this item.
+    This must be called within a transaction.  The scorer's workflow is
+    loaded along with the item, as `item.scorer`.
 
     Args:
-        workflow (PeerWorkflow): The scorer's workflow.
+        scorer_submission_uuid (str): The submission UUID of the scorer.
 
     Returns:
-        A PeerWorkflowItem that is open for assessment. None if no item is
-        found.
+        PeerWorkflowItem
+
+    Raises:
+        PeerWorkflow.DoesNotExist: The scorer has no peer workflow.
+        PeerAssessmentWorkflowError: The scorer has no open workflow item.
 
-    Examples:
-        >>> workflow = _get_workflow_by_submission_uuid("abc123")
-        >>> _get_latest_open_workflow_item(workflow)
-        {
-            'student_id': u'Bob',
-            'item_id': u'type_one',
-            'course_id': u'course_1',
-            'submission_uuid': u'1',
-            'created_at': datetime.datetime(2014, 1, 29, 17, 14, 52, 668850, tzinfo=<UTC>)
-        }
     """
-    workflow_query = workflow.graded.filter(
-        assessment__isnull=True).order_by("-started_at", "-id")
-    items = list(workflow_query[:1])
-    return items[0] if items else None
+    items = list(
+        _open_workflow_items().select_for_update().select_related('scorer').filter(
+            scorer__submission_uuid=scorer_submission_uuid
+        )[:1]
+    )
+    if items:
+        return items[0]
+
+    # Only look up the workflow to report which error occurred
+    PeerWorkflow.objects.get(submission_uuid=scorer_submission_uuid)
+    message = _(
+        u"There are no open assessments associated with the scorer's "
+        u"submission UUID {}.".format(scorer_submission_uuid)
+    )
+    logger.error(message)
+    raise PeerAssessmentWorkflowError(message)
 
 
-def _close_active_assessment(
-        workflow,
-        submission_uuid,
-        assessment,
-        num_required_grades
-):
-    """Associate the work item with a complete assessment.
+def _open_workflow_items():
+    """Return the workflow items handed out to scorers and not yet assessed.
+
+    Returns:
+        QuerySet of PeerWorkflowItem, latest first.
+
+    """
+    # Pre-assigned items have not been handed out to the scorer yet.
+    # Filtering with `assessment__isnull` would join the assessment table,
+    # which stops the scorer's (scorer_id, assessment_id, started_at)
+    # index from providing the ordering.
+    quote_name = connection.ops.quote_name
+    return PeerWorkflowItem.objects.filter(preassigned=False).extra(
+        where=[u"{}.{} IS NULL".format(
+            quote_name(PeerWorkflowItem._meta.db_table), quote_name('assessment_id')
+        )]
+    ).order_by("-started_at", "-id")
 
-    Updates a workflow item on the student's workflow with the associated
-    assessment. When a workflow item has an assessment, it is considered
-    finished.
+
+def _close_workflow_item(item, assessment, num_required_grades):
+    """Associate a workflow item with a complete assessment.
 
     Args:
-        workflow (PeerWorkflow): The scorer's workflow
-        submission_uuid (str): The submission the scorer is grading.
-        assessment (PeerAssessment): The associate assessment for this action.
-        graded_by (int): The required number of grades the peer workflow
-            requires to be considered complete.
+        item (PeerWorkflowItem): The workflow item the scorer assessed.
+        assessment (Assessment): The assessment of the item's submission.
+        num_required_grades (int): The number of assessments the author's
+            submission requires to finish grading.
 
-    Examples:
-        >>> workflow = _get_workflow_by_submission_uuid("abc123")
-        >>> assessment = Assessment.objects.all()[0]
-        >>> _close_active_assessment(workflow, "1", assessment, 3)
+    Returns:
+        None
 
     """
-    try:
-        item_query = workflow.graded.filter(submission_uuid=submission_uuid).order_by("-started_at", "-id")
-        items = list(item_query[:1])
-        if not items:
-            raise PeerAssessmentWorkflowError(_(
-                u"No open assessment was found for student {} while assessing "
-                u"submission UUID {}.".format(workflow.student_id, submission_uuid)
-            ))
-        item = items[0]
-        item.assessment = assessment
-        item.save()
-
-        if (not item.author.grading_completed_at
-                and item.author.graded_by.filter(assessment__isnull=False).count() >= num_required_grades):
-            item.author.grading_completed_at = timezone.now()
-            item.author.save()
-    except (DatabaseError, PeerWorkflowItem.DoesNotExist):
-        error_message = _(
-            u"An internal error occurred while retrieving a workflow item for "
-            u"student {}. Workflow Items are created when submissions are "
-            u"pulled for assessment."
-            .format(workflow.student_id)
-        )
-        logger.exception(error_message)
-        raise PeerAssessmentWorkflowError(error_message)
+    # An open lease already counts towards the author's peer queue count.
+    # We close the lease with a conditional update so that we don't race
+    # with `release_expired_leases()`; if the lease was released before
+    # the assessment was completed, the assessment needs to be counted again.
+    was_leased = PeerWorkflowItem.objects.filter(
+        pk=item.pk, leased=True
+    ).update(leased=False, assessment=assessment)
+    if not was_leased:
+        if item.assessment_id is None:
+            _increment_review_count(item.author_id)
+        PeerWorkflowItem.objects.filter(pk=item.pk).update(assessment=assessment)
+
+    # Re-assessing an item replaces its assessment, so only the first
+    # assessment of an item is counted.
+    if item.assessment_id is None:
+        _increment_assessment_counts(item.scorer_id, item.author_id)
+    item.assessment = assessment
+    item.leased = False
+
+    PeerWorkflow.objects.filter(
+        pk=item.author_id,
+        grading_completed_at__isnull=True,
+        num_assessments_received__gte=num_required_grades,
+    ).update(grading_completed_at=timezone.now())
+
+
+def _increment_review_count(workflow_id):
+    """Atomically count a new lease or assessment in a workflow's peer queue count.
 
+    Args:
+        workflow_id (int): The primary key of the author's PeerWorkflow.
+
+    Returns:
+        None
+
+    """
+    PeerWorkflow.objects.filter(pk=workflow_id).update(
+        review_count=F('review_count') + 1
+    )
 
-def _num_peers_graded(workflow):
-    """Returns the number of peers the student owning the workflow has graded.
 
-    Determines if the student has graded enough peers.
+def _increment_assessment_counts(scorer_workflow_id, author_workflow_id):
+    """Atomically count a completed assessment for the scorer and the author.
 
     Args:
-        workflow (PeerWorkflow): The workflow associated with the current
-            student.
+        scorer_workflow_id (int): The primary key of the scorer's PeerWorkflow.
+        author_workflow_id (int): The primary key of the author's PeerWorkflow.
 
     Returns:
-        True if the student is done peer assessing, False if not.
+        None
 
-    Examples:
-        >>> student_item_dict = dict(
-        >>>    item_id="item_1",
-        >>>    course_id="course_1",
-        >>>    item_type="type_one",
-        >>>    student_id="Bob",
-        >>> )
-        >>> workflow = _get_workflow_by_submission_uuid(student_item_dict)
-        >>> _num_peers_graded(workflow, 3)
-        True
     """
-    return workflow.graded.filter(assessment__isnull=False).count()
+    PeerWorkflow.objects.filter(pk=scorer_workflow_id).update(
+        num_assessed=F('num_assessed') + 1
+    )
+    PeerWorkflow.objects.filter(pk=author_workflow_id).update(
+        num_assessments_received=F('num_assessments_received') + 1
+    )
 
 
-def _log_assessment(assessment, scorer_workflow):
+def _log_assessment(assessment, assessment_dict, workflow_item):
     """
     Log the creation of a peer assessment.
 
     Args:
         assessment (Assessment): The assessment model that was created.
-        scorer_workflow (dict): A dictionary representation of the Workflow
-            belonging to the scorer of this assessment.
+        assessment_dict (dict): The serialized assessment, including its points.
+        workflow_item (PeerWorkflowItem): The workflow item closed by the
+            assessment, with the scorer's workflow loaded.
 
     Returns:
         None
 
     """
+    scorer_workflow = workflow_item.scorer
     logger.info(
         u"Created peer-assessment {assessment_id} for submission "
         u"{submission_uuid}, course {course_id}, item {item_id} "
@@ -1064,35 +1822,19 @@ def _log_assessment(assessment, scorer_workflow):
         u"type:peer",
     ]
 
-    score_percentage = assessment.to_float()
-    if score_percentage is not None:
+    if assessment_dict["points_possible"] != 0:
+        score_percentage = float(assessment_dict["points_earned"]) / assessment_dict["points_possible"]
         dog_stats_api.histogram('openassessment.assessment.score_percentage', score_percentage, tags=tags)
 
     # Calculate the time spent assessing
     # This is the time from when the scorer retrieved the submission
     # (created the peer workflow item) to when they completed an assessment.
-    # By this point, the assessment *should* have an associated peer workflow item,
-    # but if not, we simply skip the event.
-    try:
-        workflow_item = assessment.peerworkflowitem_set.get()
-    except (
-        PeerWorkflowItem.DoesNotExist,
-        PeerWorkflowItem.MultipleObjectsReturned,
-        DatabaseError
-    ):
-        msg = u"Could not retrieve peer workflow item for assessment: {assessment}".format(
-            assessment=assessment.id
-        )
-        logger.exception(msg)
-        workflow_item = None
-
-    if workflow_item is not None:
-        time_delta = assessment.scored_at - workflow_item.started_at
-        dog_stats_api.histogram(
-            'openassessment.assessment.seconds_spent_assessing',
-            time_delta.total_seconds(),
-            tags=tags
-        )
+    time_delta = assessment.scored_at - workflow_item.started_at
+    dog_stats_api.histogram(
+        'openassessment.assessment.seconds_spent_assessing',
+        time_delta.total_seconds(),
+        tags=tags
+    )
 
     dog_stats_api.increment('openassessment.assessment.count', tags=tags)
 
@@ -1127,3 +1869,57 @@ def _log_workflow(submission_uuid, workflow, over_grading):
         tags.append(u"overgrading")
 
     dog_stats_api.increment('openassessment.assessment.peer_workflow.count', tags=tags)
+
+
+def _log_released_leases(released_counts):
+    """
+    Log the release of expired peer leases.
+
+    Args:
+        released_counts (dict): Mapping of (course_id, item_id) tuples to the
+            number of leases released for that item.
+
+    """
+    for (course_id, item_id), num_released in released_counts.iteritems():
+        logger.info(
+            u"Released {} expired peer leases ({}, {})"
+            .format(num_released, course_id, item_id)
+        )
+
+        tags = [
+            u"course_id:{course_id}".format(course_id=course_id),
+            u"item_id:{item_id}".format(item_id=item_id),
+            u"type:peer"
+        ]
+
+        dog_stats_api.increment(
+            'openassessment.assessment.peer_workflow.expired_leases',
+            value=num_released, tags=tags
+        )
+
+
+def _log_assigned_reviews(course_id, item_id, num_assigned):
+    """
+    Log the pre-assignment of peer reviews for an item.
+
+    Args:
+        course_id (unicode): The course containing the item.
+        item_id (unicode): The peer assessed item.
+        num_assigned (int): The number of reviews assigned.
+
+    """
+    logger.info(
+        u"Pre-assigned {} peer reviews ({}, {})"
+        .format(num_assigned, course_id, item_id)
+    )
+
+    tags = [
+        u"course_id:{course_id}".format(course_id=course_id),
+        u"item_id:{item_id}".format(item_id=item_id),
+        u"type:peer"
+    ]
+
+    dog_stats_api.increment(
+        'openassessment.assessment.peer_workflow.preassigned',
+        value=num_assigned, tags=tags
+    )
@@ -6,13 +6,15 @@ from django.utils.translation import ugettext as _
 from dogapi import dog_stats_api
 
 from submissions.api import get_submission_and_student, SubmissionNotFoundError
+from submissions.caching import request_cached, clears_request_cache
 from openassessment.assessment.serializers import (
     AssessmentSerializer, InvalidRubric,
-    full_assessment_dict, rubric_from_dict, serialize_assessments
+    full_assessment_dict, full_assessment_dicts, rubric_from_dict
 )
 from openassessment.assessment.models import (
-    Assessment, AssessmentPart, InvalidOptionSelection
+    Assessment, AssessmentPart, CompiledRubric, InvalidOptionSelection
 )
+from openassessment.assessment.signals import assessment_created
 
 
 # Assessments are tagged as "self-evaluation"
@@ -28,18 +30,24 @@ class SelfAssessmentRequestError(Exception):
     pass
 
 
-def create_assessment(submission_uuid, user_id, options_selected, rubric_dict, scored_at=None):
+@clears_request_cache
+def create_assessment(
+        submission_uuid, user_id, options_selected, rubric_dict,
+        scored_at=None, rubric_content_hash=None
+):
     """
     Create a self-assessment for a submission.
 
     Args:
         submission_uuid (str): The unique identifier for the submission being assessed.
-        user_id (str): The ID of the user creating the assessment.  This must match the ID of the user who made the submission.
+        user_id (str): The ID of the user creating the assessment.  This must
+            match the ID of the user who made the submission.
         options_selected (dict): Mapping of rubric criterion names to option values selected.
         rubric_dict (dict): Serialized Rubric model.
 
     Kwargs:
         scored_at (datetime): The timestamp of the assessment; defaults to the current time.
+        rubric_content_hash (str): The content hash of `rubric_dict`, if it is already known.
 
     Returns:
         dict: serialized Assessment model
@@ -61,8 +69,9 @@ def create_assessment(submission_uuid, user_id, options_selected, rubric_dict, s
 
     # Get or create the rubric
     try:
-        rubric = rubric_from_dict(rubric_dict)
-        option_ids = rubric.options_ids(options_selected)
+        rubric = rubric_from_dict(rubric_dict, content_hash=rubric_content_hash)
+        compiled_rubric = CompiledRubric.from_content_hash(rubric.content_hash)
+        option_ids = compiled_rubric.options_ids_by_criterion(options_selected)
     except InvalidRubric as ex:
         msg = _("Invalid rubric definition: {errors}").format(errors=ex.errors)
         raise SelfAssessmentRequestError(msg)
@@ -90,6 +99,10 @@ def create_assessment(submission_uuid, user_id, options_selected, rubric_dict, s
         msg = _("Could not create self assessment: {errors}").format(errors=serializer.errors)
         raise SelfAssessmentRequestError(msg)
 
+    # Store the points along with the assessment, so they never need to be
+    # calculated from the parts.
+    serializer.object.stored_points_earned = compiled_rubric.points_earned(options_selected)
+    serializer.object.stored_points_possible = compiled_rubric.points_possible
     assessment = serializer.save()
 
     # We do this to do a run around django-rest-framework serializer
@@ -99,11 +112,14 @@ def create_assessment(submission_uuid, user_id, options_selected, rubric_dict, s
     assessment_dict = full_assessment_dict(assessment)
     _log_assessment(assessment, submission)
 
+    # The student may have finished the self step
+    assessment_created.send(sender=Assessment, submission_uuids=[submission_uuid])
 
     # Return the serialized assessment
     return assessment_dict
 
 
+@request_cached()
 def get_assessment(submission_uuid):
     """
     Retrieve a self-assessment for a submission_uuid.
@@ -124,7 +140,7 @@ def get_assessment(submission_uuid):
     # but not at the database level.  Someone could take advantage of the race condition
     # between checking the number of self-assessments and creating a new self-assessment.
     # To be safe, we retrieve just the most recent submission.
-    serialized_assessments = serialize_assessments(Assessment.objects.filter(
+    serialized_assessments = full_assessment_dicts(Assessment.objects.filter(
         score_type=SELF_TYPE, submission_uuid=submission_uuid
     ).order_by('-scored_at')[:1])
 
@@ -155,6 +171,26 @@ def is_complete(submission_uuid):
     ).exists()
 
 
+def get_complete_submission_uuids(submission_uuids):
+    """
+    Find which of many submissions have been self-assessed, with a single query.
+
+    Args:
+        submission_uuids (list of str): The unique identifiers of the submissions.
+
+    Returns:
+        set of the identifiers of the submissions that have been self-assessed.
+    """
+    if not submission_uuids:
+        return set()
+
+    return set(
+        Assessment.objects.filter(
+            score_type=SELF_TYPE, submission_uuid__in=submission_uuids
+        ).values_list('submission_uuid', flat=True)
+    )
+
+
 def _log_assessment(assessment, submission):
     """
     Log the creation of a self-assessment.
@@ -3,13 +3,15 @@
 Serializers are created to ensure models do not have to be accessed outside the
 scope of the Tim APIs.
 """
+from collections import defaultdict
 from copy import deepcopy
 import logging
 
-from django.core.cache import cache
+from django.db.models.query import QuerySet
 from rest_framework import serializers
+from submissions.caching import ImmutableCache
 from openassessment.assessment.models import (
-    Assessment, AssessmentPart, Criterion, CriterionOption, Rubric,
+    Assessment, AssessmentPart, CompiledRubric, Criterion, CriterionOption, Rubric,
     AssessmentFeedback, AssessmentFeedbackOption,
     PeerWorkflowItem, PeerWorkflow
 )
@@ -23,19 +25,10 @@ logger = logging.getLogger(__name__)
 # when model fields change.
 CACHE_VERSION = 1
 
-
-def _versioned_cache_key(key):
-    """
-    Add a version number to a cache key, so we
-
-    Args:
-        key (unicode): The original, unversioned, cache key.
-
-    Returns:
-        unicode: Cache key with the version appended.
-
-    """
-    return u"{}.v{}".format(key, CACHE_VERSION)
+# Rubrics are identified by their content, and completed assessments
+# never change, so their serialized forms can be cached indefinitely.
+RUBRIC_CACHE = ImmutableCache("assessment.rubric", version=CACHE_VERSION)
+ASSESSMENT_CACHE = ImmutableCache("assessment.full_assessment_dict", version=CACHE_VERSION)
 
 
 class InvalidRubric(Exception):
@@ -129,8 +122,8 @@ class RubricSerializer(NestedModelSerializer):
         """For a given `Rubric` model object, return a serialized version.
 
         This method will attempt to use the cache if possible, first looking at
-        the `local_cache` dict you can pass in, and then looking at whatever
-        Django cache is configured.
+        the `local_cache` dict you can pass in, and then looking at the
+        rubric cache.
 
         Args:
             rubric (Rubric): The Rubric model to get the serialized form of.
@@ -144,25 +137,16 @@ class RubricSerializer(NestedModelSerializer):
         """
         # Optional local cache you can send in (for when you're calling this
         # in a loop).
-        local_cache = local_cache or {}
+        local_cache = local_cache if local_cache is not None else {}
 
         # Check our in-memory cache...
         if rubric.content_hash in local_cache:
             return local_cache[rubric.content_hash]
 
-        # Check the external cache (e.g. memcached)
-        rubric_dict_cache_key = (
-            "RubricSerializer.serialized_from_cache.{}"
-            .format(rubric.content_hash)
+        # Check the rubric cache, or grab it from the database
+        rubric_dict = RUBRIC_CACHE.get_or_compute(
+            rubric.content_hash, lambda: RubricSerializer(rubric).data
         )
-        rubric_dict = cache.get(rubric_dict_cache_key)
-        if rubric_dict:
-            local_cache[rubric.content_hash] = rubric_dict
-            return rubric_dict
-
-        # Grab it from the database
-        rubric_dict = RubricSerializer(rubric).data
-        cache.set(rubric_dict_cache_key, rubric_dict)
         local_cache[rubric.content_hash] = rubric_dict
 
         return rubric_dict
@@ -191,19 +175,57 @@ class AssessmentSerializer(serializers.ModelSerializer):
         )
 
 
-def serialize_assessments(assessments_qset):
-    assessments = list(assessments_qset.select_related("rubric"))
-    rubric_cache = {}
+def full_assessment_dicts(assessments):
+    """
+    Return the same dict representation as `full_assessment_dict` for
+    several assessments at once.
+
+    The cached assessments are read with a single round trip to the cache.
+    The parts of the rest are loaded in a single query, and they are all
+    written back to the cache at once.
+
+    Args:
+        assessments (list of Assessment): The Assessment models to serialize.
+            If this is a queryset, the rubrics are selected along with it.
 
-    return [
-        full_assessment_dict(
-            assessment,
-            RubricSerializer.serialized_from_cache(
-                assessment.rubric, rubric_cache
+    Returns:
+        list of dict, in the same order as `assessments`
+    """
+    if isinstance(assessments, QuerySet):
+        assessments = assessments.select_related("rubric")
+    assessments = list(assessments)
+    identities = [_assessment_cache_identity(assessment) for assessment in assessments]
+    assessment_dicts = ASSESSMENT_CACHE.get_many(identities)
+
+    missing = [
+        (identity, assessment)
+        for identity, assessment in zip(identities, assessments)
+        if identity not in assessment_dicts
+    ]
+    if missing:
+        parts_by_assessment = defaultdict(list)
+        parts = AssessmentPart.objects.filter(
+            assessment__in=[assessment.id for _, assessment in missing]
+        ).select_related("option__criterion").order_by("id")
+        for part in parts:
+            parts_by_assessment[part.assessment_id].append(part)
+
+        rubric_cache = {}
+        new_assessment_dicts = dict(
+            (
+                identity,
+                _full_assessment_dict(
+                    assessment,
+                    RubricSerializer.serialized_from_cache(assessment.rubric, rubric_cache),
+                    parts_by_assessment[assessment.id]
+                )
             )
+            for identity, assessment in missing
         )
-        for assessment in assessments
-    ]
+        ASSESSMENT_CACHE.set_many(new_assessment_dicts)
+        assessment_dicts.update(new_assessment_dicts)
+
+    return [assessment_dicts[identity] for identity in identities]
 
 
 def full_assessment_dict(assessment, rubric_dict=None):
@@ -221,14 +243,35 @@ def full_assessment_dict(assessment, rubric_dict=None):
     Returns:
         dict with keys 'rubric' (serialized Rubric model) and 'parts' (serialized assessment parts)
     """
-    assessment_cache_key = _versioned_cache_key(
-        "assessment.full_assessment_dict.{}.{}.{}".format(
-            assessment.id, assessment.submission_uuid, assessment.scored_at.isoformat()
-        )
+    return ASSESSMENT_CACHE.get_or_compute(
+        _assessment_cache_identity(assessment),
+        lambda: _full_assessment_dict(assessment, rubric_dict)
     )
-    assessment_dict = cache.get(assessment_cache_key)
-    if assessment_dict:
-        return assessment_dict
+
+
+def _assessment_cache_identity(assessment):
+    """Identify an assessment in the assessment cache."""
+    return (assessment.id, assessment.submission_uuid, assessment.scored_at.isoformat())
+
+
+def _full_assessment_dict(assessment, rubric_dict=None, parts=None):
+    """
+    Serialize an assessment from the database for `full_assessment_dict`.
+
+    Args:
+        assessment (Assessment): The Assessment model to serialize
+
+    Kwargs:
+        rubric_dict (dict): The serialized rubric of the assessment.
+        parts (list of AssessmentPart): The parts of the assessment, with
+            their options and criteria selected.  If not given, they are
+            loaded from the database.
+
+    Returns:
+        dict
+    """
+    if parts is None:
+        parts = assessment.parts.all().select_related("option__criterion")
 
     assessment_dict = AssessmentSerializer(assessment).data
     if not rubric_dict:
@@ -243,30 +286,76 @@ def full_assessment_dict(assessment, rubric_dict=None):
     # the DB model. Instead of invoking the serializers for `Criterion` and
     # `CriterionOption` again, we simply index into the places we expect them to
     # be from the big, saved `Rubric` serialization.
-    parts = []
-    for part in assessment.parts.all().select_related("option__criterion"):
+    part_dicts = []
+    for part in parts:
         criterion_dict = rubric_dict["criteria"][part.option.criterion.order_num]
         options_dict = criterion_dict["options"][part.option.order_num]
         options_dict["criterion"] = criterion_dict
-        parts.append({
+        part_dicts.append({
             "option": options_dict,
             "feedback": part.feedback
         })
 
     # Now manually built up the dynamically calculated values on the
     # `Assessment` so we can again avoid DB calls.
+    assessment_dict["parts"] = part_dicts
+    assessment_dict["points_earned"] = sum(
+        part_dict["option"]["points"] for part_dict in part_dicts
+    )
+    assessment_dict["points_possible"] = rubric_dict["points_possible"]
+
+    return assessment_dict
+
+
+def full_assessment_dict_from_options(assessment, rubric_dict, options_selected, criterion_feedback=None):
+    """
+    Return the same dict representation as `full_assessment_dict` for an
+    assessment that has just been created, using the options the scorer
+    selected instead of reading the assessment parts back from the database.
+
+    Args:
+        assessment (Assessment): The Assessment model to serialize.
+        rubric_dict (dict): The serialized rubric of the assessment.
+        options_selected (dict): Mapping of criterion names to the names of
+            the options selected, already validated against the rubric.
+
+    Kwargs:
+        criterion_feedback (dict): Mapping of criterion names to the
+            free-form feedback given for the criterion.
+
+    Returns:
+        dict with keys 'rubric' (serialized Rubric model) and 'parts' (serialized assessment parts)
+    """
+    criterion_feedback = criterion_feedback or dict()
+    assessment_dict = AssessmentSerializer(assessment).data
+    assessment_dict["rubric"] = rubric_dict
+
+    # As in `full_assessment_dict`, we index into the serialized rubric
+    # rather than serializing the criteria and options again.
+    parts = []
+    for criterion_dict in rubric_dict["criteria"]:
+        option_name = options_selected.get(criterion_dict["name"])
+        for options_dict in criterion_dict["options"]:
+            if options_dict["name"] == option_name:
+                options_dict["criterion"] = criterion_dict
+                parts.append({
+                    "option": options_dict,
+                    "feedback": criterion_feedback.get(
+                        criterion_dict["name"], u""
+                    )[0:AssessmentPart.MAX_FEEDBACK_SIZE]
+                })
+                break
+
     assessment_dict["parts"] = parts
     assessment_dict["points_earned"] = sum(
         part_dict["option"]["points"] for part_dict in parts
     )
     assessment_dict["points_possible"] = rubric_dict["points_possible"]
 
-    cache.set(assessment_cache_key, assessment_dict)
-
     return assessment_dict
 
 
-def rubric_from_dict(rubric_dict):
+def rubric_from_dict(rubric_dict, content_hash=None):
     """Given a dict of rubric information, return the corresponding Rubric
 
     This will create the Rubric and its children if it does not exist already.
@@ -298,15 +387,31 @@ def rubric_from_dict(rubric_dict):
           ]
         }
 
+    Args:
+        rubric_dict (dict): The rubric, as above.
+
+    Kwargs:
+        content_hash (str): The content hash of `rubric_dict`, if the caller
+            has already calculated it with `Rubric.content_hash_from_dict()`.
+            An existing rubric is then found without hashing the rubric again.
+
+    Returns:
+        Rubric
+
     """
-    rubric_dict = deepcopy(rubric_dict)
+    if content_hash is not None:
+        try:
+            return CompiledRubric.from_content_hash(content_hash).rubric()
+        except Rubric.DoesNotExist:
+            pass
 
     # Calculate the hash based on the rubric content...
     content_hash = Rubric.content_hash_from_dict(rubric_dict)
 
     try:
-        rubric = Rubric.objects.get(content_hash=content_hash)
+        rubric = CompiledRubric.from_content_hash(content_hash).rubric()
     except Rubric.DoesNotExist:
+        rubric_dict = deepcopy(rubric_dict)
         rubric_dict["content_hash"] = content_hash
         for crit_idx, criterion in enumerate(rubric_dict.get("criteria", {})):
             if "order_num" not in criterion:
@@ -0,0 +1,14 @@
+"""
+Signals sent by the assessment APIs.
+
+Other apps (such as the workflow) listen for these to find out when
+a student's progress may have changed, instead of asking the
+assessment APIs again every time they are read.
+"""
+from django.dispatch import Signal
+
+
+# Sent after an assessment is created.  `submission_uuids` are the
+# submissions whose progress it may change: the submission that was
+# assessed, and the scorer's own submission.
+assessment_created = Signal(providing_args=["submission_uuids"])
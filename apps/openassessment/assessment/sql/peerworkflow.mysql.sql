@@ -0,0 +1,6 @@
+-- Composite indexes for the peer queue queries.  These are created by the
+-- South migrations; this file adds them when the tables are built by
+-- syncdb instead.
+CREATE INDEX `assessment_peerworkflow_course_item_student` ON `assessment_peerworkflow` (`course_id`, `item_id`, `student_id`);
+CREATE INDEX `assessment_peerworkflow_course_item_review_count` ON `assessment_peerworkflow` (`course_id`, `item_id`, `review_count`, `id`);
+CREATE INDEX `assessment_peerworkflow_course_item_queue` ON `assessment_peerworkflow` (`course_id`, `item_id`, `grading_completed_at`, `created_at`);
@@ -0,0 +1,5 @@
+-- Composite indexes for the peer queue queries.  These are created by the
+-- South migrations; this file adds them when the tables are built by
+-- syncdb instead.
+CREATE INDEX "assessment_peerworkflowitem_scorer_assessment" ON "assessment_peerworkflowitem" ("scorer_id", "assessment_id", "started_at");
+CREATE INDEX "assessment_peerworkflowitem_lease" ON "assessment_peerworkflowitem" ("leased", "lease_expires_at");
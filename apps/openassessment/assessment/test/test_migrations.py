@@ -0,0 +1,49 @@
+"""
+Tests for the assessment data migrations.
+
+The data migrations only run once, while the test database is empty,
+so they are run here again directly against the test data.
+"""
+from south.migration import Migrations
+
+from openassessment.test_utils import CacheResetTest, RUBRIC, create_submission
+from openassessment.assessment import peer_api
+from openassessment.assessment.models import PeerWorkflow, PeerWorkflowItem
+
+COUNT_FIELDS = ['review_count', 'num_assessed', 'num_assessments_received']
+
+
+class TestDataMigrations(CacheResetTest):
+
+    def test_backfill_peer_workflow_counts(self):
+        uuids = dict((name, create_submission(name)) for name in ["Tim", "Bob", "Sally"])
+
+        # Bob assesses a submission, and Sally has one open
+        peer_api.get_submission_to_assess(uuids["Bob"], 2)
+        peer_api.create_assessment(
+            uuids["Bob"], "Bob", {"clarity": "clear"}, dict(), "", RUBRIC, 2
+        )
+        peer_api.get_submission_to_assess(uuids["Sally"], 2)
+        expected = self._counts()
+
+        # The counts and leases were added without filling them in
+        PeerWorkflow.objects.update(**dict((field, 0) for field in COUNT_FIELDS))
+        PeerWorkflowItem.objects.update(leased=False, lease_expires_at=None)
+
+        self._migrate("0014_backfill_peer_workflow_counts")
+        self.assertEqual(self._counts(), expected)
+        self.assertEqual(PeerWorkflowItem.objects.filter(leased=True).count(), 1)
+
+    @staticmethod
+    def _counts():
+        """Return the peer queue and assessment counts of each workflow."""
+        return dict(
+            (workflow['submission_uuid'], workflow)
+            for workflow in PeerWorkflow.objects.values('submission_uuid', *COUNT_FIELDS)
+        )
+
+    @staticmethod
+    def _migrate(name):
+        """Run an assessment migration forwards against the test database."""
+        migration = Migrations('assessment')[name]
+        migration.forwards()(migration.orm())
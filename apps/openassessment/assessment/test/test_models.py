@@ -2,12 +2,20 @@
 """
 Tests for assessment models.
 """
+from collections import defaultdict
+import random
+from unittest import skipUnless
+
+from mock import patch
 
 from openassessment.test_utils import CacheResetTest
+from openassessment.assessment import models
 from openassessment.assessment.models import (
     Rubric, Criterion, CriterionOption, InvalidOptionSelection,
-    AssessmentFeedback, AssessmentFeedbackOption,
+    AssessmentFeedback, AssessmentFeedbackOption, Assessment,
+    CompiledRubric,
 )
+from submissions.caching import clear_local_caches
 
 
 class TestRubricOptionIds(CacheResetTest):
@@ -107,6 +115,54 @@ class TestRubricOptionIds(CacheResetTest):
             })
 
 
+class TestCompiledRubric(TestRubricOptionIds):
+    """
+    Test the compiled form of a rubric and its caches.
+    """
+
+    def setUp(self):
+        super(TestCompiledRubric, self).setUp()
+        self.rubric.content_hash = "abc123"
+        self.rubric.save()
+
+    def test_compiled_rubric(self):
+        with self.assertNumQueries(1):
+            compiled = CompiledRubric.from_content_hash("abc123")
+
+        self.assertEqual(compiled.rubric_id, self.rubric.id)
+        self.assertEqual(compiled.criterion_names, tuple(criterion.name for criterion in self.criteria))
+        self.assertEqual(compiled.option_ids["test criterion 1"]["test option 2"], self.options["test criterion 1"][2].id)
+        self.assertEqual(compiled.option_points["test criterion 1"]["test option 2"], 2)
+        self.assertEqual(compiled.criterion_points_possible, dict(
+            (criterion.name, criterion.points_possible) for criterion in self.criteria
+        ))
+        self.assertEqual(compiled.points_possible, 8)
+        self.assertEqual(compiled.points_earned({
+            "test criterion 0": "test option 0",
+            "test criterion 1": "test option 1",
+            "test criterion 2": "test option 2",
+            "test criterion 3": "test option 2",
+        }), 5)
+
+    def test_cached(self):
+        compiled = CompiledRubric.from_content_hash("abc123")
+
+        # The rubric is cached in this process...
+        with self.assertNumQueries(0):
+            self.assertEqual(CompiledRubric.from_content_hash("abc123"), compiled)
+            self.assertEqual(self.rubric.points_possible, 8)
+            self.assertEqual(compiled.rubric().id, self.rubric.id)
+
+        # ... and in the Django cache
+        clear_local_caches()
+        with self.assertNumQueries(0):
+            self.assertEqual(CompiledRubric.from_content_hash("abc123"), compiled)
+
+    def test_no_such_rubric(self):
+        with self.assertRaises(Rubric.DoesNotExist):
+            CompiledRubric.from_content_hash("no such hash")
+
+
 class AssessmentFeedbackTest(CacheResetTest):
     """
     Tests for assessment feedback.
@@ -198,3 +254,53 @@ class AssessmentFeedbackTest(CacheResetTest):
 
         # There should be two options in the database
         self.assertEqual(AssessmentFeedbackOption.objects.count(), 2)
+
+
+class TestMedianScoresByKey(CacheResetTest):
+    """
+    Test that batched median scores match the median of each list of scores.
+    """
+
+    NUM_TRIALS = 50
+
+    @skipUnless(models.numpy, "numpy is not installed")
+    def test_matches_median_score(self):
+        self._check_random_scores()
+
+    @patch.object(models, 'numpy', None)
+    def test_matches_median_score_without_numpy(self):
+        self._check_random_scores()
+
+    def test_no_scores(self):
+        self.assertEqual(Assessment.get_median_scores_by_key([]), dict())
+        self.assertEqual(Assessment.get_median_scores_by_key(iter([])), dict())
+
+    def test_rounds_up(self):
+        scores = [
+            ("abc123", "foo", 5), ("abc123", "foo", 6),
+            ("abc123", "bar", 3), ("abc123", "bar", 3),
+            ("def456", "foo", 16), ("def456", "foo", 6), ("def456", "foo", 12),
+        ]
+        self.assertEqual(
+            Assessment.get_median_scores_by_key(scores),
+            {"abc123": {"foo": 6, "bar": 3}, "def456": {"foo": 12}}
+        )
+
+    def _check_random_scores(self):
+        """
+        Compare batched and scalar medians for random groups of scores,
+        with even and odd numbers of scores in each group.
+        """
+        rand = random.Random(42)
+        for _ in range(self.NUM_TRIALS):
+            scores = []
+            expected = defaultdict(dict)
+            for key in range(rand.randint(1, 20)):
+                for criterion_name in ["clarity", "accuracy", "style"][:rand.randint(1, 3)]:
+                    points = [rand.randint(0, 10) for _ in range(rand.randint(1, 7))]
+                    expected[key][criterion_name] = Assessment.get_median_score(points)
+                    scores.extend((key, criterion_name, criterion_points) for criterion_points in points)
+
+            # The order of the scores does not matter
+            rand.shuffle(scores)
+            self.assertEqual(Assessment.get_median_scores_by_key(iter(scores)), dict(expected))
@@ -2,6 +2,7 @@
 import datetime
 import pytz
 
+from django.core.cache import cache
 from django.db import DatabaseError
 from django.utils import timezone
 from ddt import ddt, file_data
@@ -14,8 +15,10 @@ from openassessment.assessment.models import (
     Assessment, AssessmentPart, AssessmentFeedback,
     PeerWorkflow, PeerWorkflowItem
 )
+from openassessment.assessment.serializers import full_assessment_dict, RubricSerializer
 from openassessment.workflow import api as workflow_api
 from submissions import api as sub_api
+from submissions.caching import clear_local_caches, request_cache_scope
 from submissions.tests.test_api import STUDENT_ITEM, ANSWER_ONE
 
 # Possible points: 14
@@ -141,7 +144,13 @@ class TestPeerApi(CacheResetTest):
     Tests for the peer assessment API functions.
     """
 
-    CREATE_ASSESSMENT_NUM_QUERIES = 60
+    # Includes creating the rubric, which happens once per rubric
+    CREATE_ASSESSMENT_NUM_QUERIES = 35
+
+    # Once the rubric is cached: lock the scorer's workflow item, insert
+    # the assessment and its parts, then update the item and the two workflows,
+    # and mark the assessment workflows of both submissions for update.
+    CREATE_ASSESSMENT_EXISTING_RUBRIC_NUM_QUERIES = 8
 
     def test_create_assessment_points(self):
         self._create_student_and_submission("Tim", "Tim's answer")
@@ -164,9 +173,8 @@ class TestPeerApi(CacheResetTest):
         bob_sub, bob = self._create_student_and_submission("Bob", "Bob's answer")
         peer_api.get_submission_to_assess(bob_sub['uuid'], 1)
 
-        # Creating feedback per criterion should need one additional query to update
-        # for each criterion that has feedback.
-        with self.assertNumQueries(self.CREATE_ASSESSMENT_NUM_QUERIES + 1):
+        # Feedback per criterion is saved along with the assessment parts
+        with self.assertNumQueries(self.CREATE_ASSESSMENT_NUM_QUERIES):
             assessment = peer_api.create_assessment(
                 bob_sub["uuid"],
                 bob["student_id"],
@@ -187,6 +195,44 @@ class TestPeerApi(CacheResetTest):
             expected_feedback = ASSESSMENT_DICT['criterion_feedback'].get(criterion_name, "")
             self.assertEqual(part['feedback'], expected_feedback)
 
+    def test_create_assessment_query_budget(self):
+        self._create_student_and_submission("Tim", "Tim's answer")
+        self._create_student_and_submission("Sally", "Sally's answer")
+        bob_sub, bob = self._create_student_and_submission("Bob", "Bob's answer")
+
+        # Bob's first assessment creates the rubric
+        peer_api.get_submission_to_assess(bob_sub['uuid'], 1)
+        peer_api.create_assessment(
+            bob_sub["uuid"], bob["student_id"],
+            ASSESSMENT_DICT['options_selected'], dict(), "",
+            RUBRIC_DICT, REQUIRED_GRADED_BY,
+        )
+        peer_api.get_submission_to_assess(bob_sub['uuid'], 1)
+
+        with self.assertNumQueries(self.CREATE_ASSESSMENT_EXISTING_RUBRIC_NUM_QUERIES):
+            assessment = peer_api.create_assessment(
+                bob_sub["uuid"], bob["student_id"],
+                ASSESSMENT_DICT['options_selected'],
+                ASSESSMENT_DICT['criterion_feedback'],
+                ASSESSMENT_DICT['overall_feedback'],
+                RUBRIC_DICT, REQUIRED_GRADED_BY,
+            )
+
+        # The assessment we get back is the same as the one we read back later,
+        # although the parts are not guaranteed to be in any particular order.
+        saved = full_assessment_dict(Assessment.objects.get(
+            scorer_id=bob["student_id"], submission_uuid=assessment["submission_uuid"]
+        ))
+        # (The serialized options refer back to their criteria, so we
+        # compare a summary of each part rather than the whole structure.)
+        summarize_parts = lambda parts: sorted(
+            (part['option']['criterion']['name'], part['option']['name'], part['feedback'])
+            for part in parts
+        )
+        self.assertEqual(summarize_parts(assessment.pop('parts')), summarize_parts(saved.pop('parts')))
+        self.assertEqual(assessment.pop('rubric')['id'], saved.pop('rubric')['id'])
+        self.assertEqual(assessment, saved)
+
     def test_create_assessment_unknown_criterion_feedback(self):
         self._create_student_and_submission("Tim", "Tim's answer")
         bob_sub, bob = self._create_student_and_submission("Bob", "Bob's answer")
@@ -292,6 +338,79 @@ class TestPeerApi(CacheResetTest):
         self.assertEqual(1, len(assessments))
         self.assertEqual(assessments[0]["scored_at"], MONDAY)
 
+    def test_get_assessments_batched(self):
+        tim_sub, _ = self._create_student_and_submission("Tim", "Tim's answer")
+        for name, assessment in [("Bob", ASSESSMENT_DICT), ("Sally", ASSESSMENT_DICT_PASS), ("Jim", ASSESSMENT_DICT_FAIL)]:
+            sub, student = self._create_student_and_submission(name, u"{}'s answer".format(name))
+            peer_api.create_peer_workflow_item(sub['uuid'], tim_sub['uuid'])
+            peer_api.create_assessment(
+                sub["uuid"], student["student_id"],
+                assessment['options_selected'], dict(), "",
+                RUBRIC_DICT, REQUIRED_GRADED_BY,
+            )
+
+        # Cache one of the assessments, then forget everything else
+        assessments = list(Assessment.objects.filter(submission_uuid=tim_sub["uuid"]))
+        cache.clear()
+        clear_local_caches()
+        expected = full_assessment_dict(assessments[1])
+
+        # The assessments are read along with their rubric, then the parts
+        # of the two that aren't cached are read at once.
+        with self.assertNumQueries(2):
+            serialized = peer_api.get_assessments(tim_sub["uuid"], scored_only=False)
+        self.assertEqual(len(serialized), 3)
+        self.assertEqual(serialized[1]["scorer_id"], expected["scorer_id"])
+        self.assertEqual(
+            [part["option"]["name"] for part in serialized[1]["parts"]],
+            [part["option"]["name"] for part in expected["parts"]]
+        )
+        self.assertEqual(
+            [assessment_dict["points_earned"] for assessment_dict in serialized],
+            [assessment.points_earned for assessment in assessments]
+        )
+
+        # Now they're all cached, so we only need to find them
+        with self.assertNumQueries(1):
+            cached = peer_api.get_assessments(tim_sub["uuid"], scored_only=False)
+        self.assertEqual(
+            [(assessment_dict["scorer_id"], assessment_dict["points_earned"]) for assessment_dict in cached],
+            [(assessment_dict["scorer_id"], assessment_dict["points_earned"]) for assessment_dict in serialized]
+        )
+
+    def test_get_scored_assessments_for_submissions(self):
+        tim_sub, _ = self._create_student_and_submission("Tim", "Tim's answer")
+        bob_sub, _ = self._create_student_and_submission("Bob", "Bob's answer")
+        jim_sub, _ = self._create_student_and_submission("Jim", "Jim's answer")
+        for name, assessment in [("Sally", ASSESSMENT_DICT), ("Buffy", ASSESSMENT_DICT_PASS)]:
+            sub, student = self._create_student_and_submission(name, u"{}'s answer".format(name))
+            for author_sub in [tim_sub, bob_sub]:
+                peer_api.create_peer_workflow_item(sub['uuid'], author_sub['uuid'])
+                peer_api.create_assessment(
+                    sub["uuid"], student["student_id"],
+                    assessment['options_selected'], dict(), "",
+                    RUBRIC_DICT, REQUIRED_GRADED_BY,
+                )
+
+        # Tim and Bob are scored, and Jim has no assessments
+        requirements = {"must_grade": 0, "must_be_graded_by": 2}
+        for sub in [tim_sub, bob_sub]:
+            peer_api.get_score(sub["uuid"], requirements)
+
+        # The scored items, the assessments with their rubrics, and their parts
+        with self.assertNumQueries(3):
+            scored = peer_api.get_scored_assessments_for_submissions(
+                [tim_sub["uuid"], bob_sub["uuid"], jim_sub["uuid"]]
+            )
+        self.assertEqual(set(scored), set([tim_sub["uuid"], bob_sub["uuid"]]))
+        for sub in [tim_sub, bob_sub]:
+            actual = scored[sub["uuid"]]
+            expected = peer_api.get_assessments(sub["uuid"])
+            self.assertEqual(
+                [(assessment_dict["scorer_id"], assessment_dict["points_earned"]) for assessment_dict in actual],
+                [(assessment_dict["scorer_id"], assessment_dict["points_earned"]) for assessment_dict in expected]
+            )
+
     def test_has_finished_evaluation(self):
         """
         Verify unfinished assessments do not get counted when determining a
@@ -338,7 +457,9 @@ class TestPeerApi(CacheResetTest):
         pwis = PeerWorkflowItem.objects.filter(submission_uuid=sub['uuid'])
         self.assertEqual(len(pwis), 1)
         pwis[0].started_at = yesterday
+        pwis[0].lease_expires_at = yesterday
         pwis[0].save()
+        peer_api.release_expired_leases()
 
         sub = peer_api.get_submission_to_assess(tim_sub['uuid'], REQUIRED_GRADED)
         self.assertEqual(u"Bob's answer", sub['answer'])
@@ -534,6 +655,13 @@ class TestPeerApi(CacheResetTest):
         # Tim's workflow has enough grades.
         self.assertIsNotNone(PeerWorkflow.objects.get(student_id=tim["student_id"]).grading_completed_at)
 
+        # The assessment counts are tracked on the workflows
+        tim_workflow = PeerWorkflow.objects.get(student_id=tim["student_id"])
+        self.assertEqual(tim_workflow.num_assessments_received, 3)
+        self.assertEqual(tim_workflow.num_assessed, 0)
+        for student in (jim, bob, sally):
+            self.assertEqual(PeerWorkflow.objects.get(student_id=student["student_id"]).num_assessed, 1)
+
 
     def test_complex_peer_assessment_workflow(self):
         """
@@ -811,6 +939,83 @@ class TestPeerApi(CacheResetTest):
         submission_uuid = peer_api._find_active_assessments(buffy_workflow)
         self.assertEqual(xander_answer["uuid"], submission_uuid)
 
+    def test_review_count_tracks_leases_and_assessments(self):
+        tim_sub, tim = self._create_student_and_submission("Tim", "Tim's answer")
+        bob_sub, bob = self._create_student_and_submission("Bob", "Bob's answer")
+        tim_workflow = PeerWorkflow.objects.get(submission_uuid=tim_sub['uuid'])
+        self.assertEqual(tim_workflow.review_count, 0)
+
+        # Handing out Tim's submission counts against the queue
+        sub = peer_api.get_submission_to_assess(bob_sub['uuid'], REQUIRED_GRADED_BY)
+        self.assertEqual(sub['uuid'], tim_sub['uuid'])
+        self.assertEqual(PeerWorkflow.objects.get(pk=tim_workflow.pk).review_count, 1)
+
+        # Asking again for the same open assessment doesn't count it twice
+        peer_api.get_submission_to_assess(bob_sub['uuid'], REQUIRED_GRADED_BY)
+        self.assertEqual(PeerWorkflow.objects.get(pk=tim_workflow.pk).review_count, 1)
+
+        # Completing the assessment turns the lease into a completed review
+        peer_api.create_assessment(
+            bob_sub["uuid"], bob["student_id"],
+            ASSESSMENT_DICT['options_selected'],
+            ASSESSMENT_DICT['criterion_feedback'],
+            ASSESSMENT_DICT['overall_feedback'],
+            RUBRIC_DICT,
+            REQUIRED_GRADED_BY,
+        )
+        self.assertEqual(PeerWorkflow.objects.get(pk=tim_workflow.pk).review_count, 1)
+        item = PeerWorkflowItem.objects.get(submission_uuid=tim_sub['uuid'])
+        self.assertFalse(item.leased)
+
+    def test_queue_skips_fully_leased_submissions(self):
+        tim_sub, _ = self._create_student_and_submission("Tim", "Tim's answer")
+        bob_sub, _ = self._create_student_and_submission("Bob", "Bob's answer")
+        sally_sub, _ = self._create_student_and_submission("Sally", "Sally's answer")
+        jim_sub, _ = self._create_student_and_submission("Jim", "Jim's answer")
+
+        # Bob and Sally lease Tim's submission, which only needs two reviews
+        self.assertEqual(peer_api.get_submission_to_assess(bob_sub['uuid'], 2)['uuid'], tim_sub['uuid'])
+        self.assertEqual(peer_api.get_submission_to_assess(sally_sub['uuid'], 2)['uuid'], tim_sub['uuid'])
+
+        # So Jim gets the next submission in the queue
+        self.assertEqual(peer_api.get_submission_to_assess(jim_sub['uuid'], 2)['uuid'], bob_sub['uuid'])
+
+    def test_expired_lease_returns_to_queue(self):
+        tim_sub, tim = self._create_student_and_submission("Tim", "Tim's answer")
+        bob_sub, _ = self._create_student_and_submission("Bob", "Bob's answer")
+        sally_sub, _ = self._create_student_and_submission("Sally", "Sally's answer")
+
+        # Bob leases Tim's submission, then abandons it
+        peer_api.get_submission_to_assess(bob_sub['uuid'], 1)
+        tim_workflow = PeerWorkflow.objects.get(submission_uuid=tim_sub['uuid'])
+        self.assertEqual(tim_workflow.review_count, 1)
+        PeerWorkflowItem.objects.filter(submission_uuid=tim_sub['uuid']).update(
+            lease_expires_at=timezone.now() - datetime.timedelta(days=1)
+        )
+
+        # Once the lease is released, Sally can review Tim's submission
+        released = peer_api.release_expired_leases()
+        self.assertEqual(released, {(STUDENT_ITEM['course_id'], STUDENT_ITEM['item_id']): 1})
+        self.assertIsNone(peer_api._find_active_assessments(
+            PeerWorkflow.objects.get(submission_uuid=bob_sub['uuid'])
+        ))
+        sub = peer_api.get_submission_to_assess(sally_sub['uuid'], 1)
+        self.assertEqual(sub['uuid'], tim_sub['uuid'])
+        tim_workflow = PeerWorkflow.objects.get(submission_uuid=tim_sub['uuid'])
+        self.assertEqual(tim_workflow.review_count, 1)
+
+        # If Bob completes the assessment anyway, it's counted again
+        bob_workflow = PeerWorkflow.objects.get(submission_uuid=bob_sub['uuid'])
+        assessment = Assessment.objects.create(
+            submission_uuid=tim_sub['uuid'], scorer_id="Bob",
+            score_type=peer_api.PEER_TYPE,
+            rubric=peer_api.rubric_from_dict(RUBRIC_DICT),
+        )
+        item = PeerWorkflowItem.objects.get(scorer=bob_workflow, submission_uuid=tim_sub['uuid'])
+        peer_api._close_workflow_item(item, assessment, 1)
+        tim_workflow = PeerWorkflow.objects.get(submission_uuid=tim_sub['uuid'])
+        self.assertEqual(tim_workflow.review_count, 2)
+
     def test_get_workflow_by_uuid(self):
         buffy_answer, _ = self._create_student_and_submission("Buffy", "Buffy's answer")
         self._create_student_and_submission("Xander", "Xander's answer")
@@ -832,6 +1037,165 @@ class TestPeerApi(CacheResetTest):
         submission_uuid = peer_api._get_submission_for_review(buffy_workflow, 3)
         self.assertEqual(xander_answer["uuid"], submission_uuid)
 
+    def test_get_submissions_to_assess(self):
+        tim_sub, _ = self._create_student_and_submission("Tim", "Tim's answer")
+        bob_sub, _ = self._create_student_and_submission("Bob", "Bob's answer")
+        sally_sub, _ = self._create_student_and_submission("Sally", "Sally's answer")
+        jim_sub, _ = self._create_student_and_submission("Jim", "Jim's answer")
+
+        # Everyone is assigned in queue order; Tim's submission only needs two reviews
+        assignments = peer_api.get_submissions_to_assess(
+            [jim_sub['uuid'], sally_sub['uuid'], bob_sub['uuid'], tim_sub['uuid']], 2
+        )
+        self.assertEqual(assignments, {
+            tim_sub['uuid']: bob_sub['uuid'],
+            bob_sub['uuid']: tim_sub['uuid'],
+            sally_sub['uuid']: tim_sub['uuid'],
+            jim_sub['uuid']: bob_sub['uuid'],
+        })
+        self.assertEqual(PeerWorkflow.objects.get(submission_uuid=tim_sub['uuid']).review_count, 2)
+        self.assertEqual(PeerWorkflow.objects.get(submission_uuid=bob_sub['uuid']).review_count, 2)
+        self.assertEqual(PeerWorkflowItem.objects.filter(leased=True).count(), 4)
+
+        # The assignments are the students' active assessments
+        for scorer_uuid, author_uuid in assignments.iteritems():
+            self.assertEqual(peer_api.get_submission_to_assess(scorer_uuid, 2)['uuid'], author_uuid)
+
+        # Assigning again hands out nothing new
+        self.assertEqual(peer_api.get_submissions_to_assess([jim_sub['uuid']], 2), {
+            jim_sub['uuid']: bob_sub['uuid']
+        })
+        self.assertEqual(PeerWorkflowItem.objects.count(), 4)
+
+    def test_get_submissions_to_assess_skips_assessed_and_full(self):
+        tim_sub, _ = self._create_student_and_submission("Tim", "Tim's answer")
+        bob_sub, bob = self._create_student_and_submission("Bob", "Bob's answer")
+        sally_sub, _ = self._create_student_and_submission("Sally", "Sally's answer")
+
+        # Bob has already assessed Tim
+        peer_api.get_submission_to_assess(bob_sub['uuid'], 1)
+        peer_api.create_assessment(
+            bob_sub['uuid'], bob['student_id'],
+            ASSESSMENT_DICT['options_selected'],
+            ASSESSMENT_DICT['criterion_feedback'],
+            ASSESSMENT_DICT['overall_feedback'],
+            RUBRIC_DICT, 1,
+        )
+
+        # Bob gets Sally's submission, not Tim's again, and Sally gets Bob's
+        assignments = peer_api.get_submissions_to_assess([bob_sub['uuid'], sally_sub['uuid']], 1)
+        self.assertEqual(assignments, {
+            bob_sub['uuid']: sally_sub['uuid'],
+            sally_sub['uuid']: bob_sub['uuid'],
+        })
+
+        # Every submission has been handed out once, so there is nothing left for Tim
+        self.assertEqual(peer_api.get_submissions_to_assess([tim_sub['uuid']], 1), {tim_sub['uuid']: None})
+
+        # Assigning a whole cohort takes a fixed number of queries
+        with self.assertNumQueries(5):
+            peer_api.get_submissions_to_assess([tim_sub['uuid'], sally_sub['uuid']], 3)
+
+    @raises(peer_api.PeerAssessmentWorkflowError)
+    def test_get_submissions_to_assess_no_workflow(self):
+        tim_sub, _ = self._create_student_and_submission("Tim", "Tim's answer")
+        peer_api.get_submissions_to_assess([tim_sub['uuid'], "no-such-submission"], 3)
+
+    @patch.object(PeerWorkflowItem.objects, 'bulk_create')
+    @raises(peer_api.PeerAssessmentInternalError)
+    def test_get_submissions_to_assess_error(self, mock_create):
+        mock_create.side_effect = DatabaseError("Oh no.")
+        tim_sub, _ = self._create_student_and_submission("Tim", "Tim's answer")
+        bob_sub, _ = self._create_student_and_submission("Bob", "Bob's answer")
+        peer_api.get_submissions_to_assess([tim_sub['uuid'], bob_sub['uuid']], 3)
+
+    def test_preassigned_reviews_handed_out_first(self):
+        tim_sub, tim = self._create_student_and_submission("Tim", "Tim's answer")
+        bob_sub, _ = self._create_student_and_submission("Bob", "Bob's answer")
+        sally_sub, _ = self._create_student_and_submission("Sally", "Sally's answer")
+
+        # Everyone is assigned both of their peers
+        num_assigned = peer_api.assign_peer_reviews(
+            STUDENT_ITEM['course_id'], STUDENT_ITEM['item_id'], 2, 3
+        )
+        self.assertEqual(num_assigned, 6)
+        tim_workflow = PeerWorkflow.objects.get(submission_uuid=tim_sub['uuid'])
+        self.assertEqual(tim_workflow.review_count, 2)
+
+        # Tim is handed his pre-assigned submissions in order,
+        # without counting them in the peer queue again
+        assigned_uuids = list(
+            tim_workflow.graded.order_by('id').values_list('submission_uuid', flat=True)
+        )
+        for submission_uuid in assigned_uuids:
+            sub = peer_api.get_submission_to_assess(tim_sub['uuid'], 3)
+            self.assertEqual(sub['uuid'], submission_uuid)
+            self.assertEqual(PeerWorkflow.objects.get(submission_uuid=submission_uuid).review_count, 2)
+            peer_api.create_assessment(
+                tim_sub['uuid'], tim['student_id'],
+                ASSESSMENT_DICT['options_selected'],
+                ASSESSMENT_DICT['criterion_feedback'],
+                ASSESSMENT_DICT['overall_feedback'],
+                RUBRIC_DICT, 3,
+            )
+        self.assertEqual(PeerWorkflow.objects.get(submission_uuid=tim_sub['uuid']).num_assessed, 2)
+
+        # Jim submits late, so he uses the peer queue
+        jim_sub, _ = self._create_student_and_submission("Jim", "Jim's answer")
+        sub = peer_api.get_submission_to_assess(jim_sub['uuid'], 3)
+        self.assertEqual(sub['uuid'], tim_sub['uuid'])
+        self.assertEqual(PeerWorkflow.objects.get(submission_uuid=tim_sub['uuid']).review_count, 3)
+
+    def test_expired_preassignments_released(self):
+        uuids = [
+            self._create_student_and_submission(name, u"{}'s answer".format(name))[0]['uuid']
+            for name in ["Tim", "Bob", "Sally"]
+        ]
+        num_assigned = peer_api.assign_peer_reviews(
+            STUDENT_ITEM['course_id'], STUDENT_ITEM['item_id'], 1, 1
+        )
+        self.assertEqual(num_assigned, 3)
+        self.assertEqual(peer_api.release_expired_leases(), dict())
+
+        # Nobody shows up to review, so the assignments expire
+        PeerWorkflowItem.objects.update(
+            lease_expires_at=timezone.now() - datetime.timedelta(days=30)
+        )
+        released = peer_api.release_expired_leases()
+        self.assertEqual(released, {(STUDENT_ITEM['course_id'], STUDENT_ITEM['item_id']): 3})
+        for uuid in uuids:
+            self.assertEqual(PeerWorkflow.objects.get(submission_uuid=uuid).review_count, 0)
+
+        # A late submitter can review the released submissions
+        jim_sub, _ = self._create_student_and_submission("Jim", "Jim's answer")
+        self.assertIn(peer_api.get_submission_to_assess(jim_sub['uuid'], 1)['uuid'], uuids)
+
+    def test_prefetch_submission_to_assess(self):
+        tim_sub, _ = self._create_student_and_submission("Tim", "Tim's answer")
+        bob_sub, bob = self._create_student_and_submission("Bob", "Bob's answer")
+        self.assertIsNone(peer_api.get_prefetched_submission(bob_sub['uuid']))
+
+        # The prefetched submission is leased like any other
+        sub = peer_api.prefetch_submission_to_assess(bob_sub['uuid'], REQUIRED_GRADED_BY)
+        self.assertEqual(sub['uuid'], tim_sub['uuid'])
+        self.assertEqual(peer_api.get_prefetched_submission(bob_sub['uuid']), sub)
+        self.assertEqual(PeerWorkflow.objects.get(submission_uuid=tim_sub['uuid']).review_count, 1)
+
+        # Assessing it clears the prefetched submission
+        peer_api.create_assessment(
+            bob_sub['uuid'], bob['student_id'],
+            ASSESSMENT_DICT['options_selected'],
+            ASSESSMENT_DICT['criterion_feedback'],
+            ASSESSMENT_DICT['overall_feedback'],
+            RUBRIC_DICT,
+            REQUIRED_GRADED_BY,
+        )
+        self.assertIsNone(peer_api.get_prefetched_submission(bob_sub['uuid']))
+
+        # Nothing left to assess, so nothing is prefetched
+        self.assertIsNone(peer_api.prefetch_submission_to_assess(bob_sub['uuid'], REQUIRED_GRADED_BY))
+        self.assertIsNone(peer_api.get_prefetched_submission(bob_sub['uuid']))
+
     def test_get_submission_for_over_grading(self):
         buffy_answer, _ = self._create_student_and_submission("Buffy", "Buffy's answer")
         xander_answer, _ = self._create_student_and_submission("Xander", "Xander's answer")
@@ -854,6 +1218,54 @@ class TestPeerApi(CacheResetTest):
         if not (buffy_answer["uuid"] == submission_uuid or willow_answer["uuid"] == submission_uuid):
             self.fail("Submission was not Buffy or Willow's.")
 
+    def test_over_grading_prefers_least_graded(self):
+        buffy_answer, _ = self._create_student_and_submission("Buffy", "Buffy's answer")
+        xander_answer, _ = self._create_student_and_submission("Xander", "Xander's answer")
+        willow_answer, _ = self._create_student_and_submission("Willow", "Willow's answer")
+        giles_answer, _ = self._create_student_and_submission("Giles", "Giles' answer")
+
+        buffy_workflow = peer_api._get_workflow_by_submission_uuid(buffy_answer['uuid'])
+        xander_workflow = peer_api._get_workflow_by_submission_uuid(xander_answer['uuid'])
+        willow_workflow = peer_api._get_workflow_by_submission_uuid(willow_answer['uuid'])
+        giles_workflow = peer_api._get_workflow_by_submission_uuid(giles_answer['uuid'])
+
+        # Buffy's and Xander's submissions have been handed out for review; Willow's has not
+        peer_api._create_peer_workflow_item(willow_workflow, buffy_answer["uuid"])
+        peer_api._create_peer_workflow_item(buffy_workflow, xander_answer["uuid"])
+
+        # Whichever point of the id range is probed, Giles gets Willow's submission
+        for probe in (min, max):
+            with patch('openassessment.assessment.peer_api.random.randint') as mock_randint:
+                mock_randint.side_effect = probe
+                submission_uuid = peer_api._get_submission_for_over_grading(giles_workflow)
+            self.assertEqual(submission_uuid, willow_answer['uuid'])
+
+        # Once every submission has been handed out once, any of them can be chosen
+        peer_api._create_peer_workflow_item(xander_workflow, willow_answer["uuid"])
+        chosen = set()
+        for probe in (min, max):
+            with patch('openassessment.assessment.peer_api.random.randint') as mock_randint:
+                mock_randint.side_effect = probe
+                chosen.add(peer_api._get_submission_for_over_grading(giles_workflow))
+        self.assertEqual(chosen, set([buffy_answer['uuid'], willow_answer['uuid']]))
+
+    def test_over_grading_nothing_left_to_grade(self):
+        buffy_answer, _ = self._create_student_and_submission("Buffy", "Buffy's answer")
+        xander_answer, _ = self._create_student_and_submission("Xander", "Xander's answer")
+        xander_workflow = peer_api._get_workflow_by_submission_uuid(xander_answer['uuid'])
+
+        # Xander has already been handed the only other submission
+        peer_api._create_peer_workflow_item(xander_workflow, buffy_answer["uuid"])
+        self.assertIsNone(peer_api._get_submission_for_over_grading(xander_workflow))
+
+    @patch.object(PeerWorkflow.objects, 'filter')
+    @raises(peer_api.PeerAssessmentInternalError)
+    def test_failure_to_get_over_grading_submission(self, mock_filter):
+        tim_answer, _ = self._create_student_and_submission("Tim", "Tim's answer", MONDAY)
+        tim_workflow = peer_api._get_workflow_by_submission_uuid(tim_answer['uuid'])
+        mock_filter.side_effect = DatabaseError("Oh no.")
+        peer_api._get_submission_for_over_grading(tim_workflow)
+
     def test_create_feedback_on_an_assessment(self):
         tim_sub, tim = self._create_student_and_submission("Tim", "Tim's answer")
         bob_sub, bob = self._create_student_and_submission("Bob", "Bob's answer")
@@ -906,7 +1318,42 @@ class TestPeerApi(CacheResetTest):
         ])
         self.assertEquals(saved_feedback["assessments"][0]["submission_uuid"], assessment["submission_uuid"])
 
-    def test_close_active_assessment(self):
+    def test_assessment_feedback_memoized_for_request(self):
+        tim_sub, _ = self._create_student_and_submission("Tim", "Tim's answer")
+
+        with request_cache_scope():
+            with self.assertNumQueries(1):
+                self.assertIsNone(peer_api.get_assessment_feedback(tim_sub['uuid']))
+            with self.assertNumQueries(0):
+                self.assertIsNone(peer_api.get_assessment_feedback(tim_sub['uuid']))
+
+            # Once the feedback is saved, we read it again
+            peer_api.set_assessment_feedback({
+                'submission_uuid': tim_sub['uuid'],
+                'feedback_text': 'Bob is a jerk!',
+                'options': [],
+            })
+            feedback = peer_api.get_assessment_feedback(tim_sub['uuid'])
+            self.assertEqual(feedback['feedback_text'], 'Bob is a jerk!')
+
+    def test_getting_submissions_to_assess_clears_request_cache(self):
+        tim_sub, _ = self._create_student_and_submission("Tim", "Tim's answer")
+        bob_sub, _ = self._create_student_and_submission("Bob", "Bob's answer")
+
+        # Handing out submissions writes workflow items, so values
+        # memoized before then are read again
+        with request_cache_scope():
+            for get_submission in [
+                lambda: peer_api.get_submission_to_assess(bob_sub['uuid'], 1),
+                lambda: peer_api.prefetch_submission_to_assess(bob_sub['uuid'], 1),
+                lambda: peer_api.get_submissions_to_assess([bob_sub['uuid']], 1),
+            ]:
+                peer_api.get_assessment_feedback(tim_sub['uuid'])
+                get_submission()
+                with self.assertNumQueries(1):
+                    peer_api.get_assessment_feedback(tim_sub['uuid'])
+
+    def test_close_workflow_item(self):
         buffy_answer, _ = self._create_student_and_submission("Buffy", "Buffy's answer")
         xander_answer, _ = self._create_student_and_submission("Xander", "Xander's answer")
 
@@ -929,7 +1376,8 @@ class TestPeerApi(CacheResetTest):
         assessment = Assessment.objects.filter(
             scorer_id=assessment_dict["scorer_id"],
             scored_at=assessment_dict["scored_at"])[0]
-        peer_api._close_active_assessment(buffy_workflow, xander_answer["uuid"], assessment, REQUIRED_GRADED_BY)
+        item = buffy_workflow.graded.get(submission_uuid=xander_answer["uuid"])
+        peer_api._close_workflow_item(item, assessment, REQUIRED_GRADED_BY)
 
         item = PeerWorkflowItem.objects.get(submission_uuid=xander_answer['uuid'])
         self.assertEqual(xander_answer["uuid"], submission["uuid"])
@@ -1023,7 +1471,7 @@ class TestPeerApi(CacheResetTest):
         self._create_student_and_submission("Tim", "Tim's answer")
         bob_sub, bob = self._create_student_and_submission("Bob", "Bob's answer")
         sub = peer_api.get_submission_to_assess(bob_sub['uuid'], 1)
-        assessment = peer_api.create_assessment(
+        peer_api.create_assessment(
             bob_sub["uuid"], bob["student_id"],
             ASSESSMENT_DICT['options_selected'],
             ASSESSMENT_DICT['criterion_feedback'],
@@ -1104,6 +1552,166 @@ class TestPeerApi(CacheResetTest):
         mock_filter.side_effect = DatabaseError("Bad things happened")
         peer_api.get_assessments(sub["uuid"])
 
+    def test_get_scores(self):
+        requirements = {"must_grade": 2, "must_be_graded_by": 2}
+        assessments = [ASSESSMENT_DICT, ASSESSMENT_DICT_FAIL, ASSESSMENT_DICT_PASS]
+        students = [
+            self._create_student_and_submission(name, u"{}'s answer".format(name))
+            for name in ["Tim", "Bob", "Sally", "Jim"]
+        ]
+        for num, (submission, student) in enumerate(students):
+            for _ in range(requirements["must_grade"]):
+                if peer_api.get_submission_to_assess(submission['uuid'], 2) is None:
+                    break
+                assessment = assessments[num % len(assessments)]
+                peer_api.create_assessment(
+                    submission["uuid"], student["student_id"],
+                    assessment['options_selected'], dict(), "",
+                    RUBRIC_DICT, requirements["must_be_graded_by"],
+                )
+        uuids = [submission['uuid'] for submission, _ in students]
+
+        # Jim could not find anyone to assess, so does not get a score
+        with self.assertNumQueries(5):
+            scores = peer_api.get_scores(uuids, requirements)
+        self.assertEqual(len(scores), 3)
+        self.assertNotIn(students[3][0]['uuid'], scores)
+
+        # The same scores are given one submission at a time,
+        # and the same assessments are marked as scored
+        scored = set(PeerWorkflowItem.objects.filter(scored=True).values_list('id', flat=True))
+        for uuid in uuids:
+            self.assertEqual(scores.get(uuid), peer_api.get_score(uuid, requirements))
+        self.assertEqual(
+            scored, set(PeerWorkflowItem.objects.filter(scored=True).values_list('id', flat=True))
+        )
+
+    def test_get_score_query_count(self):
+        # Tim's submission is assessed by three peers
+        tim_sub, tim = self._create_student_and_submission("Tim", "Tim's answer")
+        for name in ["Bob", "Sally", "Jim"]:
+            sub, student = self._create_student_and_submission(name, u"{}'s answer".format(name))
+            peer_api.create_peer_workflow_item(sub['uuid'], tim_sub['uuid'])
+            peer_api.create_assessment(
+                sub["uuid"], student["student_id"],
+                ASSESSMENT_DICT['options_selected'], dict(), "",
+                RUBRIC_DICT, REQUIRED_GRADED_BY,
+            )
+        RubricSerializer.serialized_from_cache(Assessment.objects.all()[0].rubric)
+        self.assertTrue(peer_api.is_complete(tim_sub["uuid"], {"must_grade": 0}))
+
+        # The number of queries does not depend on how many assessments are scored
+        for must_be_graded_by in [1, 3]:
+            requirements = {"must_grade": 0, "must_be_graded_by": must_be_graded_by}
+            with self.assertNumQueries(5):
+                score = peer_api.get_score(tim_sub["uuid"], requirements)
+            self.assertEqual(score["points_possible"], 14)
+            self.assertEqual(
+                PeerWorkflowItem.objects.filter(scored=True).count(), must_be_graded_by
+            )
+
+    def test_get_scores_completed_earlier(self):
+        # Tim completed the peer step before the requirements were raised
+        tim_sub, _ = self._create_student_and_submission("Tim", "Tim's answer")
+        for name in ["Bob", "Sally"]:
+            sub, student = self._create_student_and_submission(name, u"{}'s answer".format(name))
+            peer_api.create_peer_workflow_item(sub['uuid'], tim_sub['uuid'])
+            peer_api.create_assessment(
+                sub["uuid"], student["student_id"],
+                ASSESSMENT_DICT['options_selected'], dict(), "",
+                RUBRIC_DICT, REQUIRED_GRADED_BY,
+            )
+        PeerWorkflow.objects.filter(submission_uuid=tim_sub["uuid"]).update(completed_at=timezone.now())
+
+        requirements = {"must_grade": 5, "must_be_graded_by": 2}
+        scores = peer_api.get_scores([tim_sub["uuid"]], requirements)
+        self.assertIsNotNone(scores.get(tim_sub["uuid"]))
+        self.assertEqual(scores[tim_sub["uuid"]], peer_api.get_score(tim_sub["uuid"], requirements))
+
+    def test_get_scores_none_complete(self):
+        tim_sub, _ = self._create_student_and_submission("Tim", "Tim's answer")
+        requirements = {"must_grade": 1, "must_be_graded_by": 1}
+        with self.assertNumQueries(1):
+            self.assertEqual(peer_api.get_scores([tim_sub["uuid"]], requirements), dict())
+
+    @patch.object(PeerWorkflow.objects, 'filter')
+    @raises(peer_api.PeerAssessmentInternalError)
+    def test_get_scores_db_error(self, mock_filter):
+        mock_filter.side_effect = DatabaseError("Bad things happened")
+        peer_api.get_scores(["abc123"], {"must_grade": 1, "must_be_graded_by": 1})
+
+    def test_get_median_scores_for_item(self):
+        requirements = {"must_grade": 2, "must_be_graded_by": 2}
+        assessments = [ASSESSMENT_DICT, ASSESSMENT_DICT_FAIL, ASSESSMENT_DICT_PASS]
+        students = [
+            self._create_student_and_submission(name, u"{}'s answer".format(name))
+            for name in ["Tim", "Bob", "Sally", "Jim"]
+        ]
+        for num, (submission, student) in enumerate(students):
+            for _ in range(requirements["must_grade"]):
+                if peer_api.get_submission_to_assess(submission['uuid'], 2) is None:
+                    break
+                assessment = assessments[num % len(assessments)]
+                peer_api.create_assessment(
+                    submission["uuid"], student["student_id"],
+                    assessment['options_selected'], dict(), "",
+                    RUBRIC_DICT, requirements["must_be_graded_by"],
+                )
+        uuids = [submission['uuid'] for submission, _ in students]
+        peer_api.get_scores(uuids, requirements)
+
+        with self.assertNumQueries(1):
+            medians = peer_api.get_median_scores_for_item(STUDENT_ITEM["course_id"], STUDENT_ITEM["item_id"])
+
+        # Jim's submission was not assessed, so has no medians
+        self.assertEqual(len(medians), 3)
+        for uuid in uuids[:3]:
+            self.assertEqual(medians[uuid], peer_api.get_assessment_median_scores(uuid))
+
+    @patch.object(PeerWorkflowItem.objects, 'filter')
+    @raises(peer_api.PeerAssessmentInternalError)
+    def test_get_median_scores_for_item_db_error(self, mock_filter):
+        mock_filter.side_effect = DatabaseError("Bad things happened")
+        peer_api.get_median_scores_for_item("test_course", "test_item")
+
+    def test_scores_by_criterion(self):
+        tim_sub, _ = self._create_student_and_submission("Tim", "Tim's answer")
+        for name, assessment in [("Bob", ASSESSMENT_DICT), ("Sally", ASSESSMENT_DICT_PASS)]:
+            sub, student = self._create_student_and_submission(name, u"{}'s answer".format(name))
+            peer_api.create_peer_workflow_item(sub['uuid'], tim_sub['uuid'])
+            peer_api.create_assessment(
+                sub["uuid"], student["student_id"],
+                assessment['options_selected'], dict(), "",
+                RUBRIC_DICT, REQUIRED_GRADED_BY,
+            )
+        assessments = list(Assessment.objects.filter(submission_uuid=tim_sub["uuid"]))
+        self.assertEqual(len(assessments), 2)
+
+        # One query for all the assessments, whose result is cached
+        with self.assertNumQueries(1):
+            scores = Assessment.scores_by_criterion(assessments)
+
+        for criterion_name, points in scores.iteritems():
+            self.assertEqual(len(points), 2)
+            self.assertEqual(
+                sorted(points),
+                sorted(
+                    part.option.points for assessment in assessments
+                    for part in assessment.parts.all() if part.option.criterion.name == criterion_name
+                )
+            )
+
+        # The order of the assessments doesn't change the cache key
+        with self.assertNumQueries(0):
+            self.assertEqual(Assessment.scores_by_criterion(reversed(assessments)), scores)
+
+    @patch('submissions.caching.cache')
+    def test_scores_by_criterion_cache_key_length(self, mock_cache):
+        mock_cache.get.return_value = None
+        Assessment.scores_by_criterion([Assessment(id=num) for num in range(1000000, 1001000)])
+        cache_key = mock_cache.get.call_args[0][0]
+        self.assertLess(len(cache_key), 250)
+
     def test_choose_score(self):
         self.assertEqual(0, Assessment.get_median_score([]))
         self.assertEqual(5, Assessment.get_median_score([5]))
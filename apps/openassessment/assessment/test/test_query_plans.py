@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+Check that the peer assessment queries used on every request are
+served by indexes, rather than by scanning or sorting the peer workflow tables.
+"""
+from openassessment.test_utils import QueryPlanTest, create_submission
+from openassessment.assessment import peer_api
+from openassessment.assessment.models import PeerWorkflow, PeerWorkflowItem
+
+
+PEER_TABLES = ['assessment_peerworkflow', 'assessment_peerworkflowitem']
+
+
+class TestPeerQueryPlans(QueryPlanTest):
+
+    INDEXED_MODELS = [PeerWorkflow, PeerWorkflowItem]
+
+    def setUp(self):
+        super(TestPeerQueryPlans, self).setUp()
+        tim_uuid = create_submission("Tim")
+        self.bob_uuid = create_submission("Bob")
+        sally_uuid = create_submission("Sally")
+        peer_api.create_peer_workflow_item(self.bob_uuid, tim_uuid)
+        self.bob_workflow = PeerWorkflow.objects.get(submission_uuid=self.bob_uuid)
+        self.sally_workflow = PeerWorkflow.objects.get(submission_uuid=sally_uuid)
+
+    def test_peer_queue(self):
+        self.assertQueryPlansUseIndexes(
+            PEER_TABLES, peer_api._get_submission_for_review, self.sally_workflow, 3
+        )
+
+    def test_over_grading_queue(self):
+        self.assertQueryPlansUseIndexes(
+            PEER_TABLES, peer_api._get_submission_for_over_grading, self.sally_workflow
+        )
+
+    def test_find_active_assessments(self):
+        self.assertQueryPlansUseIndexes(
+            PEER_TABLES, peer_api._find_active_assessments, self.bob_workflow
+        )
+
+    def test_open_workflow_items(self):
+        self.assertQueryPlansUseIndexes(
+            PEER_TABLES, lambda: list(peer_api._open_workflow_items().filter(scorer=self.bob_workflow)[:1])
+        )
+
+    def test_open_workflow_item_for_update(self):
+        self.assertQueryPlansUseIndexes(
+            PEER_TABLES, peer_api._get_open_workflow_item_for_update, self.bob_uuid
+        )
+
+    def test_release_expired_leases(self):
+        self.assertQueryPlansUseIndexes(PEER_TABLES, peer_api.release_expired_leases)
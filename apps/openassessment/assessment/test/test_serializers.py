@@ -1,10 +1,12 @@
 import json
 import os.path
 
+from mock import patch
+
 from openassessment.test_utils import CacheResetTest
-from openassessment.assessment.models import Criterion, CriterionOption, Rubric, AssessmentFeedback
+from openassessment.assessment.models import Rubric, AssessmentFeedback
 from openassessment.assessment.serializers import (
-    InvalidRubric, RubricSerializer, rubric_from_dict,
+    InvalidRubric, rubric_from_dict,
     AssessmentFeedbackSerializer
 )
 
@@ -30,6 +32,26 @@ class TestRubricDeserialization(CacheResetTest):
         self.assertEqual(r1.id, r2.id)
         r1.delete()
 
+    def test_rubric_with_content_hash(self):
+        rubric_data = json_data('rubric_data/project_plan_rubric.json')
+        content_hash = Rubric.content_hash_from_dict(rubric_data)
+
+        # The rubric is created the first time, even though we know its hash
+        r1 = rubric_from_dict(rubric_data, content_hash=content_hash)
+        self.assertEqual(r1.content_hash, content_hash)
+
+        # Then it is found without hashing it, and once it is cached,
+        # without querying the database
+        with patch.object(Rubric, 'content_hash_from_dict') as mock_hash:
+            with self.assertNumQueries(1):
+                r2 = rubric_from_dict(rubric_data, content_hash=content_hash)
+            with self.assertNumQueries(0):
+                r3 = rubric_from_dict(rubric_data, content_hash=content_hash)
+            self.assertFalse(mock_hash.called)
+
+        self.assertEqual(r1.id, r2.id)
+        self.assertEqual(r1.id, r3.id)
+
     def test_rubric_requires_positive_score(self):
         with self.assertRaises(InvalidRubric):
             rubric_from_dict(json_data('rubric_data/no_points.json'))
@@ -2,7 +2,7 @@ import logging
 from django.contrib.auth.decorators import login_required
 
 from django.shortcuts import render_to_response
-from openassessment.assessment.peer_api import get_assessments
+from openassessment.assessment.peer_api import get_scored_assessments_for_submissions
 from submissions.api import SubmissionRequestError, get_submissions
 
 log = logging.getLogger(__name__)
@@ -36,14 +36,16 @@ def get_evaluations_for_student_item(request, course_id, student_id, item_id):
     context = dict(**student_item_dict)
     try:
         submissions = get_submissions(student_item_dict)
-        evaluations = []
-        for submission in submissions:
-            submission_evaluations = get_assessments(submission["uuid"])
-            for evaluation in submission_evaluations:
-                evaluation["submission_uuid"] = submission["uuid"]
-                evaluations.append(evaluation)
-
-        context["evaluations"] = evaluations
+
+        # Read the scored peer assessments of all the submissions at once
+        assessments = get_scored_assessments_for_submissions(
+            [submission["uuid"] for submission in submissions]
+        )
+        context["evaluations"] = [
+            evaluation
+            for submission in submissions
+            for evaluation in assessments.get(submission["uuid"], [])
+        ]
 
     except SubmissionRequestError:
         context["error"] = "The specified student item was not found."
@@ -0,0 +1,71 @@
+"""
+Pre-assign peer reviews for an item once its submission deadline has passed.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from openassessment.assessment import peer_api
+
+
+class Command(BaseCommand):
+    """
+    Build the reviewer to author assignments for every submission to an item.
+
+    This is optional: without it, students are handed submissions from the
+    peer queue as they request them.  For items with a hard submission
+    deadline, running this once the deadline has passed assigns everyone
+    their reviews in one pass, so handing out a submission is a lookup
+    of the student's next assignment.  Students who submit late still use
+    the peer queue.
+
+    The requirements must match the peer assessment settings of the item.
+    """
+
+    help = 'Pre-assign peer reviews for every submission to an item'
+    args = '<COURSE_ID> <ITEM_ID> <MUST_GRADE> <MUST_BE_GRADED_BY>'
+
+    def __init__(self, *args, **kwargs):
+        super(Command, self).__init__(*args, **kwargs)
+        self._num_assigned = 0
+
+    def handle(self, *args, **options):
+        """
+        Execute the command.
+
+        Args:
+            course_id (unicode): The ID of the course containing the item.
+            item_id (unicode): The ID of the peer assessed item.
+            must_grade (int): The number of submissions each student must assess.
+            must_be_graded_by (int): The number of assessments each submission requires.
+
+        Raises:
+            CommandError
+        """
+        if len(args) != 4:
+            raise CommandError(u'Usage: assign_peer_reviews {}'.format(self.args))
+
+        course_id, item_id = unicode(args[0]), unicode(args[1])
+        try:
+            must_grade, must_be_graded_by = int(args[2]), int(args[3])
+        except ValueError:
+            raise CommandError(u'The peer assessment requirements must be integers')
+
+        if must_grade < 1 or must_be_graded_by < 1:
+            raise CommandError(u'The peer assessment requirements must be positive')
+
+        self._num_assigned = peer_api.assign_peer_reviews(
+            course_id, item_id, must_grade, must_be_graded_by
+        )
+        print u"Assigned {num} peer reviews for {item} in {course}".format(
+            num=self._num_assigned, item=item_id, course=course_id
+        )
+
+    @property
+    def num_assigned(self):
+        """
+        Return the number of peer reviews assigned.
+        This is used for testing the command.
+
+        Returns:
+            int
+        """
+        return self._num_assigned
@@ -0,0 +1,91 @@
+"""
+Store the points of assessments created before the points were stored.
+"""
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db.models import Sum
+
+from openassessment.assessment.models import Assessment, AssessmentPart, Rubric
+from openassessment.assessment.serializers import RubricSerializer
+
+
+class Command(BaseCommand):
+    """
+    Fill in `Assessment.stored_points_earned` and
+    `Assessment.stored_points_possible` for assessments that don't have them.
+
+    New assessments store their points when they are created, so this only
+    needs to be run once after migrating existing data.  Assessments are
+    worked through in batches, with the points earned summed by the database
+    and the points possible taken from the rubric cache.  It is safe to
+    interrupt and run again.
+    """
+
+    help = 'Store the points earned and possible on existing assessments'
+
+    # Number of assessments to update at a time
+    BATCH_SIZE = 1000
+
+    def __init__(self, *args, **kwargs):
+        super(Command, self).__init__(*args, **kwargs)
+        self._num_updated = 0
+
+    def handle(self, *args, **options):
+        """
+        Execute the command.
+        """
+        self._num_updated = 0
+        rubric_cache = dict()
+        last_id = 0
+
+        while True:
+            batch = list(
+                Assessment.objects.filter(
+                    id__gt=last_id,
+                    stored_points_earned__isnull=True,
+                ).order_by('id').values_list('id', 'rubric_id')[:self.BATCH_SIZE]
+            )
+            if not batch:
+                break
+            last_id = batch[-1][0]
+
+            points_earned = dict(
+                AssessmentPart.objects.filter(
+                    assessment__in=[assessment_id for assessment_id, _ in batch]
+                ).order_by().values('assessment').annotate(
+                    points=Sum('option__points')
+                ).values_list('assessment', 'points')
+            )
+
+            points_possible = dict()
+            for rubric in Rubric.objects.filter(id__in=set(rubric_id for _, rubric_id in batch)):
+                rubric_dict = RubricSerializer.serialized_from_cache(rubric, local_cache=rubric_cache)
+                points_possible[rubric.id] = rubric_dict["points_possible"]
+
+            # Most assessments share a few scores, so we update all the
+            # assessments with the same points at once.
+            assessments_by_points = defaultdict(list)
+            for assessment_id, rubric_id in batch:
+                points = (points_earned.get(assessment_id) or 0, points_possible[rubric_id])
+                assessments_by_points[points].append(assessment_id)
+
+            for (earned, possible), assessment_ids in assessments_by_points.iteritems():
+                Assessment.objects.filter(id__in=assessment_ids).update(
+                    stored_points_earned=earned,
+                    stored_points_possible=possible,
+                )
+            self._num_updated += len(batch)
+
+        print u"Stored the points of {num} assessments".format(num=self._num_updated)
+
+    @property
+    def num_updated(self):
+        """
+        Return the number of assessments updated.
+        This is used for testing the command.
+
+        Returns:
+            int
+        """
+        return self._num_updated
@@ -0,0 +1,48 @@
+"""
+Release expired leases on submissions handed out for peer assessment.
+"""
+from django.core.management.base import BaseCommand
+
+from openassessment.assessment import peer_api
+
+
+class Command(BaseCommand):
+    """
+    Return submissions whose peer assessment lease has expired to the peer queue.
+
+    Leases are not expired while handing out submissions, so this should
+    be run periodically (for example, every few minutes from cron).
+    Reports the number of leases released for each course and item.
+    """
+
+    help = 'Release expired peer assessment leases'
+
+    def __init__(self, *args, **kwargs):
+        super(Command, self).__init__(*args, **kwargs)
+        self._released_counts = dict()
+
+    def handle(self, *args, **options):
+        """
+        Execute the command.
+        """
+        self._released_counts = peer_api.release_expired_leases()
+
+        for (course_id, item_id), num_released in sorted(self._released_counts.iteritems()):
+            print u"Released {num} leases for {item} in {course}".format(
+                num=num_released, item=item_id, course=course_id
+            )
+
+        print u"Released {num} expired leases".format(
+            num=sum(self._released_counts.values())
+        )
+
+    @property
+    def released_counts(self):
+        """
+        Return the number of leases released for each (course_id, item_id).
+        This is used for testing the command.
+
+        Returns:
+            dict
+        """
+        return self._released_counts
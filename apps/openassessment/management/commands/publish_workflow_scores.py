@@ -0,0 +1,42 @@
+"""
+Publish the scores of finished workflows that are waiting to be recorded.
+"""
+from django.core.management.base import BaseCommand
+
+from openassessment.workflow import api as workflow_api
+
+
+class Command(BaseCommand):
+    """
+    Record the scores of finished workflows in the submissions API, and
+    emit their score events.
+
+    Workflows that are done queue their scores instead of recording them
+    while the student waits, so this should be run frequently (for example,
+    every minute from cron).  Students see their queued score in the
+    meantime, but it is not reported to the LMS until it is published.
+    """
+
+    help = 'Publish the scores of finished workflows'
+
+    def __init__(self, *args, **kwargs):
+        super(Command, self).__init__(*args, **kwargs)
+        self._num_published = 0
+
+    def handle(self, *args, **options):
+        """
+        Execute the command.
+        """
+        self._num_published = workflow_api.publish_scores()
+        print u"Published {num} workflow scores".format(num=self._num_published)
+
+    @property
+    def num_published(self):
+        """
+        Return the number of scores published.
+        This is used for testing the command.
+
+        Returns:
+            int
+        """
+        return self._num_published
@@ -0,0 +1,125 @@
+"""
+Rebuild the peer assessment queue and assessment counts from the peer workflow tables.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from openassessment.assessment.models import PeerWorkflow, PeerWorkflowItem
+from openassessment.assessment.peer_api import TIME_LIMIT
+
+
+class Command(BaseCommand):
+    """
+    Recalculate the peer queue count (`PeerWorkflow.review_count`), the
+    assessment counts (`PeerWorkflow.num_assessed` and
+    `PeerWorkflow.num_assessments_received`) and the lease flags of peer
+    workflow items from the existing workflow items.
+
+    The peer API keeps these current as assessments are handed out and
+    completed, and the counts of existing workflows are filled in by
+    migration 0014, so this only needs to be run to detect and repair drift.
+    If no course and item are given, every peer workflow is rebuilt.
+    """
+
+    help = 'Rebuild the peer assessment queue and assessment counts'
+    args = '[<COURSE_ID> <ITEM_ID>]'
+
+    # Number of workflows to load into memory at a time
+    BATCH_SIZE = 1000
+
+    def __init__(self, *args, **kwargs):
+        super(Command, self).__init__(*args, **kwargs)
+        self._num_repaired = 0
+
+    def handle(self, *args, **options):
+        """
+        Execute the command.
+
+        Args:
+            course_id (unicode): Optional ID of the course to rebuild.
+            item_id (unicode): Optional ID of the item in the course to rebuild.
+        """
+        if len(args) not in (0, 2):
+            raise CommandError('Usage: rebuild_peer_queue [<COURSE_ID> <ITEM_ID>]')
+
+        workflows = PeerWorkflow.objects.all()
+        items = PeerWorkflowItem.objects.all()
+        if args:
+            course_id, item_id = unicode(args[0]), unicode(args[1])
+            workflows = workflows.filter(course_id=course_id, item_id=item_id)
+            items = items.filter(author__course_id=course_id, author__item_id=item_id)
+
+        # Only open, unexpired workflow items are leased.
+        now = timezone.now()
+        timeout = now - TIME_LIMIT
+        items.filter(
+            Q(assessment__isnull=False) |
+            Q(lease_expires_at__lte=now) |
+            Q(lease_expires_at__isnull=True, started_at__lte=timeout),
+            leased=True
+        ).update(leased=False)
+
+        # Workflow items handed out before leases were tracked
+        # expire at the end of the lease time limit.
+        unexpired_items = items.filter(
+            assessment__isnull=True, lease_expires_at__isnull=True,
+            preassigned=False, started_at__gt=timeout
+        )
+        for item in unexpired_items:
+            item.leased = True
+            item.lease_expires_at = item.started_at + TIME_LIMIT
+            item.save()
+
+        # Count completed, leased and pre-assigned items for each author,
+        # and completed items for each scorer and author
+        completed_items = items.filter(assessment__isnull=False)
+        expected_counts = {
+            'review_count': dict(
+                items.filter(
+                    Q(assessment__isnull=False) | Q(leased=True) | Q(preassigned=True)
+                ).values_list('author').annotate(Count('id')).order_by()
+            ),
+            'num_assessed': dict(
+                completed_items.values_list('scorer').annotate(Count('id')).order_by()
+            ),
+            'num_assessments_received': dict(
+                completed_items.values_list('author').annotate(Count('id')).order_by()
+            ),
+        }
+        fields = expected_counts.keys()
+
+        # Update the workflows whose counts have drifted
+        self._num_repaired = 0
+        last_id = 0
+        while True:
+            batch = list(
+                workflows.filter(id__gt=last_id).order_by('id').values('id', *fields)[:self.BATCH_SIZE]
+            )
+            if not batch:
+                break
+
+            for workflow in batch:
+                drifted = dict(
+                    (field, expected_counts[field].get(workflow['id'], 0))
+                    for field in fields
+                    if workflow[field] != expected_counts[field].get(workflow['id'], 0)
+                )
+                if drifted:
+                    PeerWorkflow.objects.filter(pk=workflow['id']).update(**drifted)
+                    self._num_repaired += 1
+
+            last_id = batch[-1]['id']
+
+        print u"Rebuilt peer queue; repaired {num} workflows".format(num=self._num_repaired)
+
+    @property
+    def num_repaired(self):
+        """
+        Return the number of workflows whose counts were repaired.
+        This is used for testing the command.
+
+        Returns:
+            int
+        """
+        return self._num_repaired
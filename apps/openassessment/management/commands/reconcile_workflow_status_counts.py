@@ -0,0 +1,75 @@
+"""
+Fix the stored counts of workflows in each status.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from openassessment.workflow.models import AssessmentWorkflow, AssessmentWorkflowStatusCount
+
+
+class Command(BaseCommand):
+    """
+    Count the workflows of each item in each status again, and fix the
+    stored counts that have drifted from them.
+
+    The counts are kept up to date as workflows are created and change
+    status, but changes made directly to the database (or through the
+    Django admin's bulk actions) are missed.  Pass a course ID and item ID
+    to reconcile a single item, or nothing to reconcile every item.
+    """
+
+    help = 'Fix the stored counts of workflows in each status'
+    args = '[<COURSE_ID> <ITEM_ID>]'
+
+    def __init__(self, *args, **kwargs):
+        super(Command, self).__init__(*args, **kwargs)
+        self._num_fixed = 0
+
+    def handle(self, *args, **options):
+        """
+        Execute the command.
+
+        Args:
+            course_id (unicode): The ID of the course containing the item (optional).
+            item_id (unicode): The ID of the item (optional).
+
+        Raises:
+            CommandError
+        """
+        if len(args) == 2:
+            items = [(unicode(args[0]), unicode(args[1]))]
+        elif not args:
+            items = self._all_items()
+        else:
+            raise CommandError(u'Usage: reconcile_workflow_status_counts {}'.format(self.args))
+
+        self._num_fixed = 0
+        for course_id, item_id in items:
+            self._num_fixed += AssessmentWorkflowStatusCount.reconcile(course_id, item_id)
+
+        print u"Fixed {num} status counts for {num_items} items".format(
+            num=self._num_fixed, num_items=len(items)
+        )
+
+    @staticmethod
+    def _all_items():
+        """
+        Return the (course ID, item ID) of every item with workflows or counts.
+        """
+        items = set(
+            AssessmentWorkflow.objects.order_by().values_list('course_id', 'item_id').distinct()
+        )
+        items.update(
+            AssessmentWorkflowStatusCount.objects.order_by().values_list('course_id', 'item_id').distinct()
+        )
+        return sorted(items)
+
+    @property
+    def num_fixed(self):
+        """
+        Return the number of status counts that were fixed.
+        This is used for testing the command.
+
+        Returns:
+            int
+        """
+        return self._num_fixed
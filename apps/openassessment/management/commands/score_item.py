@@ -0,0 +1,80 @@
+"""
+Score every student waiting for a peer assessment score on an item.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from openassessment.workflow import api as workflow_api
+
+
+class Command(BaseCommand):
+    """
+    Score the workflows of an item that are waiting for peer assessments.
+
+    Students who have finished their own assessments are otherwise only
+    scored when they next view the problem.  Running this once an item's
+    peer assessments are due gives everyone whose submission has been
+    assessed enough times their score, in bulk.
+
+    The requirements must match the peer assessment settings of the item.
+    """
+
+    help = 'Score the workflows of an item that are waiting for peer assessments'
+    args = '<COURSE_ID> <ITEM_ID> <MUST_GRADE> <MUST_BE_GRADED_BY>'
+
+    def __init__(self, *args, **kwargs):
+        super(Command, self).__init__(*args, **kwargs)
+        self._num_scored = 0
+
+    def handle(self, *args, **options):
+        """
+        Execute the command.
+
+        Args:
+            course_id (unicode): The ID of the course containing the item.
+            item_id (unicode): The ID of the peer assessed item.
+            must_grade (int): The number of submissions each student must assess.
+            must_be_graded_by (int): The number of assessments a submission requires.
+
+        Raises:
+            CommandError
+        """
+        if len(args) != 4:
+            raise CommandError(u'Usage: score_item {}'.format(self.args))
+
+        course_id, item_id = unicode(args[0]), unicode(args[1])
+        try:
+            must_grade, must_be_graded_by = int(args[2]), int(args[3])
+        except ValueError:
+            raise CommandError(u'The peer assessment requirements must be integers')
+
+        if must_grade < 1 or must_be_graded_by < 1:
+            raise CommandError(u'The peer assessment requirements must be positive')
+
+        requirements = {
+            "peer": {
+                "must_grade": must_grade,
+                "must_be_graded_by": must_be_graded_by,
+            }
+        }
+
+        start = time.time()
+        self._num_scored = workflow_api.score_item(course_id, item_id, requirements)
+        seconds = time.time() - start
+
+        print u"Scored {num} workflows for {item} in {course} in {seconds:.2f} seconds ({rate:.1f} per second)".format(
+            num=self._num_scored, item=item_id, course=course_id,
+            seconds=seconds, rate=(self._num_scored / seconds if seconds else 0)
+        )
+
+    @property
+    def num_scored(self):
+        """
+        Return the number of workflows scored.
+        This is used for testing the command.
+
+        Returns:
+            int
+        """
+        return self._num_scored
@@ -0,0 +1,53 @@
+"""
+Tests for the management command that pre-assigns peer reviews.
+"""
+from collections import defaultdict
+
+from django.core.management.base import CommandError
+
+from openassessment.test_utils import CacheResetTest, create_submission
+from openassessment.assessment.models import PeerWorkflow, PeerWorkflowItem
+from openassessment.management.commands import assign_peer_reviews
+
+
+class AssignPeerReviewsTest(CacheResetTest):
+
+    def test_assign_peer_reviews(self):
+        for student_id in ["Tim", "Bob", "Sally", "Jim", "Buffy"]:
+            create_submission(student_id)
+
+        cmd = assign_peer_reviews.Command()
+        cmd.handle("test_course", "test_item", "2", "2")
+        self.assertEqual(cmd.num_assigned, 10)
+
+        # Everyone has two distinct peers to review, and is reviewed twice
+        assigned = defaultdict(set)
+        for item in PeerWorkflowItem.objects.all():
+            self.assertTrue(item.preassigned)
+            self.assertFalse(item.leased)
+            self.assertNotEqual(item.scorer_id, item.author_id)
+            assigned[item.scorer_id].add(item.author_id)
+        self.assertEqual(len(assigned), 5)
+        for authors in assigned.values():
+            self.assertEqual(len(authors), 2)
+        for workflow in PeerWorkflow.objects.all():
+            self.assertEqual(workflow.review_count, 2)
+
+        # Everything has been assigned, so running again assigns nothing
+        cmd.handle("test_course", "test_item", "2", "2")
+        self.assertEqual(cmd.num_assigned, 0)
+
+    def test_no_submissions(self):
+        cmd = assign_peer_reviews.Command()
+        cmd.handle("test_course", "test_item", "2", "2")
+        self.assertEqual(cmd.num_assigned, 0)
+
+    def test_invalid_arguments(self):
+        cmd = assign_peer_reviews.Command()
+        for args in [
+            ("test_course", "test_item"),
+            ("test_course", "test_item", "two", "2"),
+            ("test_course", "test_item", "0", "2"),
+        ]:
+            with self.assertRaises(CommandError):
+                cmd.handle(*args)
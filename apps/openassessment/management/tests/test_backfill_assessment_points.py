@@ -0,0 +1,72 @@
+"""
+Tests for the management command that stores the points of existing assessments.
+"""
+from openassessment.test_utils import CacheResetTest, create_submission
+from openassessment.assessment import peer_api, self_api
+from openassessment.assessment.models import Assessment
+from openassessment.management.commands import backfill_assessment_points
+
+
+class BackfillAssessmentPointsTest(CacheResetTest):
+
+    RUBRIC = {
+        'criteria': [
+            {
+                'name': "clarity",
+                'prompt': "How clear was it?",
+                'options': [
+                    {'name': "unclear", 'points': 0, 'explanation': ""},
+                    {'name': "clear", 'points': 1, 'explanation': ""},
+                ]
+            },
+            {
+                'name': "accuracy",
+                'prompt': "How accurate was it?",
+                'options': [
+                    {'name': "wrong", 'points': 0, 'explanation': ""},
+                    {'name': "close", 'points': 2, 'explanation': ""},
+                    {'name': "right", 'points': 5, 'explanation': ""},
+                ]
+            },
+        ]
+    }
+
+    def test_backfill(self):
+        tim_uuid = create_submission("Tim")
+        bob_uuid = create_submission("Bob")
+        sally_uuid = create_submission("Sally")
+        peer_api.create_peer_workflow_item(bob_uuid, tim_uuid)
+        peer_api.create_assessment(
+            bob_uuid, "Bob", {"clarity": "clear", "accuracy": "close"}, dict(), "", self.RUBRIC, 1
+        )
+        peer_api.create_peer_workflow_item(sally_uuid, tim_uuid)
+        peer_api.create_assessment(
+            sally_uuid, "Sally", {"clarity": "unclear", "accuracy": "right"}, dict(), "", self.RUBRIC, 1
+        )
+        self_api.create_assessment(tim_uuid, "Tim", {"clarity": "clear", "accuracy": "right"}, self.RUBRIC)
+
+        # New assessments store their points
+        stored_points = dict(
+            (assessment.scorer_id, (assessment.stored_points_earned, assessment.stored_points_possible))
+            for assessment in Assessment.objects.all()
+        )
+        self.assertEqual(stored_points, {"Bob": (3, 6), "Sally": (5, 6), "Tim": (6, 6)})
+
+        # Simulate assessments created before the points were stored
+        Assessment.objects.update(stored_points_earned=None, stored_points_possible=None)
+        for assessment in Assessment.objects.all():
+            self.assertEqual((assessment.points_earned, assessment.points_possible), stored_points[assessment.scorer_id])
+
+        cmd = backfill_assessment_points.Command()
+        cmd.BATCH_SIZE = 2
+        cmd.handle()
+        self.assertEqual(cmd.num_updated, 3)
+        for assessment in Assessment.objects.all():
+            self.assertEqual(
+                (assessment.stored_points_earned, assessment.stored_points_possible),
+                stored_points[assessment.scorer_id]
+            )
+
+        # Assessments with stored points are left alone
+        cmd.handle()
+        self.assertEqual(cmd.num_updated, 0)
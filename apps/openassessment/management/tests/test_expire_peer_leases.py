@@ -0,0 +1,49 @@
+"""
+Tests for the management command that releases expired peer leases.
+"""
+import datetime
+
+from django.utils import timezone
+
+from openassessment.test_utils import CacheResetTest, create_submission
+from openassessment.assessment import peer_api
+from openassessment.assessment.models import PeerWorkflow, PeerWorkflowItem
+from openassessment.management.commands import expire_peer_leases
+
+
+class ExpirePeerLeasesTest(CacheResetTest):
+
+    def test_release_expired_leases(self):
+        # Leases on two items in the same course
+        tim_uuid = create_submission("Tim", item_id="first_item")
+        bob_uuid = create_submission("Bob", item_id="first_item")
+        sally_uuid = create_submission("Sally", item_id="first_item")
+        jim_uuid = create_submission("Jim", item_id="second_item")
+        buffy_uuid = create_submission("Buffy", item_id="second_item")
+        peer_api.create_peer_workflow_item(bob_uuid, tim_uuid)
+        peer_api.create_peer_workflow_item(sally_uuid, tim_uuid)
+        peer_api.create_peer_workflow_item(buffy_uuid, jim_uuid)
+
+        # Nothing has expired yet
+        cmd = expire_peer_leases.Command()
+        cmd.handle()
+        self.assertEqual(cmd.released_counts, {})
+
+        # Expire all the leases
+        PeerWorkflowItem.objects.update(
+            lease_expires_at=timezone.now() - datetime.timedelta(minutes=1)
+        )
+        cmd.handle()
+        self.assertEqual(cmd.released_counts, {
+            ("test_course", "first_item"): 2,
+            ("test_course", "second_item"): 1,
+        })
+
+        # The submissions are back in the queue
+        self.assertEqual(PeerWorkflow.objects.get(submission_uuid=tim_uuid).review_count, 0)
+        self.assertEqual(PeerWorkflow.objects.get(submission_uuid=jim_uuid).review_count, 0)
+        self.assertFalse(PeerWorkflowItem.objects.filter(leased=True).exists())
+
+        # Released leases aren't released again
+        cmd.handle()
+        self.assertEqual(cmd.released_counts, {})
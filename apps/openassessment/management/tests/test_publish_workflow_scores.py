@@ -0,0 +1,27 @@
+"""
+Tests for the management command that publishes the scores of finished workflows.
+"""
+from openassessment.test_utils import CacheResetTest, create_submission
+from openassessment.management.commands import publish_workflow_scores
+from openassessment.workflow.models import AssessmentWorkflow, AssessmentWorkflowScoreOutbox
+from submissions import api as sub_api
+
+
+class PublishWorkflowScoresTest(CacheResetTest):
+
+    def test_publish_workflow_scores(self):
+        uuids = [create_submission(student_id) for student_id in ["Tim", "Bob"]]
+        AssessmentWorkflowScoreOutbox.add_scores([
+            (workflow, {"points_earned": 1, "points_possible": 2})
+            for workflow in AssessmentWorkflow.objects.all()
+        ])
+
+        cmd = publish_workflow_scores.Command()
+        cmd.handle()
+        self.assertEqual(cmd.num_published, 2)
+        for uuid in uuids:
+            self.assertEqual(sub_api.get_latest_score_for_submission(uuid)['points_earned'], 1)
+
+        # Published scores aren't published again
+        cmd.handle()
+        self.assertEqual(cmd.num_published, 0)
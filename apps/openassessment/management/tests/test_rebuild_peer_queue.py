@@ -0,0 +1,68 @@
+"""
+Tests for the management command that rebuilds the peer assessment queue.
+"""
+import datetime
+
+from django.utils import timezone
+
+from openassessment.test_utils import CacheResetTest, RUBRIC, create_submission
+from openassessment.assessment import peer_api
+from openassessment.assessment.models import PeerWorkflow, PeerWorkflowItem
+from openassessment.management.commands import rebuild_peer_queue
+
+
+class RebuildPeerQueueTest(CacheResetTest):
+
+    def test_rebuild_repairs_drift(self):
+        tim_uuid = create_submission("Tim")
+        bob_uuid = create_submission("Bob")
+        sally_uuid = create_submission("Sally")
+
+        # Bob has an open lease on Tim's submission,
+        # and Sally's lease on Bob's submission has expired
+        peer_api.create_peer_workflow_item(bob_uuid, tim_uuid)
+        peer_api.create_peer_workflow_item(sally_uuid, bob_uuid)
+        PeerWorkflowItem.objects.filter(submission_uuid=bob_uuid).update(
+            started_at=timezone.now() - datetime.timedelta(days=1)
+        )
+
+        # Simulate data from before the queue was maintained
+        PeerWorkflow.objects.update(review_count=0)
+        PeerWorkflowItem.objects.update(leased=False, lease_expires_at=None)
+
+        cmd = rebuild_peer_queue.Command()
+        cmd.handle("test_course", "test_item")
+        self.assertEqual(cmd.num_repaired, 1)
+
+        self.assertEqual(PeerWorkflow.objects.get(submission_uuid=tim_uuid).review_count, 1)
+        self.assertEqual(PeerWorkflow.objects.get(submission_uuid=bob_uuid).review_count, 0)
+        self.assertTrue(PeerWorkflowItem.objects.get(submission_uuid=tim_uuid).leased)
+        self.assertIsNotNone(PeerWorkflowItem.objects.get(submission_uuid=tim_uuid).lease_expires_at)
+        self.assertFalse(PeerWorkflowItem.objects.get(submission_uuid=bob_uuid).leased)
+
+        # Running again finds nothing to repair
+        cmd.handle()
+        self.assertEqual(cmd.num_repaired, 0)
+
+    def test_rebuild_repairs_assessment_counts(self):
+        tim_uuid = create_submission("Tim")
+        bob_uuid = create_submission("Bob")
+
+        # Bob assesses Tim's submission
+        peer_api.create_peer_workflow_item(bob_uuid, tim_uuid)
+        peer_api.create_assessment(
+            bob_uuid, "Bob", {"clarity": "clear"}, {}, "", RUBRIC, 1
+        )
+
+        # Simulate data from before the counts were maintained
+        PeerWorkflow.objects.update(num_assessed=0, num_assessments_received=0)
+
+        cmd = rebuild_peer_queue.Command()
+        cmd.handle()
+        self.assertEqual(cmd.num_repaired, 2)
+        self.assertEqual(PeerWorkflow.objects.get(submission_uuid=bob_uuid).num_assessed, 1)
+        self.assertEqual(PeerWorkflow.objects.get(submission_uuid=tim_uuid).num_assessments_received, 1)
+
+        # Running again finds nothing to repair
+        cmd.handle()
+        self.assertEqual(cmd.num_repaired, 0)
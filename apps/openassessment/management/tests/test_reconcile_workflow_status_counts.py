@@ -0,0 +1,55 @@
+"""
+Tests for the management command that fixes the stored counts of workflows in each status.
+"""
+from django.core.management.base import CommandError
+
+from openassessment.test_utils import CacheResetTest, create_submission
+from openassessment.management.commands import reconcile_workflow_status_counts
+from openassessment.workflow import api as workflow_api
+from openassessment.workflow.models import AssessmentWorkflow, AssessmentWorkflowStatusCount
+
+
+class ReconcileWorkflowStatusCountsTest(CacheResetTest):
+
+    def test_reconcile(self):
+        for student_id in ["Tim", "Bob", "Sally"]:
+            create_submission(student_id)
+        create_submission("Tim", item_id="other_item")
+
+        # Updating the workflows directly isn't counted
+        AssessmentWorkflow.objects.filter(item_id="test_item").exclude(
+            submission_uuid=create_submission("Jane")
+        ).update(status="waiting")
+        AssessmentWorkflowStatusCount.objects.filter(item_id="other_item").delete()
+
+        cmd = reconcile_workflow_status_counts.Command()
+        cmd.handle()
+        self.assertEqual(cmd.num_fixed, 3)
+        self.assertEqual(
+            AssessmentWorkflowStatusCount.counts_for_item("test_course", "test_item"),
+            {"peer": 1, "waiting": 3}
+        )
+        self.assertEqual(
+            AssessmentWorkflowStatusCount.counts_for_item("test_course", "other_item"),
+            {"peer": 1}
+        )
+
+        # Once the counts are right, nothing changes
+        cmd.handle()
+        self.assertEqual(cmd.num_fixed, 0)
+
+    def test_reconcile_one_item(self):
+        create_submission("Tim")
+        create_submission("Tim", item_id="other_item")
+        AssessmentWorkflowStatusCount.objects.all().update(count=5)
+
+        cmd = reconcile_workflow_status_counts.Command()
+        cmd.handle("test_course", "test_item")
+        self.assertEqual(cmd.num_fixed, 1)
+        self.assertEqual(workflow_api.get_status_counts("test_course", "test_item")[0]["count"], 1)
+        self.assertEqual(workflow_api.get_status_counts("test_course", "other_item")[0]["count"], 5)
+
+    def test_invalid_arguments(self):
+        cmd = reconcile_workflow_status_counts.Command()
+        with self.assertRaises(CommandError):
+            cmd.handle("test_course")
@@ -0,0 +1,68 @@
+"""
+Tests for the management command that scores the waiting workflows of an item.
+"""
+from django.core.management.base import CommandError
+
+from openassessment.test_utils import CacheResetTest, RUBRIC, create_submission
+from openassessment.assessment import peer_api
+from openassessment.management.commands import score_item
+from openassessment.workflow import api as workflow_api
+from openassessment.workflow.models import AssessmentWorkflow
+from submissions import api as sub_api
+
+
+class ScoreItemTest(CacheResetTest):
+
+    def test_score_item(self):
+        students = ["Tim", "Bob", "Sally"]
+        uuids = dict((student_id, create_submission(student_id)) for student_id in students)
+
+        # Everyone assesses everyone else
+        for student_id in students:
+            for _ in range(2):
+                peer_api.get_submission_to_assess(uuids[student_id], 2)
+                peer_api.create_assessment(
+                    uuids[student_id], student_id, {"clarity": "clear"},
+                    dict(), "", RUBRIC, 2
+                )
+
+        # Only workflows that are waiting get scored
+        AssessmentWorkflow.objects.exclude(submission_uuid=uuids["Sally"]).update(status="waiting")
+
+        cmd = score_item.Command()
+        cmd.handle("test_course", "test_item", "2", "2")
+        self.assertEqual(cmd.num_scored, 2)
+
+        # The scores are recorded once they are published
+        self.assertEqual(workflow_api.publish_scores(), 2)
+        for student_id in ["Tim", "Bob"]:
+            workflow = AssessmentWorkflow.objects.get(submission_uuid=uuids[student_id])
+            self.assertEqual(workflow.status, "done")
+            score = sub_api.get_latest_score_for_submission(uuids[student_id])
+            self.assertEqual(score['points_earned'], 1)
+            self.assertEqual(score['points_possible'], 1)
+        self.assertEqual(AssessmentWorkflow.objects.get(submission_uuid=uuids["Sally"]).status, "peer")
+        self.assertIs(sub_api.get_latest_score_for_submission(uuids["Sally"]), None)
+
+        # Scored workflows aren't scored again
+        cmd.handle("test_course", "test_item", "2", "2")
+        self.assertEqual(cmd.num_scored, 0)
+
+    def test_not_enough_assessments(self):
+        uuid = create_submission("Tim")
+        AssessmentWorkflow.objects.filter(submission_uuid=uuid).update(status="waiting")
+
+        cmd = score_item.Command()
+        cmd.handle("test_course", "test_item", "2", "2")
+        self.assertEqual(cmd.num_scored, 0)
+        self.assertEqual(AssessmentWorkflow.objects.get(submission_uuid=uuid).status, "waiting")
+
+    def test_invalid_arguments(self):
+        cmd = score_item.Command()
+        for args in [
+            ("test_course", "test_item"),
+            ("test_course", "test_item", "two", "2"),
+            ("test_course", "test_item", "0", "2"),
+        ]:
+            with self.assertRaises(CommandError):
+                cmd.handle(*args)
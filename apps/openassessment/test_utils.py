@@ -1,18 +1,224 @@
 """
 Test utilities
 """
+import re
+
+import mock
 from django.core.cache import cache
-from django.test import TestCase
+from django.core.management.color import no_style
+from django.core.management.sql import custom_sql_for_model
+from django.db import connection, transaction
+from django.db.backends import util
+from django.test import TestCase, TransactionTestCase
+
+from openassessment.workflow import api as workflow_api
+from submissions import api as sub_api
+from submissions.caching import clear_local_caches
+
+
+STUDENT_ITEM = {
+    'course_id': 'test_course',
+    'item_id': 'test_item',
+    'item_type': 'openassessment',
+}
+
+RUBRIC = {
+    'criteria': [
+        {
+            'name': "clarity",
+            'prompt': "How clear was it?",
+            'options': [
+                {'name': "unclear", 'points': 0, 'explanation': ""},
+                {'name': "clear", 'points': 1, 'explanation': ""},
+            ]
+        },
+    ]
+}
+
+
+def create_submission(student_id, **student_item):
+    """
+    Create a submission and its workflow for a student.
+
+    Args:
+        student_id (unicode): The student making the submission.
+
+    Kwargs:
+        Replace the course, item and type in `STUDENT_ITEM`.
+
+    Returns:
+        unicode: The UUID of the submission.
+
+    """
+    student_item = dict(STUDENT_ITEM, student_id=student_id, **student_item)
+    submission = sub_api.create_submission(student_item, "{}'s answer".format(student_id))
+    workflow_api.create_workflow(submission['uuid'])
+    return submission['uuid']
 
 
 class CacheResetTest(TestCase):
     """
     Test case that resets the cache before and after each test.
+
+    This includes everything cached in the process, since the
+    database is reset between tests.
     """
     def setUp(self):
         super(CacheResetTest, self).setUp()
         cache.clear()
+        clear_local_caches()
 
     def tearDown(self):
         super(CacheResetTest, self).tearDown()
         cache.clear()
+        clear_local_caches()
+
+
+class TransactionCacheResetTest(TransactionTestCase):
+    """
+    Test case that resets the cache before and after each test, for code
+    whose commits and rollbacks need to really happen.
+    """
+    def setUp(self):
+        super(TransactionCacheResetTest, self).setUp()
+        cache.clear()
+        clear_local_caches()
+
+    def tearDown(self):
+        super(TransactionCacheResetTest, self).tearDown()
+        cache.clear()
+        clear_local_caches()
+
+
+class QueryPlanTest(TransactionTestCase):
+    """
+    Test case that checks the query plans of the statements a block of
+    code executes, so that we notice when a hot query would stop using
+    an index as the tables grow.
+
+    The plans are checked using `EXPLAIN` on SQLite and MySQL; on other
+    databases, the checks are skipped.  Python's sqlite3 module commits
+    before running an `EXPLAIN`, so these tests can't run inside a
+    transaction that is rolled back.
+
+    Subclasses list the models whose indexes the plans rely on in
+    `INDEXED_MODELS`.
+    """
+
+    # Plan details that mean a query will slow down as a table grows.
+    # On SQLite, "SCAN" reads the whole table (or a whole index), and a
+    # temporary B-tree is built to sort rows that an index did not order.
+    SQLITE_PROBLEMS = re.compile(r'^SCAN |USE TEMP B-TREE')
+
+    INDEXED_MODELS = []
+
+    def setUp(self):
+        super(QueryPlanTest, self).setUp()
+        cache.clear()
+        clear_local_caches()
+        self._create_indexes()
+
+    def tearDown(self):
+        super(QueryPlanTest, self).tearDown()
+        cache.clear()
+        clear_local_caches()
+
+    def assertQueryPlansUseIndexes(self, tables, func, *args, **kwargs):
+        """
+        Call a function and check that none of the SELECT statements it
+        executes against `tables` scan a whole table or sort rows without
+        an index.
+
+        Args:
+            tables (list of str): The database tables to check.
+            func (callable): The function to call.
+            *args, **kwargs: Passed to `func`.
+
+        Returns:
+            The return value of `func`.
+
+        Raises:
+            AssertionError
+
+        """
+        statements = []
+        original_execute = util.CursorDebugWrapper.execute
+
+        def _record_execute(cursor, sql, params=()):
+            statements.append((sql, params))
+            return original_execute(cursor, sql, params)
+
+        use_debug_cursor = connection.use_debug_cursor
+        connection.use_debug_cursor = True
+        try:
+            with mock.patch.object(util.CursorDebugWrapper, 'execute', _record_execute):
+                result = func(*args, **kwargs)
+        finally:
+            connection.use_debug_cursor = use_debug_cursor
+
+        selects = [
+            (sql, params) for sql, params in statements
+            if sql.lstrip().upper().startswith('SELECT')
+            and any(table in sql for table in tables)
+        ]
+        self.assertTrue(selects, u"No queries on {} were executed".format(u", ".join(tables)))
+
+        for sql, params in selects:
+            problems = self._query_plan_problems(sql, params)
+            self.assertFalse(problems, u"{}\n\n{}".format(sql % tuple(params), u"\n".join(problems)))
+
+        return result
+
+    def _create_indexes(self):
+        """
+        Create the indexes of `INDEXED_MODELS` on SQLite, both those of
+        their fields and those in their custom SQL.
+
+        South rebuilds a SQLite table to alter it, which drops the table's
+        indexes, so the test database built by the migrations can be
+        missing indexes that the migrations create on MySQL.
+        """
+        if connection.vendor != 'sqlite':
+            return
+
+        cursor = connection.cursor()
+        for model in self.INDEXED_MODELS:
+            statements = (
+                connection.creation.sql_indexes_for_model(model, no_style()) +
+                custom_sql_for_model(model, no_style(), connection)
+            )
+            for statement in statements:
+                cursor.execute(statement.replace("CREATE INDEX", "CREATE INDEX IF NOT EXISTS", 1))
+        transaction.commit_unless_managed()
+
+    def _query_plan_problems(self, sql, params):
+        """
+        Explain a query and describe the parts of its plan that do not use an index.
+
+        Args:
+            sql (str): The query, with parameter placeholders.
+            params (list): The query parameters.
+
+        Returns:
+            list of unicode
+
+        """
+        cursor = connection.cursor()
+        problems = []
+        if connection.vendor == 'sqlite':
+            cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+            problems = [
+                row[-1] for row in cursor.fetchall()
+                if self.SQLITE_PROBLEMS.search(row[-1])
+            ]
+        elif connection.vendor == 'mysql':
+            cursor.execute("EXPLAIN " + sql, params)
+            columns = [column[0] for column in cursor.description]
+            for row in cursor.fetchall():
+                row = dict(zip(columns, row))
+                extra = row.get('Extra') or ''
+                if row['type'] == 'ALL':
+                    problems.append(u"Full scan of {}".format(row['table']))
+                if 'Using filesort' in extra or 'Using temporary' in extra:
+                    problems.append(u"{}: {}".format(row['table'], extra))
+        return problems
@@ -4,17 +4,23 @@ Public interface for the Assessment Workflow.
 """
 import copy
 import logging
+import time
 
 from django.db import DatabaseError
 
 from openassessment.assessment import peer_api
 from submissions import api as sub_api
-from .models import AssessmentWorkflow
-from .serializers import AssessmentWorkflowSerializer
+from submissions.caching import clears_request_cache
+from .models import AssessmentWorkflow, AssessmentWorkflowStatusCount, AssessmentWorkflowScoreOutbox
+from .serializers import AssessmentWorkflowSerializer, AssessmentWorkflowListSerializer
 
 logger = logging.getLogger(__name__)
 
 
+# The number of workflows read at a time by `get_workflows_for_item()`
+WORKFLOW_PAGE_SIZE = 500
+
+
 class AssessmentWorkflowError(Exception):
     """An error that occurs during workflow actions.
 
@@ -58,6 +64,7 @@ class AssessmentWorkflowNotFoundError(AssessmentWorkflowError):
     pass
 
 
+@clears_request_cache
 def create_workflow(submission_uuid):
     """Begins a new assessment workflow.
 
@@ -215,6 +222,7 @@ def get_workflow_for_submission(submission_uuid, assessment_requirements):
     return update_from_assessments(submission_uuid, assessment_requirements)
 
 
+@clears_request_cache
 def update_from_assessments(submission_uuid, assessment_requirements):
     """Update our workflow status based on the status of peer and self assessments.
 
@@ -226,7 +234,9 @@ def update_from_assessments(submission_uuid, assessment_requirements):
     This is a little wonky from a REST, get-doesn't-change-state point of view,
     except that what's stored in the `AssessmentWorkflow` isn't the canonical
     true value -- it's just the most recently known state of it based on the
-    last known requirments. For now, we have to query for truth.
+    last known requirments. The peer and self APIs are only queried again
+    when an assessment has been created for or by the submission, or the
+    requirements have changed, since the status was last updated.
 
     Args:
         submission_uuid (str): Identifier for the submission the
@@ -298,6 +308,81 @@ def update_from_assessments(submission_uuid, assessment_requirements):
     return _serialized_with_details(workflow, assessment_requirements)
 
 
+def get_workflows_for_item(course_id, item_id, assessment_requirements, page_size=WORKFLOW_PAGE_SIZE):
+    """Iterate over the workflows for an item in a course, without changing them.
+
+    Unlike `get_workflow_for_submission()`, this never saves anything: the
+    status and `status_details` of each workflow are worked out again from
+    the assessments when something may have changed them, as
+    `update_from_assessments()` would, but workflows that could be scored
+    are reported as `waiting` until they are.
+
+    The workflows are read a page at a time, in the order they were created,
+    and each page takes a fixed number of queries however large it is, so
+    this can be used to list every workflow for an item.
+
+    Args:
+        course_id (unicode): The ID of the course.
+        item_id (unicode): The ID of the item in the course.
+        assessment_requirements (dict): As for `get_workflow_for_submission()`.
+
+    Kwargs:
+        page_size (int): The number of workflows to read at a time.
+
+    Yields:
+        dict: Assessment workflow information, as returned by
+            `get_workflow_for_submission()`.
+
+    Raises:
+        AssessmentWorkflowInternalError: Unexpected internal error, such as a
+            database configuration problem.
+
+    Examples:
+        >>> for workflow in get_workflows_for_item(
+        ...     "ora2/1/1", "peer-assessment-problem",
+        ...     {"peer": {"must_grade": 5, "must_be_graded_by": 3}}
+        ... ):
+        ...     print workflow["submission_uuid"], workflow["status"]
+        ...
+        222bdf3d-a88e-11e3-859e-040ccee02800 peer
+        3c1c4ae0-a88e-11e3-9ff4-040ccee02800 done
+
+    """
+    last_id = 0
+    while True:
+        # Page through the workflows by ID, rather than by offset, so that
+        # reading each page is as quick as reading the first.
+        try:
+            workflows = list(
+                AssessmentWorkflow.objects.filter(
+                    course_id=course_id, item_id=item_id, id__gt=last_id
+                ).order_by('id')[:page_size]
+            )
+            AssessmentWorkflow.read_from_assessments(workflows, assessment_requirements)
+            scores = sub_api.get_latest_scores_for_submissions(
+                [workflow.submission_uuid for workflow in workflows]
+            )
+            scores.update(AssessmentWorkflowScoreOutbox.pending_scores([
+                workflow.submission_uuid for workflow in workflows
+                if workflow.status == AssessmentWorkflow.STATUS.done
+                and workflow.submission_uuid not in scores
+            ]))
+        except (DatabaseError, peer_api.PeerAssessmentError, sub_api.SubmissionError):
+            err_msg = u"Could not get the workflows for course {} item {}".format(course_id, item_id)
+            logger.exception(err_msg)
+            raise AssessmentWorkflowInternalError(err_msg)
+
+        for workflow in workflows:
+            data_dict = AssessmentWorkflowListSerializer(workflow).data
+            data_dict["score"] = scores.get(workflow.submission_uuid)
+            data_dict["status_details"] = workflow.status_details(assessment_requirements)
+            yield data_dict
+
+        if len(workflows) < page_size:
+            return
+        last_id = workflows[-1].id
+
+
 def get_status_counts(course_id, item_id):
     """
     Count how many workflows have each status, for a given item in a course.
@@ -319,18 +404,105 @@ def get_status_counts(course_id, item_id):
         ]
 
     """
+    counts = AssessmentWorkflowStatusCount.counts_for_item(course_id, item_id)
     return [
-        {
-            "status": status,
-            "count": AssessmentWorkflow.objects.filter(
-                status=status,
-                course_id=course_id,
-                item_id=item_id,
-            ).count()
-        } for status in AssessmentWorkflow.STATUS_VALUES
+        {"status": status, "count": counts.get(status, 0)}
+        for status in AssessmentWorkflow.STATUS_VALUES
     ]
 
 
+@clears_request_cache
+def score_item(course_id, item_id, assessment_requirements):
+    """
+    Score every student waiting for a score on an item whose submission
+    has received enough peer assessments.
+
+    Students are usually scored when they next view the problem, which
+    updates their workflow.  This scores all of them at once instead, using
+    a few queries for each batch of workflows rather than several for each
+    student, so it can be run for an item after its peer assessments are due.
+    As when a student is scored, the scores are recorded by `publish_scores()`.
+
+    Args:
+        course_id (unicode): The ID of the course.
+        item_id (unicode): The ID of the item in the course.
+        assessment_requirements (dict): The requirements of the item, as for
+            `update_from_assessments()`.
+
+    Returns:
+        int: The number of workflows that were scored.
+
+    Raises:
+        AssessmentWorkflowInternalError: Unexpected internal error, such as the
+            submissions app not being available or a database configuation
+            problem.
+
+    Example usage:
+        >>> score_item("ora2/1/1", "peer-assessment-problem", {"peer": {"must_grade": 5, "must_be_graded_by": 3}})
+        43
+
+    """
+    start = time.time()
+    try:
+        num_scored = AssessmentWorkflow.score_waiting(course_id, item_id, assessment_requirements)
+    except (DatabaseError, peer_api.PeerAssessmentError, sub_api.SubmissionError) as exc:
+        err_msg = u"Could not score item {} in course {} due to error: {}".format(item_id, course_id, exc)
+        logger.exception(err_msg)
+        raise AssessmentWorkflowInternalError(err_msg)
+
+    seconds = time.time() - start
+    logger.info(
+        u"Scored {num} workflows for item {item_id} in course {course_id} "
+        u"in {seconds:.2f} seconds ({rate:.1f} workflows per second)".format(
+            num=num_scored, item_id=item_id, course_id=course_id, seconds=seconds,
+            rate=(num_scored / seconds if seconds else 0)
+        )
+    )
+    return num_scored
+
+
+def publish_scores():
+    """
+    Publish the scores of workflows that are done, but whose scores are
+    still waiting to be recorded in the submissions API.
+
+    Scores aren't recorded in the request that finishes a workflow: they are
+    queued in the same commit, and this records them (and emits their score
+    events) in batches.  Until then, the workflow reports the queued score.
+    Each score is published exactly once, even if this is run by several
+    processes at the same time.  A score that can't be recorded is logged
+    and tried again by the next few calls, without holding up the others.
+
+    Returns:
+        int: The number of scores that were published.
+
+    Raises:
+        AssessmentWorkflowInternalError: Unexpected internal error, such as the
+            submissions app not being available or a database configuation
+            problem.
+
+    Example usage:
+        >>> publish_scores()
+        12
+
+    """
+    start = time.time()
+    try:
+        num_published = AssessmentWorkflowScoreOutbox.publish_pending()
+    except DatabaseError as exc:
+        err_msg = u"Could not publish workflow scores due to error: {}".format(exc)
+        logger.exception(err_msg)
+        raise AssessmentWorkflowInternalError(err_msg)
+
+    seconds = time.time() - start
+    logger.info(
+        u"Published {num} workflow scores in {seconds:.2f} seconds".format(
+            num=num_published, seconds=seconds
+        )
+    )
+    return num_published
+
+
 def _get_workflow_model(submission_uuid):
     """Return the `AssessmentWorkflow` model for a given `submission_uuid`.
 
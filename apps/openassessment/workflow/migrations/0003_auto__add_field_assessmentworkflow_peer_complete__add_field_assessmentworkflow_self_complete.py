@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+import datetime
+from south.db import db
+from south.v2 import SchemaMigration
+from django.db import models
+
+
+class Migration(SchemaMigration):
+
+    def forwards(self, orm):
+        # Adding field 'AssessmentWorkflow.peer_complete'
+        db.add_column('workflow_assessmentworkflow', 'peer_complete',
+                      self.gf('django.db.models.fields.BooleanField')(default=False),
+                      keep_default=False)
+
+        # Adding field 'AssessmentWorkflow.self_complete'
+        db.add_column('workflow_assessmentworkflow', 'self_complete',
+                      self.gf('django.db.models.fields.BooleanField')(default=False),
+                      keep_default=False)
+
+        # Adding field 'AssessmentWorkflow.requirements_hash'
+        db.add_column('workflow_assessmentworkflow', 'requirements_hash',
+                      self.gf('django.db.models.fields.CharField')(default=u'', max_length=40, blank=True),
+                      keep_default=False)
+
+        # Adding field 'AssessmentWorkflow.needs_update'
+        db.add_column('workflow_assessmentworkflow', 'needs_update',
+                      self.gf('django.db.models.fields.BooleanField')(default=True),
+                      keep_default=False)
+
+
+    def backwards(self, orm):
+        # Deleting field 'AssessmentWorkflow.peer_complete'
+        db.delete_column('workflow_assessmentworkflow', 'peer_complete')
+
+        # Deleting field 'AssessmentWorkflow.self_complete'
+        db.delete_column('workflow_assessmentworkflow', 'self_complete')
+
+        # Deleting field 'AssessmentWorkflow.requirements_hash'
+        db.delete_column('workflow_assessmentworkflow', 'requirements_hash')
+
+        # Deleting field 'AssessmentWorkflow.needs_update'
+        db.delete_column('workflow_assessmentworkflow', 'needs_update')
+
+
+    models = {
+        'workflow.assessmentworkflow': {
+            'Meta': {'ordering': "['-created']", 'object_name': 'AssessmentWorkflow'},
+            'course_id': ('django.db.models.fields.CharField', [], {'max_length': '255', 'db_index': 'True'}),
+            'created': ('model_utils.fields.AutoCreatedField', [], {'default': 'datetime.datetime.now'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'item_id': ('django.db.models.fields.CharField', [], {'max_length': '255', 'db_index': 'True'}),
+            'modified': ('model_utils.fields.AutoLastModifiedField', [], {'default': 'datetime.datetime.now'}),
+            'needs_update': ('django.db.models.fields.BooleanField', [], {'default': 'True'}),
+            'peer_complete': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'requirements_hash': ('django.db.models.fields.CharField', [], {'default': "u''", 'max_length': '40', 'blank': 'True'}),
+            'self_complete': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'status': ('model_utils.fields.StatusField', [], {'default': "'peer'", 'max_length': '100', u'no_check_for_status': 'True'}),
+            'status_changed': ('model_utils.fields.MonitorField', [], {'default': 'datetime.datetime.now', u'monitor': "u'status'"}),
+            'submission_uuid': ('django.db.models.fields.CharField', [], {'unique': 'True', 'max_length': '36', 'db_index': 'True'}),
+            'uuid': ('django.db.models.fields.CharField', [], {'db_index': 'True', 'unique': 'True', 'max_length': '36', 'blank': 'True'})
+        }
+    }
+
+    complete_apps = ['workflow']
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+import datetime
+from south.db import db
+from south.v2 import SchemaMigration
+from django.db import models
+
+
+class Migration(SchemaMigration):
+
+    def forwards(self, orm):
+        # Adding model 'AssessmentWorkflowScoreOutbox'
+        db.create_table('workflow_assessmentworkflowscoreoutbox', (
+            ('id', self.gf('django.db.models.fields.AutoField')(primary_key=True)),
+            ('submission_uuid', self.gf('django.db.models.fields.CharField')(max_length=36, db_index=True)),
+            ('course_id', self.gf('django.db.models.fields.CharField')(max_length=255)),
+            ('item_id', self.gf('django.db.models.fields.CharField')(max_length=255)),
+            ('points_earned', self.gf('django.db.models.fields.PositiveIntegerField')(default=0)),
+            ('points_possible', self.gf('django.db.models.fields.PositiveIntegerField')(default=0)),
+            ('created_at', self.gf('django.db.models.fields.DateTimeField')(default=datetime.datetime.now)),
+            ('published_at', self.gf('django.db.models.fields.DateTimeField')(null=True, db_index=True)),
+        ))
+        db.send_create_signal('workflow', ['AssessmentWorkflowScoreOutbox'])
+
+
+    def backwards(self, orm):
+        # Deleting model 'AssessmentWorkflowScoreOutbox'
+        db.delete_table('workflow_assessmentworkflowscoreoutbox')
+
+
+    models = {
+        'workflow.assessmentworkflow': {
+            'Meta': {'ordering': "['-created']", 'object_name': 'AssessmentWorkflow'},
+            'course_id': ('django.db.models.fields.CharField', [], {'max_length': '255', 'db_index': 'True'}),
+            'created': ('model_utils.fields.AutoCreatedField', [], {'default': 'datetime.datetime.now'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'item_id': ('django.db.models.fields.CharField', [], {'max_length': '255', 'db_index': 'True'}),
+            'modified': ('model_utils.fields.AutoLastModifiedField', [], {'default': 'datetime.datetime.now'}),
+            'needs_update': ('django.db.models.fields.BooleanField', [], {'default': 'True'}),
+            'peer_complete': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'requirements_hash': ('django.db.models.fields.CharField', [], {'default': "u''", 'max_length': '40', 'blank': 'True'}),
+            'self_complete': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'status': ('model_utils.fields.StatusField', [], {'default': "'peer'", 'max_length': '100', u'no_check_for_status': 'True'}),
+            'status_changed': ('model_utils.fields.MonitorField', [], {'default': 'datetime.datetime.now', u'monitor': "u'status'"}),
+            'submission_uuid': ('django.db.models.fields.CharField', [], {'unique': 'True', 'max_length': '36', 'db_index': 'True'}),
+            'uuid': ('django.db.models.fields.CharField', [], {'db_index': 'True', 'unique': 'True', 'max_length': '36', 'blank': 'True'})
+        },
+        'workflow.assessmentworkflowscoreoutbox': {
+            'Meta': {'ordering': "['id']", 'object_name': 'AssessmentWorkflowScoreOutbox'},
+            'course_id': ('django.db.models.fields.CharField', [], {'max_length': '255'}),
+            'created_at': ('django.db.models.fields.DateTimeField', [], {'default': 'datetime.datetime.now'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'item_id': ('django.db.models.fields.CharField', [], {'max_length': '255'}),
+            'points_earned': ('django.db.models.fields.PositiveIntegerField', [], {'default': '0'}),
+            'points_possible': ('django.db.models.fields.PositiveIntegerField', [], {'default': '0'}),
+            'published_at': ('django.db.models.fields.DateTimeField', [], {'null': 'True', 'db_index': 'True'}),
+            'submission_uuid': ('django.db.models.fields.CharField', [], {'max_length': '36', 'db_index': 'True'})
+        },
+        'workflow.assessmentworkflowstatuscount': {
+            'Meta': {'unique_together': "(('course_id', 'item_id', 'status'),)", 'object_name': 'AssessmentWorkflowStatusCount'},
+            'count': ('django.db.models.fields.IntegerField', [], {'default': '0'}),
+            'course_id': ('django.db.models.fields.CharField', [], {'max_length': '255'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'item_id': ('django.db.models.fields.CharField', [], {'max_length': '255'}),
+            'status': ('django.db.models.fields.CharField', [], {'max_length': '100'})
+        }
+    }
+
+    complete_apps = ['workflow']
\ No newline at end of file
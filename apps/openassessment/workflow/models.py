@@ -9,16 +9,22 @@ need to then generate a matching migration for it using:
     ./manage.py schemamigration openassessment.workflow --auto
 
 """
-from datetime import datetime
+from hashlib import sha1
+import json
 import logging
 import importlib
+from uuid import uuid4
 
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction, IntegrityError
+from django.db.models import Count, F
+from django.dispatch import receiver
+from django.utils.timezone import now
 from django_extensions.db.fields import UUIDField
 from model_utils import Choices
 from model_utils.models import StatusModel, TimeStampedModel
 
+from openassessment.assessment.signals import assessment_created
 from submissions import api as sub_api
 
 logger = logging.getLogger('openassessment.workflow.models')
@@ -33,6 +39,14 @@ else:
     emit_event = lambda event: logger.info("Event: " + unicode(event))
 
 
+# The number of workflows scored at a time by `AssessmentWorkflow.score_waiting()`
+SCORE_BATCH_SIZE = 200
+
+# The number of times `AssessmentWorkflowScoreOutbox.publish_pending()` tries
+# to publish a score before leaving it for someone to look into
+MAX_PUBLISH_ATTEMPTS = 3
+
+
 class AssessmentWorkflow(TimeStampedModel, StatusModel):
     """Tracks the open-ended assessment status of a student submission.
 
@@ -45,6 +59,12 @@ class AssessmentWorkflow(TimeStampedModel, StatusModel):
     submissions you have to assess = 5"). The "status" field on this model is
     an after the fact recording of the last known state of that information so
     we can search easily.
+
+    Working the status out again is expensive, so we only do it when
+    something may have changed it: `needs_update` is set when an assessment
+    is created for or by the submission, and the requirements the status was
+    last worked out with are recorded in `requirements_hash`.  Until then,
+    the stored status (and the completion of each step) is used.
     """
     STATUS_VALUES = [
         "peer",  # User needs to assess peer submissions
@@ -67,9 +87,62 @@ class AssessmentWorkflow(TimeStampedModel, StatusModel):
     course_id = models.CharField(max_length=255, blank=False, db_index=True)
     item_id = models.CharField(max_length=255, blank=False, db_index=True)
 
+    # Whether the peer and self steps were complete when the status was
+    # last worked out, and a hash of the requirements used to do it.
+    peer_complete = models.BooleanField(default=False)
+    self_complete = models.BooleanField(default=False)
+    requirements_hash = models.CharField(max_length=40, blank=True, default=u"")
+
+    # Set when something happens that may change the status
+    needs_update = models.BooleanField(default=True)
+
     class Meta:
         ordering = ["-created"]
-        # TODO: In migration, need a non-unique index on (course_id, item_id, status)
+        # The non-unique index on (course_id, item_id, status) is created
+        # in migration 0002 (and in sql/assessmentworkflow.<backend>.sql for syncdb).
+
+    def __init__(self, *args, **kwargs):
+        super(AssessmentWorkflow, self).__init__(*args, **kwargs)
+        # The status last read from or written to the database
+        self._stored_status = self.status if self.pk is not None else None
+
+    def save(self, *args, **kwargs):
+        """
+        Save the workflow, counting it in its new status for the item
+        (see `AssessmentWorkflowStatusCount`).
+
+        The counts are adjusted in the caller's transaction, from the status
+        the workflow had when it was loaded; a change saved from another
+        copy of the workflow in the meantime is left for `reconcile()`.
+        """
+        super(AssessmentWorkflow, self).save(*args, **kwargs)
+        self._count_status_change(self._stored_status, self.status)
+        self._stored_status = self.status
+
+    @classmethod
+    def count_by_status(cls, course_id, item_id):
+        """
+        Count the workflows for an item in each status, with a single query.
+
+        This reads the workflows themselves; `AssessmentWorkflowStatusCount`
+        has the same counts without scanning them.
+
+        Args:
+            course_id (unicode): The ID of the course containing the item.
+            item_id (unicode): The ID of the item.
+
+        Returns:
+            dict: Status --> number of workflows.  Statuses with no
+                workflows are left out.
+
+        """
+        return dict(
+            cls.objects.filter(
+                course_id=course_id, item_id=item_id
+            ).order_by().values('status').annotate(
+                count=Count('id')
+            ).values_list('status', 'count')
+        )
 
     @property
     def score(self):
@@ -77,19 +150,34 @@ class AssessmentWorkflow(TimeStampedModel, StatusModel):
 
         Note that while it is usually the case that we're setting the score,
         that may not always be the case. We may have some course staff override.
+
+        Until the score we set is published (see `AssessmentWorkflowScoreOutbox`),
+        the score waiting to be published is returned instead.
         """
-        return sub_api.get_latest_score_for_submission(self.submission_uuid)
+        score = sub_api.get_latest_score_for_submission(self.submission_uuid)
+        if score is None and self.status == self.STATUS.done:
+            score = AssessmentWorkflowScoreOutbox.pending_scores([self.submission_uuid]).get(self.submission_uuid)
+        return score
 
     def status_details(self, assessment_requirements):
+        """
+        Describe whether each step is complete, as of the last time
+        the status was worked out by `update_from_assessments()`.
+        """
         return {
             "peer": {
-                "complete": self._is_peer_complete(assessment_requirements),
+                "complete": self.peer_complete,
             },
             "self": {
-                "complete": self._is_self_complete(),
+                "complete": self.self_complete,
             },
         }
 
+    @staticmethod
+    def hash_requirements(assessment_requirements):
+        """Return a hash that changes when the assessment requirements change."""
+        return sha1(json.dumps(assessment_requirements, sort_keys=True)).hexdigest()
+
     def _is_peer_complete(self, assessment_requirements):
         from openassessment.assessment import peer_api
         peer_requirements = assessment_requirements["peer"]
@@ -103,7 +191,9 @@ class AssessmentWorkflow(TimeStampedModel, StatusModel):
         """Query self and peer APIs and change our status if appropriate.
 
         If the status is done, we do nothing. Once something is done, we never
-        move back to any other status.
+        move back to any other status.  We also do nothing if no assessments
+        have been created for or by the submission, and the requirements
+        haven't changed, since the status was last worked out.
 
         By default, an `AssessmentWorkflow` starts with status `peer`.
 
@@ -116,8 +206,8 @@ class AssessmentWorkflow(TimeStampedModel, StatusModel):
 
         If we're in the `waiting` status, and the peer API says it can score
         this submission (meaning other students have created enough assessments
-        of it), then we record the score in the submissions API and move our
-        `status` to `done`.
+        of it), then we queue the score to be recorded in the submissions API
+        (see `AssessmentWorkflowScoreOutbox`) and move our `status` to `done`.
 
         Args:
             assessment_requirements (dict): Dictionary that currently looks like:
@@ -137,57 +227,520 @@ class AssessmentWorkflow(TimeStampedModel, StatusModel):
         if self.status == self.STATUS.done:
             return
 
-        # Have they completed the peer and self steps?
-        peer_complete = self._is_peer_complete(assessment_requirements)
-        self_complete = self._is_self_complete()
+        # If nothing has changed, neither has the status
+        requirements_hash = self.hash_requirements(assessment_requirements)
+        if not self.needs_update and self.requirements_hash == requirements_hash:
+            return
+
+        # Clear the flag before looking at the assessments, so that an
+        # assessment created while we work marks the workflow again.
+        self.needs_update = False
+        AssessmentWorkflow.objects.filter(id=self.id).update(needs_update=False)
+
+        try:
+            # Have they completed the peer and self steps?
+            peer_complete = self._is_peer_complete(assessment_requirements)
+            self_complete = self._is_self_complete()
 
+            new_status = self.status_for_steps(peer_complete, self_complete)
+
+            # If we're at least waiting, let's check if we have a peer score and
+            # can move all the way to done
+            if new_status == self.STATUS.waiting:
+                score = peer_api.get_score(
+                    self.submission_uuid, assessment_requirements["peer"]
+                )
+                if score:
+                    new_status = self.STATUS.done
+
+            # Finally save our changes.  We update the fields we worked out,
+            # rather than saving, to leave `needs_update` alone.
+            changes = dict(
+                peer_complete=peer_complete,
+                self_complete=self_complete,
+                requirements_hash=requirements_hash,
+            )
+            if self.status != new_status:
+                timestamp = now()
+                changes.update(status=new_status, status_changed=timestamp, modified=timestamp)
+                with transaction.commit_on_success():
+                    old_status = self._locked_status()
+                    AssessmentWorkflow.objects.filter(id=self.id).update(**changes)
+                    self._count_status_change(old_status, new_status)
+
+                    # The score is queued in the same commit as the status change,
+                    # unless another request finished the workflow before us.
+                    if new_status == self.STATUS.done and old_status != self.STATUS.done:
+                        AssessmentWorkflowScoreOutbox.add_scores([(self, score)])
+            else:
+                AssessmentWorkflow.objects.filter(id=self.id).update(**changes)
+        except Exception:
+            # Work the status out again next time, rather than keeping the
+            # stale one until something else marks the workflow.
+            self.needs_update = True
+            AssessmentWorkflow.objects.filter(id=self.id).update(needs_update=True)
+            raise
+        for field_name, value in changes.iteritems():
+            setattr(self, field_name, value)
+        self._stored_status = self.status
+
+    @classmethod
+    def status_for_steps(cls, peer_complete, self_complete):
+        """
+        Return the status of a workflow that isn't done, given whether
+        its peer and self steps are complete.
+        """
         if peer_complete and self_complete:
             # If they've completed both, they're at least waiting, possibly done
-            new_status = self.STATUS.waiting
+            return cls.STATUS.waiting
         elif peer_complete:
             # If they haven't done self assessment yet, that's their status
-            new_status = self.STATUS.self
+            return cls.STATUS.self
         else:
             # Default starting status is peer
-            new_status = self.STATUS.peer
+            return cls.STATUS.peer
+
+    @classmethod
+    def read_from_assessments(cls, workflows, assessment_requirements):
+        """Work out the status of many workflows without saving anything.
 
-        # If we're at least waiting, let's check if we have a peer score and
-        # can move all the way to done
-        if new_status == self.STATUS.waiting:
-            score = peer_api.get_score(
-                self.submission_uuid, assessment_requirements["peer"]
+        This looks at the assessments as `update_from_assessments()` does,
+        but with two queries however many workflows there are, and only
+        changes the workflows in memory.  As there, workflows are skipped
+        unless something may have changed their status.  Workflows that
+        could be scored are left `waiting`, since scoring them is a write.
+
+        Args:
+            workflows (list of AssessmentWorkflow): The workflows to update
+                in memory.
+            assessment_requirements (dict): As for `update_from_assessments()`.
+
+        """
+        from openassessment.assessment import peer_api, self_api
+
+        requirements_hash = cls.hash_requirements(assessment_requirements)
+        stale = [
+            workflow for workflow in workflows
+            if workflow.status != cls.STATUS.done
+            and (workflow.needs_update or workflow.requirements_hash != requirements_hash)
+        ]
+        if not stale:
+            return
+
+        submission_uuids = [workflow.submission_uuid for workflow in stale]
+        peer_complete = peer_api.get_complete_submission_uuids(
+            submission_uuids, assessment_requirements["peer"]
+        )
+        self_complete = self_api.get_complete_submission_uuids(submission_uuids)
+
+        for workflow in stale:
+            workflow.peer_complete = workflow.submission_uuid in peer_complete
+            workflow.self_complete = workflow.submission_uuid in self_complete
+            workflow.status = cls.status_for_steps(workflow.peer_complete, workflow.self_complete)
+
+    @classmethod
+    def score_waiting(cls, course_id, item_id, assessment_requirements, batch_size=SCORE_BATCH_SIZE):
+        """Score every waiting workflow for an item that has enough peer assessments.
+
+        This has the same result as calling `update_from_assessments()` for
+        each workflow in the `waiting` status, but works through them in
+        batches, with a fixed number of queries for each batch.  Workflows
+        in other statuses are left alone, since moving them on needs the
+        student to act.
+
+        Args:
+            course_id (unicode): The ID of the course containing the item.
+            item_id (unicode): The ID of the item.
+            assessment_requirements (dict): As for `update_from_assessments()`.
+
+        Kwargs:
+            batch_size (int): The number of workflows to score at a time.
+
+        Returns:
+            int: The number of workflows that were scored.
+
+        """
+        from openassessment.assessment import peer_api
+
+        num_scored = 0
+        last_id = 0
+        while True:
+            workflows = list(cls.objects.filter(
+                course_id=course_id,
+                item_id=item_id,
+                status=cls.STATUS.waiting,
+                id__gt=last_id,
+            ).order_by('id')[:batch_size])
+            if not workflows:
+                return num_scored
+            last_id = workflows[-1].id
+
+            scores = peer_api.get_scores(
+                [workflow.submission_uuid for workflow in workflows],
+                assessment_requirements["peer"]
             )
-            if score:
-                sub_api.set_score(
-                    self.submission_uuid,
-                    score["points_earned"],
-                    score["points_possible"]
-                )
+            if not scores:
+                continue
+
+            # Workflows that moved on in the meantime were scored by the student
+            timestamp = now()
+            with transaction.commit_on_success():
+                scored = list(cls.objects.select_for_update().filter(
+                    submission_uuid__in=scores.keys(),
+                    status=cls.STATUS.waiting,
+                ))
+                cls.objects.filter(
+                    id__in=[workflow.id for workflow in scored]
+                ).update(status=cls.STATUS.done, status_changed=timestamp, modified=timestamp)
+                AssessmentWorkflowStatusCount.adjust(course_id, item_id, cls.STATUS.waiting, -len(scored))
+                AssessmentWorkflowStatusCount.adjust(course_id, item_id, cls.STATUS.done, len(scored))
+                AssessmentWorkflowScoreOutbox.add_scores([
+                    (workflow, scores[workflow.submission_uuid]) for workflow in scored
+                ])
+            num_scored += len(scored)
+
+    def _locked_status(self):
+        """
+        Return the stored status of the workflow, locking its row until
+        the end of the transaction so that the status can't change under us.
+        """
+        statuses = AssessmentWorkflow.objects.select_for_update().filter(
+            id=self.id
+        ).values_list('status', flat=True)
+        return statuses[0] if statuses else None
+
+    def _count_status_change(self, old_status, new_status):
+        """Move the workflow between statuses in the counts for its item."""
+        if old_status != new_status:
+            if old_status is not None:
+                AssessmentWorkflowStatusCount.adjust(self.course_id, self.item_id, old_status, -1)
+            AssessmentWorkflowStatusCount.adjust(self.course_id, self.item_id, new_status, 1)
+
+
+@receiver(assessment_created)
+def mark_for_update(sender, **kwargs):
+    """
+    Listen for new assessments and mark the workflows of the submissions
+    they may affect, so that their status is worked out again the next
+    time they are read.
+
+    Args:
+        sender: not used
+
+    Kwargs:
+        submission_uuids (list of str): The submissions that may be affected.
+
+    """
+    AssessmentWorkflow.objects.filter(
+        submission_uuid__in=kwargs['submission_uuids'],
+        needs_update=False,
+    ).exclude(
+        status=AssessmentWorkflow.STATUS.done
+    ).update(needs_update=True)
+
+
+class AssessmentWorkflowStatusCount(models.Model):
+    """
+    The number of workflows for an item in each status.
+
+    Counting the workflows themselves means scanning every workflow for
+    the item, and the counts are read on every page view by course staff.
+    Instead, the count is updated in the same transaction whenever a workflow
+    is created or changes status, so it can be read with a single lookup.
 
-                # This should be replaced by using the event tracking API, but
-                # that's not quite ready yet. So we're making this temp hack.
-                emit_event({
-                    "context": {
-                        "course_id": self.course_id
-                    },
-                    "event": {
-                        "submission_uuid": self.submission_uuid,
-                        "points_earned": score["points_earned"],
-                        "points_possible": score["points_possible"],
-                    },
-                    "event_source": "server",
-                    "event_type": "openassessment.workflow.score",
-                    "time": datetime.utcnow(),
-                })
-
-                new_status = self.STATUS.done
-
-
-        # Finally save our changes if the status has changed
-        if self.status != new_status:
-            self.status = new_status
-            self.save()
+    Changes made without going through `AssessmentWorkflow` (such as
+    queryset updates, or deleting workflows) are not counted; the
+    `reconcile_workflow_status_counts` management command fixes the counts
+    with `reconcile()`.
+    """
+    course_id = models.CharField(max_length=255)
+    item_id = models.CharField(max_length=255)
+    status = models.CharField(max_length=100)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("course_id", "item_id", "status")
+
+    @classmethod
+    def counts_for_item(cls, course_id, item_id):
+        """
+        Return the number of workflows for an item in each status.
+
+        Args:
+            course_id (unicode): The ID of the course containing the item.
+            item_id (unicode): The ID of the item.
+
+        Returns:
+            dict: Status --> number of workflows.  Statuses that have never
+                had any workflows are left out.
+
+        """
+        return dict(
+            cls.objects.filter(
+                course_id=course_id, item_id=item_id
+            ).values_list('status', 'count')
+        )
+
+    @classmethod
+    def adjust(cls, course_id, item_id, status, delta):
+        """
+        Add `delta` to the number of workflows for an item in a status.
+
+        This must be called within a transaction, along with the change
+        to the workflows that it counts.
+
+        Args:
+            course_id (unicode): The ID of the course containing the item.
+            item_id (unicode): The ID of the item.
+            status (unicode): The workflow status.
+            delta (int): The change in the number of workflows.
+
+        Returns:
+            None
+
+        """
+        if not delta:
+            return
+
+        counts = cls.objects.filter(course_id=course_id, item_id=item_id, status=status)
+        if counts.update(count=F('count') + delta):
+            return
+
+        # This is the first workflow for the item in this status
+        savepoint = transaction.savepoint()
+        try:
+            cls.objects.create(course_id=course_id, item_id=item_id, status=status, count=delta)
+            transaction.savepoint_commit(savepoint)
+        except IntegrityError:
+            # Another process created the count first
+            transaction.savepoint_rollback(savepoint)
+            counts.update(count=F('count') + delta)
+
+    @classmethod
+    def reconcile(cls, course_id, item_id):
+        """
+        Count the workflows for an item again, and fix any counts that
+        have drifted from them.
+
+        Args:
+            course_id (unicode): The ID of the course containing the item.
+            item_id (unicode): The ID of the item.
+
+        Returns:
+            int: The number of statuses whose count was wrong.
+
+        """
+        with transaction.commit_on_success():
+            # Lock the counts first, so that workflows changing status
+            # while we count them wait until we're done.
+            stored = dict(
+                cls.objects.select_for_update().filter(
+                    course_id=course_id, item_id=item_id
+                ).values_list('status', 'count')
+            )
+            actual = AssessmentWorkflow.count_by_status(course_id, item_id)
+
+            num_fixed = 0
+            for status in set(stored) | set(actual):
+                count = actual.get(status, 0)
+                if status not in stored:
+                    cls.objects.create(course_id=course_id, item_id=item_id, status=status, count=count)
+                    num_fixed += 1
+                elif stored[status] != count:
+                    cls.objects.filter(
+                        course_id=course_id, item_id=item_id, status=status
+                    ).update(count=count)
+                    num_fixed += 1
+            return num_fixed
+
+
+class AssessmentWorkflowScoreOutbox(models.Model):
+    """
+    A score waiting to be published for a workflow that is done.
+
+    Recording a score in the submissions API (and emitting the score event)
+    takes several queries, so it isn't done in the request that finishes
+    the workflow.  Instead, the score is written here in the same commit
+    that moves the workflow to `done`, and `publish_pending()` (run by the
+    `publish_workflow_scores` management command) publishes the waiting
+    scores in batches.
+    """
+    submission_uuid = models.CharField(max_length=36, db_index=True)
+    course_id = models.CharField(max_length=255)
+    item_id = models.CharField(max_length=255)
+    points_earned = models.PositiveIntegerField(default=0)
+    points_possible = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(default=now)
+
+    # Null until the score has been published
+    published_at = models.DateTimeField(null=True, db_index=True)
+
+    # Identifies the `publish_pending()` call that claimed the score
+    publish_token = models.CharField(max_length=32, blank=True, default=u"")
 
+    # The number of times publishing the score failed
+    publish_attempts = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["id"]
+
+    @classmethod
+    def add_scores(cls, workflow_scores):
+        """
+        Queue scores to be published.  This should be called in the same
+        transaction that moves the workflows to `done`.
+
+        Args:
+            workflow_scores (list of tuples): `(workflow, score)` pairs, where
+                each score is a dict with keys "points_earned" and "points_possible".
+
+        Returns:
+            None
+
+        """
+        cls.objects.bulk_create([
+            cls(
+                submission_uuid=workflow.submission_uuid,
+                course_id=workflow.course_id,
+                item_id=workflow.item_id,
+                points_earned=score["points_earned"],
+                points_possible=score["points_possible"],
+            )
+            for workflow, score in workflow_scores
+        ])
+
+    @classmethod
+    def pending_scores(cls, submission_uuids):
+        """
+        Return the scores waiting to be published for some submissions.
+
+        Args:
+            submission_uuids (list of str): The UUIDs of the submissions.
+
+        Returns:
+            dict mapping the UUIDs of submissions with a score waiting to be
+            published to a dict with keys "submission_uuid", "points_earned",
+            "points_possible" and "created_at".
+
+        """
+        if not submission_uuids:
+            return dict()
+
+        entries = cls.objects.filter(
+            submission_uuid__in=submission_uuids,
+            published_at__isnull=True,
+        )
+        return dict(
+            (entry.submission_uuid, entry.score_dict)
+            for entry in entries
+        )
+
+    @classmethod
+    def publish_pending(cls, batch_size=SCORE_BATCH_SIZE):
+        """Publish every score waiting in the outbox, oldest first.
+
+        Each batch of scores is claimed, recorded with `sub_api.set_scores()`
+        (which writes in our transaction) and its score events emitted, all
+        before a single commit.  The scores are claimed with a conditional
+        update, so a score that another publisher claimed after we read it
+        is left to them, and each score is recorded exactly once however
+        many publishers are running.
+
+        If a batch can't be recorded, its scores are published one at a time,
+        so that a bad score doesn't hold up the rest.  A score that still
+        fails is tried again by later calls, up to `MAX_PUBLISH_ATTEMPTS`
+        times, and then left in the outbox unpublished.
+
+        If the publisher dies before committing, the batch is left waiting to
+        be published again.  Since the events are emitted just before the
+        commit, an event may then be emitted twice, but is never lost.
+
+        Kwargs:
+            batch_size (int): The number of scores to publish at a time.
+
+        Returns:
+            int: The number of scores published.
+
+        """
+        num_published = 0
+        last_id = 0
+        while True:
+            waiting_ids = list(
+                cls.objects.filter(
+                    published_at__isnull=True,
+                    publish_attempts__lt=MAX_PUBLISH_ATTEMPTS,
+                    id__gt=last_id,
+                ).order_by('id').values_list('id', flat=True)[:batch_size]
+            )
+            if not waiting_ids:
+                return num_published
+            last_id = waiting_ids[-1]
+
+            try:
+                num_published += cls._publish_entries(waiting_ids)
+            except sub_api.SubmissionError:
+                for entry_id in waiting_ids:
+                    try:
+                        num_published += cls._publish_entries([entry_id])
+                    except sub_api.SubmissionError:
+                        logger.exception(
+                            u"Could not publish the workflow score with outbox ID {}".format(entry_id)
+                        )
+                        cls.objects.filter(id=entry_id).update(publish_attempts=F('publish_attempts') + 1)
+
+    @classmethod
+    def _publish_entries(cls, entry_ids):
+        """
+        Claim, record and emit the waiting scores among `entry_ids` in one commit.
+
+        Returns:
+            int: The number of scores published.
+
+        Raises:
+            SubmissionError: The scores could not be recorded; nothing is published.
+
+        """
+        with transaction.commit_on_success():
+            token = uuid4().hex
+            cls.objects.filter(
+                id__in=entry_ids,
+                published_at__isnull=True,
+                publish_attempts__lt=MAX_PUBLISH_ATTEMPTS,
+            ).update(published_at=now(), publish_token=token)
+            entries = list(cls.objects.filter(id__in=entry_ids, publish_token=token))
+
+            sub_api.set_scores([entry.score_dict for entry in entries])
+            for entry in entries:
+                entry._emit_score_event()
+        return len(entries)
+
+    @property
+    def score_dict(self):
+        """The score, as a dict for `sub_api.set_scores()`."""
+        return {
+            "submission_uuid": self.submission_uuid,
+            "points_earned": self.points_earned,
+            "points_possible": self.points_possible,
+            "created_at": self.created_at,
+        }
+
+    def _emit_score_event(self):
+        """Emit an event recording the score of the submission."""
+        # This should be replaced by using the event tracking API, but
+        # that's not quite ready yet. So we're making this temp hack.
+        emit_event({
+            "context": {
+                "course_id": self.course_id
+            },
+            "event": {
+                "submission_uuid": self.submission_uuid,
+                "points_earned": self.points_earned,
+                "points_possible": self.points_possible,
+            },
+            "event_source": "server",
+            "event_type": "openassessment.workflow.score",
+            "time": self.created_at,
+        })
 
 
 # Just here to record thoughts for later:
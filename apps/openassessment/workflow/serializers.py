@@ -22,6 +22,15 @@ class AssessmentWorkflowSerializer(serializers.ModelSerializer):
             'score'
         )
 
+
+class AssessmentWorkflowListSerializer(AssessmentWorkflowSerializer):
+    """
+    Serialize a workflow without looking up its score, for listing many
+    workflows whose scores are looked up together.
+    """
+    class Meta(AssessmentWorkflowSerializer.Meta):
+        exclude = ('score',)
+
 # Not implemented yet:
 #
 # class AssessmentWorkflowHistorySerializer(serializers.ModelSerializer):
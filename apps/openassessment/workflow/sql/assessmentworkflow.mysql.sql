@@ -0,0 +1,4 @@
+-- Composite index for counting the workflows for an item by status.  This is
+-- created by the South migrations; this file adds it when the table is built
+-- by syncdb instead.
+CREATE INDEX `workflow_assessmentworkflow_course_item_status` ON `workflow_assessmentworkflow` (`course_id`, `item_id`, `status`);
@@ -4,9 +4,9 @@ from mock import patch
 from nose.tools import raises
 
 from openassessment.test_utils import CacheResetTest
-from openassessment.assessment import peer_api
+from openassessment.assessment import peer_api, self_api
 
-from openassessment.workflow.models import AssessmentWorkflow
+from openassessment.workflow.models import AssessmentWorkflow, AssessmentWorkflowScoreOutbox
 from submissions.models import Submission
 import openassessment.workflow.api as workflow_api
 import submissions.api as sub_api
@@ -25,6 +25,19 @@ REQUIREMENTS = {
     }
 }
 
+RUBRIC = {
+    "criteria": [
+        {
+            "name": "clarity",
+            "prompt": "How clear was it?",
+            "options": [
+                {"name": "somewhat clear", "points": 1, "explanation": ""},
+                {"name": "clear", "points": 3, "explanation": ""},
+            ]
+        },
+    ]
+}
+
 class TestAssessmentWorkflowApi(CacheResetTest):
 
     def test_create_workflow(self):
@@ -47,14 +60,77 @@ class TestAssessmentWorkflowApi(CacheResetTest):
         del workflow_from_get['status_details']
         self.assertEqual(workflow, workflow_from_get)
 
+    def test_update_only_when_needed(self):
+        submission = sub_api.create_submission(ITEM_1, "Shoot Hot Rod")
+        workflow_api.create_workflow(submission["uuid"])
+        requirements = {"peer": {"must_grade": 0, "must_be_graded_by": 1}}
+        workflow = workflow_api.get_workflow_for_submission(submission["uuid"], requirements)
+        self.assertEqual(workflow["status"], "self")
+        self.assertEqual(workflow["status_details"], {"peer": {"complete": True}, "self": {"complete": False}})
+
+        # Nothing has changed, so the stored status is used
+        with patch.object(AssessmentWorkflow, '_is_peer_complete') as mock_peer:
+            with patch.object(AssessmentWorkflow, '_is_self_complete') as mock_self:
+                workflow = workflow_api.get_workflow_for_submission(submission["uuid"], requirements)
+        self.assertFalse(mock_peer.called)
+        self.assertFalse(mock_self.called)
+        self.assertEqual(workflow["status"], "self")
+
+        # Assessing themselves moves the student on
+        self_api.create_assessment(submission["uuid"], ITEM_1["student_id"], {"clarity": "clear"}, RUBRIC)
+        workflow = workflow_api.get_workflow_for_submission(submission["uuid"], requirements)
+        self.assertEqual(workflow["status"], "waiting")
+        self.assertEqual(workflow["status_details"], {"peer": {"complete": True}, "self": {"complete": True}})
+
+    def test_update_when_requirements_change(self):
+        submission = sub_api.create_submission(ITEM_1, "Shoot Hot Rod")
+        workflow_api.create_workflow(submission["uuid"])
+        workflow = workflow_api.get_workflow_for_submission(submission["uuid"], REQUIREMENTS)
+        self.assertEqual(workflow["status"], "peer")
+
+        # The student no longer needs to assess anyone
+        requirements = {"peer": {"must_grade": 0, "must_be_graded_by": 3}}
+        workflow = workflow_api.get_workflow_for_submission(submission["uuid"], requirements)
+        self.assertEqual(workflow["status"], "self")
+
+    def test_update_retried_after_error(self):
+        submission = sub_api.create_submission(ITEM_1, "Shoot Hot Rod")
+        workflow_api.create_workflow(submission["uuid"])
+        requirements = {"peer": {"must_grade": 0, "must_be_graded_by": 3}}
+
+        with patch.object(peer_api, 'is_complete') as mock_complete:
+            mock_complete.side_effect = peer_api.PeerAssessmentInternalError("Kaboom!")
+            with self.assertRaises(peer_api.PeerAssessmentInternalError):
+                workflow_api.get_workflow_for_submission(submission["uuid"], requirements)
+
+        # The workflow is still marked, so the next read works its status out
+        self.assertTrue(AssessmentWorkflow.objects.get(submission_uuid=submission["uuid"]).needs_update)
+        workflow = workflow_api.get_workflow_for_submission(submission["uuid"], requirements)
+        self.assertEqual(workflow["status"], "self")
+
+    def test_peer_assessment_marks_workflows(self):
+        scorer_sub = sub_api.create_submission(ITEM_1, "Shoot Hot Rod")
+        author_sub = sub_api.create_submission(dict(ITEM_1, student_id="Bumblebee"), "Bumblebee's answer")
+        for submission in [scorer_sub, author_sub]:
+            workflow_api.create_workflow(submission["uuid"])
+            workflow_api.get_workflow_for_submission(submission["uuid"], REQUIREMENTS)
+        self.assertFalse(AssessmentWorkflow.objects.filter(needs_update=True).exists())
+
+        peer_api.get_submission_to_assess(scorer_sub["uuid"], 1)
+        peer_api.create_assessment(
+            scorer_sub["uuid"], ITEM_1["student_id"], {"clarity": "clear"},
+            dict(), "", RUBRIC, REQUIREMENTS["peer"]["must_be_graded_by"]
+        )
+        self.assertEqual(AssessmentWorkflow.objects.filter(needs_update=True).count(), 2)
+
     def test_need_valid_submission_uuid(self):
         # submission doesn't exist
         with self.assertRaises(workflow_api.AssessmentWorkflowRequestError):
-            workflow = workflow_api.create_workflow("xxxxxxxxxxx")
+            workflow_api.create_workflow("xxxxxxxxxxx")
 
         # submission_uuid is the wrong type
         with self.assertRaises(workflow_api.AssessmentWorkflowRequestError):
-            workflow = workflow_api.create_workflow(123)
+            workflow_api.create_workflow(123)
 
     @patch.object(Submission.objects, 'get')
     @raises(workflow_api.AssessmentWorkflowInternalError)
@@ -128,6 +204,192 @@ class TestAssessmentWorkflowApi(CacheResetTest):
         updated_counts = workflow_api.get_status_counts("test/1/1", "peer-problem")
         self.assertEqual(counts, updated_counts)
 
+        # The counts are read without counting the workflows
+        with self.assertNumQueries(1):
+            workflow_api.get_status_counts("test/1/1", "peer-problem")
+
+    def test_status_counts_follow_workflows(self):
+        submission = sub_api.create_submission(ITEM_1, "Shoot Hot Rod")
+        workflow_api.create_workflow(submission["uuid"])
+        self.assertEqual(self._status_counts(), [1, 0, 0, 0])
+
+        # The student no longer needs to assess anyone, so moves on to self assessment
+        requirements = {"peer": {"must_grade": 0, "must_be_graded_by": 1}}
+        workflow_api.get_workflow_for_submission(submission["uuid"], requirements)
+        self.assertEqual(self._status_counts(), [0, 1, 0, 0])
+
+        self_api.create_assessment(submission["uuid"], ITEM_1["student_id"], {"clarity": "clear"}, RUBRIC)
+        workflow_api.get_workflow_for_submission(submission["uuid"], requirements)
+        self.assertEqual(self._status_counts(), [0, 0, 1, 0])
+
+        # The status counts match the workflows
+        self.assertEqual(
+            AssessmentWorkflow.count_by_status(ITEM_1["course_id"], ITEM_1["item_id"]),
+            {"waiting": 1}
+        )
+
+    def test_score_item(self):
+        # Waiting workflows without enough assessments are left waiting
+        self._create_workflow_with_status("user 1", "test/1/1", "peer-problem", "waiting")
+        self._create_workflow_with_status("user 2", "test/1/1", "peer-problem", "peer")
+        self.assertEqual(workflow_api.score_item("test/1/1", "peer-problem", REQUIREMENTS), 0)
+        counts = workflow_api.get_status_counts("test/1/1", "peer-problem")
+        self.assertEqual(counts[2], {"status": "waiting", "count": 1})
+
+    def test_score_item_status_counts(self):
+        students = ["Optimus Prime 001", "Bumblebee"]
+        uuids = []
+        for student_id in students:
+            submission = sub_api.create_submission(dict(ITEM_1, student_id=student_id), "Shoot Hot Rod")
+            workflow_api.create_workflow(submission["uuid"])
+            uuids.append(submission["uuid"])
+
+        # Each student assesses the other
+        for scorer_uuid, student_id in zip(uuids, students):
+            peer_api.get_submission_to_assess(scorer_uuid, 1)
+            peer_api.create_assessment(scorer_uuid, student_id, {"clarity": "clear"}, dict(), "", RUBRIC, 1)
+
+        # Both students are waiting for their scores
+        for uuid in uuids:
+            model = AssessmentWorkflow.objects.get(submission_uuid=uuid)
+            model.status = "waiting"
+            model.save()
+        self.assertEqual(self._status_counts(), [0, 0, 2, 0])
+
+        requirements = {"peer": {"must_grade": 1, "must_be_graded_by": 1}}
+        self.assertEqual(workflow_api.score_item(ITEM_1["course_id"], ITEM_1["item_id"], requirements), 2)
+        self.assertEqual(self._status_counts(), [0, 0, 0, 2])
+
+    @patch.object(AssessmentWorkflow.objects, 'filter')
+    @raises(workflow_api.AssessmentWorkflowInternalError)
+    def test_score_item_db_error(self, mock_filter):
+        mock_filter.side_effect = DatabaseError("Kaboom!")
+        workflow_api.score_item("test/1/1", "peer-problem", REQUIREMENTS)
+
+    def test_get_workflows_for_item(self):
+        requirements = {"peer": {"must_grade": 0, "must_be_graded_by": 3}}
+        uuids = []
+        for student_num in range(5):
+            submission = sub_api.create_submission(dict(ITEM_1, student_id=str(student_num)), "Shoot Hot Rod")
+            workflow_api.create_workflow(submission["uuid"])
+            uuids.append(submission["uuid"])
+        self._create_workflow_with_status("other student", "test/1/1", "peer-problem", "peer")
+
+        # Some students have assessed themselves, one of whom has a score,
+        # and one workflow is already up to date.
+        for uuid, student_id in zip(uuids[:2], ["0", "1"]):
+            self_api.create_assessment(uuid, student_id, {"clarity": "clear"}, RUBRIC)
+        sub_api.set_score(uuids[1], 3, 5)
+        workflow_api.get_workflow_for_submission(uuids[4], requirements)
+
+        workflows = list(workflow_api.get_workflows_for_item(
+            ITEM_1["course_id"], ITEM_1["item_id"], requirements, page_size=2
+        ))
+        self.assertEqual([workflow["submission_uuid"] for workflow in workflows], uuids)
+        self.assertEqual(
+            [workflow["status"] for workflow in workflows],
+            ["waiting", "waiting", "self", "self", "self"]
+        )
+        self.assertEqual(workflows[1]["score"]["points_earned"], 3)
+        self.assertIs(workflows[0]["score"], None)
+
+        # Nothing was saved
+        self.assertEqual(self._status_counts(), [4, 1, 0, 0])
+        self.assertEqual(AssessmentWorkflow.objects.filter(needs_update=True).count(), 5)
+
+        # The workflows match what reading them one at a time gives,
+        # apart from when they were modified.
+        for workflow in workflows:
+            expected = workflow_api.get_workflow_for_submission(workflow["submission_uuid"], requirements)
+            del expected["modified"]
+            del workflow["modified"]
+            self.assertEqual(workflow, expected)
+
+    def test_get_workflows_for_item_num_queries(self):
+        for student_num in range(6):
+            submission = sub_api.create_submission(dict(ITEM_1, student_id=str(student_num)), "Shoot Hot Rod")
+            workflow_api.create_workflow(submission["uuid"])
+            sub_api.set_score(submission["uuid"], 1, 2)
+
+        # Workflows, peer and self completion, and two for the scores
+        with self.assertNumQueries(5):
+            workflows = list(workflow_api.get_workflows_for_item(
+                ITEM_1["course_id"], ITEM_1["item_id"], REQUIREMENTS
+            ))
+        self.assertEqual(len(workflows), 6)
+
+    @patch.object(AssessmentWorkflow.objects, 'filter')
+    @raises(workflow_api.AssessmentWorkflowInternalError)
+    def test_get_workflows_for_item_db_error(self, mock_filter):
+        mock_filter.side_effect = DatabaseError("Kaboom!")
+        list(workflow_api.get_workflows_for_item("test/1/1", "peer-problem", REQUIREMENTS))
+
+    def test_score_published_later(self):
+        uuids = self._create_scorable_workflows()
+        requirements = {"peer": {"must_grade": 1, "must_be_graded_by": 1}}
+
+        # The score is queued rather than recorded, but the workflow reports it
+        workflow = workflow_api.get_workflow_for_submission(uuids[0], requirements)
+        self.assertEqual(workflow["status"], "done")
+        self.assertEqual(workflow["score"]["points_earned"], 3)
+        self.assertEqual(workflow["score"]["points_possible"], 3)
+        self.assertIs(sub_api.get_latest_score_for_submission(uuids[0]), None)
+
+        listed = list(workflow_api.get_workflows_for_item(ITEM_1["course_id"], ITEM_1["item_id"], requirements))
+        self.assertEqual(listed[0]["score"], workflow["score"])
+
+        # Once it is published, the score is recorded
+        self.assertEqual(workflow_api.publish_scores(), 1)
+        score = sub_api.get_latest_score_for_submission(uuids[0])
+        self.assertEqual((score["points_earned"], score["points_possible"]), (3, 3))
+        workflow = workflow_api.get_workflow_for_submission(uuids[0], requirements)
+        self.assertEqual(workflow["score"], score)
+        self.assertEqual(workflow_api.publish_scores(), 0)
+
+    def test_score_queued_once(self):
+        uuid = self._create_scorable_workflows()[0]
+        requirements = {"peer": {"must_grade": 1, "must_be_graded_by": 1}}
+
+        # Two requests read the workflow before either finishes it
+        first = AssessmentWorkflow.objects.get(submission_uuid=uuid)
+        second = AssessmentWorkflow.objects.get(submission_uuid=uuid)
+        first.update_from_assessments(requirements)
+        second.update_from_assessments(requirements)
+        self.assertEqual(second.status, "done")
+        self.assertEqual(AssessmentWorkflowScoreOutbox.objects.filter(submission_uuid=uuid).count(), 1)
+
+    def _create_scorable_workflows(self):
+        """
+        Create submissions and workflows for two students in ITEM_1, who
+        assess each other and themselves, so that both workflows can be
+        scored with requirements of one assessment.
+
+        Returns:
+            list of the two submission UUIDs.
+        """
+        students = ["Optimus Prime 001", "Bumblebee"]
+        uuids = []
+        for student_id in students:
+            submission = sub_api.create_submission(dict(ITEM_1, student_id=student_id), "Shoot Hot Rod")
+            workflow_api.create_workflow(submission["uuid"])
+            uuids.append(submission["uuid"])
+
+        for scorer_uuid, student_id in zip(uuids, students):
+            peer_api.get_submission_to_assess(scorer_uuid, 1)
+            peer_api.create_assessment(scorer_uuid, student_id, {"clarity": "clear"}, dict(), "", RUBRIC, 1)
+            self_api.create_assessment(scorer_uuid, student_id, {"clarity": "clear"}, RUBRIC)
+        return uuids
+
+    def _status_counts(self):
+        """
+        Return the number of workflows for ITEM_1 in each status, in the
+        order of `AssessmentWorkflow.STATUS_VALUES`.
+        """
+        return [
+            status_count["count"]
+            for status_count in workflow_api.get_status_counts(ITEM_1["course_id"], ITEM_1["item_id"])
+        ]
+
     def _create_workflow_with_status(self, student_id, course_id, item_id, status, answer="answer"):
         """
         Create a submission and workflow with a given status.
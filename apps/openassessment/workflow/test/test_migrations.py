@@ -0,0 +1,66 @@
+"""
+Tests for the workflow data migrations.
+
+The data migrations only run once, while the test database is empty,
+so they are run here again directly against the test data.
+"""
+from south.migration import Migrations
+
+from openassessment.test_utils import CacheResetTest
+from openassessment.workflow import api as workflow_api
+from openassessment.workflow.models import AssessmentWorkflow, AssessmentWorkflowStatusCount
+from submissions import api as sub_api
+
+from .test_api import ITEM_1
+
+
+class TestDataMigrations(CacheResetTest):
+
+    def test_mark_done_workflows_complete(self):
+        done_uuid = self._create_workflow("Optimus Prime 001")
+        peer_uuid = self._create_workflow("Bumblebee")
+        AssessmentWorkflow.objects.filter(submission_uuid=done_uuid).update(status="done")
+
+        self._migrate("0004_mark_done_workflows_complete")
+
+        done = AssessmentWorkflow.objects.get(submission_uuid=done_uuid)
+        self.assertTrue(done.peer_complete)
+        self.assertTrue(done.self_complete)
+        self.assertFalse(done.needs_update)
+        peer = AssessmentWorkflow.objects.get(submission_uuid=peer_uuid)
+        self.assertFalse(peer.peer_complete)
+        self.assertTrue(peer.needs_update)
+
+    def test_count_workflow_statuses(self):
+        uuids = [
+            self._create_workflow(student_id)
+            for student_id in ["Optimus Prime 001", "Bumblebee", "Ironhide"]
+        ]
+        self._create_workflow("Optimus Prime 001", item_id="other item")
+        AssessmentWorkflow.objects.filter(submission_uuid=uuids[0]).update(status="waiting")
+        AssessmentWorkflowStatusCount.objects.all().delete()
+
+        self._migrate("0006_count_workflow_statuses")
+        for item_id in [ITEM_1["item_id"], "other item"]:
+            self.assertEqual(
+                AssessmentWorkflowStatusCount.counts_for_item(ITEM_1["course_id"], item_id),
+                AssessmentWorkflow.count_by_status(ITEM_1["course_id"], item_id)
+            )
+
+        self._migrate("0006_count_workflow_statuses", backwards=True)
+        self.assertFalse(AssessmentWorkflowStatusCount.objects.exists())
+
+    def _create_workflow(self, student_id, item_id=ITEM_1["item_id"]):
+        """Create a submission and workflow, and return the submission UUID."""
+        submission = sub_api.create_submission(dict(ITEM_1, student_id=student_id, item_id=item_id), "answer")
+        workflow_api.create_workflow(submission["uuid"])
+        return submission["uuid"]
+
+    @staticmethod
+    def _migrate(name, backwards=False):
+        """Run a workflow migration against the test database."""
+        migration = Migrations('workflow')[name]
+        if backwards:
+            migration.backwards()(migration.orm())
+        else:
+            migration.forwards()(migration.orm())
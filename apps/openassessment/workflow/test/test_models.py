@@ -1,11 +1,46 @@
+from django.db import DatabaseError, transaction
 from django.test import TestCase
 from mock import patch
 from nose.tools import raises
 
-from openassessment.workflow.models import emit_event
+from openassessment.test_utils import TransactionCacheResetTest
+from openassessment.workflow import api as workflow_api
+from openassessment.workflow.models import AssessmentWorkflow, AssessmentWorkflowStatusCount, emit_event
 from openassessment.workflow.test.events import fake_event_logger
+from submissions import api as sub_api
+
+from .test_api import ITEM_1
 
 class TestEmitEvent(TestCase):
 
     def test_emit_wired_correctly(self):
         self.assertEqual(emit_event, fake_event_logger)
+
+
+class TestStatusCountsOnSave(TransactionCacheResetTest):
+
+    def setUp(self):
+        super(TestStatusCountsOnSave, self).setUp()
+        submission = sub_api.create_submission(ITEM_1, "Shoot Hot Rod")
+        workflow_api.create_workflow(submission["uuid"])
+        self.workflow = AssessmentWorkflow.objects.get(submission_uuid=submission["uuid"])
+
+    def test_counted_in_callers_transaction(self):
+        # If the caller rolls back, the count goes back with the workflow
+        with self.assertRaises(DatabaseError):
+            with transaction.commit_on_success():
+                self.workflow.status = "self"
+                self.workflow.save()
+                raise DatabaseError("Kaboom!")
+        self.assertEqual(AssessmentWorkflow.objects.get(id=self.workflow.id).status, "peer")
+        self.assertEqual(self._counts(), {"peer": 1})
+
+    def test_counted_once(self):
+        self.workflow.status = "self"
+        self.workflow.save()
+        self.workflow.save()
+        self.assertEqual(self._counts(), {"peer": 0, "self": 1})
+
+    @staticmethod
+    def _counts():
+        return AssessmentWorkflowStatusCount.counts_for_item(ITEM_1["course_id"], ITEM_1["item_id"])
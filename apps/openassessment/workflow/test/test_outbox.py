@@ -0,0 +1,155 @@
+"""
+Tests for publishing the scores queued by workflows that are done.
+"""
+from django.db import DatabaseError, IntegrityError
+from mock import patch
+
+from openassessment.test_utils import TransactionCacheResetTest
+from openassessment.workflow import api as workflow_api
+from openassessment.workflow.models import (
+    AssessmentWorkflow, AssessmentWorkflowScoreOutbox, MAX_PUBLISH_ATTEMPTS
+)
+from submissions import api as sub_api
+from submissions.models import Score
+
+from .test_api import ITEM_1
+
+
+class TestScoreOutbox(TransactionCacheResetTest):
+
+    def setUp(self):
+        super(TestScoreOutbox, self).setUp()
+        self.uuids = []
+        for student_num in range(5):
+            submission = sub_api.create_submission(dict(ITEM_1, student_id=str(student_num)), "Shoot Hot Rod")
+            workflow_api.create_workflow(submission["uuid"])
+            self.uuids.append(submission["uuid"])
+        AssessmentWorkflowScoreOutbox.add_scores([
+            (workflow, {"points_earned": 2, "points_possible": 3})
+            for workflow in AssessmentWorkflow.objects.order_by('id')
+        ])
+
+        # A consumer standing in for the event logger
+        self.consumed = []
+        patcher = patch('openassessment.workflow.models.emit_event', side_effect=self._consume)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_publish_exactly_once(self):
+        self.assertEqual(AssessmentWorkflowScoreOutbox.publish_pending(batch_size=2), 5)
+        self.assertEqual(workflow_api.publish_scores(), 0)
+        self._assert_published(self.uuids)
+
+        for uuid in self.uuids:
+            score = sub_api.get_latest_score_for_submission(uuid)
+            self.assertEqual((score["points_earned"], score["points_possible"]), (2, 3))
+
+    def test_failed_scores_retried(self):
+        # Only the first batch can be recorded, so the rest wait
+        original_set_scores = sub_api.set_scores
+        with patch.object(sub_api, 'set_scores') as mock_set_scores:
+            mock_set_scores.side_effect = self._fail_after(original_set_scores, 1)
+            self.assertEqual(AssessmentWorkflowScoreOutbox.publish_pending(batch_size=2), 2)
+        self._assert_published(self.uuids[:2])
+
+        # Publishing again picks up where we left off
+        self.assertEqual(workflow_api.publish_scores(), 3)
+        self._assert_published(self.uuids)
+
+    def test_bad_score_parked(self):
+        # The oldest score is for a submission that doesn't exist
+        AssessmentWorkflowScoreOutbox.objects.filter(
+            submission_uuid=self.uuids[0]
+        ).update(submission_uuid=u"no such submission")
+        self.uuids = self.uuids[1:]
+
+        self.assertEqual(workflow_api.publish_scores(), 4)
+        self._assert_published(self.uuids)
+
+        # It is tried again a few times, then left alone
+        for __ in range(MAX_PUBLISH_ATTEMPTS - 1):
+            self.assertEqual(workflow_api.publish_scores(), 0)
+        bad_entry = AssessmentWorkflowScoreOutbox.objects.get(submission_uuid=u"no such submission")
+        self.assertIsNone(bad_entry.published_at)
+        self.assertEqual(bad_entry.publish_attempts, MAX_PUBLISH_ATTEMPTS)
+
+        with patch.object(sub_api, 'set_scores') as mock_set_scores:
+            self.assertEqual(workflow_api.publish_scores(), 0)
+            self.assertFalse(mock_set_scores.called)
+
+    def test_publish_after_integrity_error(self):
+        # Another process creates a score summary while we record the scores,
+        # so they are recorded one at a time in the same commit
+        with patch.object(Score.objects, 'bulk_create') as mock_bulk_create:
+            mock_bulk_create.side_effect = IntegrityError("Summary exists!")
+            self.assertEqual(AssessmentWorkflowScoreOutbox.publish_pending(batch_size=2), 5)
+        self._assert_published(self.uuids)
+
+    def test_scores_committed_with_batch(self):
+        # If the batch fails after recording its scores, they are rolled back too
+        with patch('openassessment.workflow.models.emit_event') as mock_emit:
+            mock_emit.side_effect = IOError("Kaboom!")
+            with self.assertRaises(IOError):
+                AssessmentWorkflowScoreOutbox.publish_pending(batch_size=2)
+        self._assert_published([])
+
+        self.assertEqual(workflow_api.publish_scores(), 5)
+        self._assert_published(self.uuids)
+
+    def test_interleaved_publishers(self):
+        # A second publisher runs while the first is recording its batch
+        original_set_scores = sub_api.set_scores
+        other_published = []
+
+        def _set_scores_interleaved(scores):
+            if not other_published:
+                other_published.append(None)
+                other_published[0] = AssessmentWorkflowScoreOutbox.publish_pending()
+            return original_set_scores(scores)
+
+        with patch.object(sub_api, 'set_scores') as mock_set_scores:
+            mock_set_scores.side_effect = _set_scores_interleaved
+            num_published = AssessmentWorkflowScoreOutbox.publish_pending(batch_size=2)
+
+        # The second publisher left the first's batch alone
+        self.assertEqual(other_published, [3])
+        self.assertEqual(num_published, 2)
+        self._assert_published(self.uuids)
+
+    def test_publish_error_wrapped(self):
+        with patch.object(AssessmentWorkflowScoreOutbox.objects, 'filter') as mock_filter:
+            mock_filter.side_effect = DatabaseError("Kaboom!")
+            with self.assertRaises(workflow_api.AssessmentWorkflowInternalError):
+                workflow_api.publish_scores()
+        self._assert_published([])
+
+    def _consume(self, event):
+        """Record the submission of an emitted score event."""
+        self.consumed.append(event["event"]["submission_uuid"])
+
+    @staticmethod
+    def _fail_after(func, num_calls):
+        """Return a function that calls `func` the first `num_calls` times, then fails."""
+        calls = []
+
+        def _call(*args, **kwargs):
+            calls.append(args)
+            if len(calls) > num_calls:
+                raise sub_api.SubmissionInternalError("Kaboom!")
+            return func(*args, **kwargs)
+        return _call
+
+    def _assert_published(self, uuids):
+        """
+        Check that exactly the scores of `uuids` have been recorded and
+        emitted, each once, and the rest are still waiting.
+        """
+        self.assertEqual(sorted(self.consumed), sorted(uuids))
+        self.assertEqual(
+            sorted(Score.objects.values_list('submission__uuid', flat=True)),
+            sorted(uuids)
+        )
+        self.assertEqual(
+            sorted(AssessmentWorkflowScoreOutbox.pending_scores(self.uuids).keys()),
+            sorted(set(self.uuids) - set(uuids))
+        )
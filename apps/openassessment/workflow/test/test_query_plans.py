@@ -0,0 +1,42 @@
+"""
+Check that the workflow queries used by the course staff views are
+served by indexes, rather than by scanning the workflow table.
+"""
+from openassessment.test_utils import QueryPlanTest
+from openassessment.workflow import api as workflow_api
+from openassessment.workflow.models import AssessmentWorkflow
+from submissions import api as sub_api
+
+from .test_api import ITEM_1, REQUIREMENTS
+
+
+class TestWorkflowQueryPlans(QueryPlanTest):
+
+    INDEXED_MODELS = [AssessmentWorkflow]
+
+    def test_get_status_counts(self):
+        submission = sub_api.create_submission(ITEM_1, "Shoot Hot Rod")
+        workflow_api.create_workflow(submission["uuid"])
+        self.assertQueryPlansUseIndexes(
+            ['workflow_assessmentworkflowstatuscount'],
+            workflow_api.get_status_counts, ITEM_1["course_id"], ITEM_1["item_id"]
+        )
+
+    def test_count_by_status(self):
+        submission = sub_api.create_submission(ITEM_1, "Shoot Hot Rod")
+        workflow_api.create_workflow(submission["uuid"])
+        self.assertQueryPlansUseIndexes(
+            ['workflow_assessmentworkflow'],
+            AssessmentWorkflow.count_by_status, ITEM_1["course_id"], ITEM_1["item_id"]
+        )
+
+    def test_get_workflows_for_item(self):
+        for student_id in ["Optimus Prime 001", "Bumblebee"]:
+            submission = sub_api.create_submission(dict(ITEM_1, student_id=student_id), "Shoot Hot Rod")
+            workflow_api.create_workflow(submission["uuid"])
+        self.assertQueryPlansUseIndexes(
+            ['workflow_assessmentworkflow'],
+            list, workflow_api.get_workflows_for_item(
+                ITEM_1["course_id"], ITEM_1["item_id"], REQUIREMENTS, page_size=1
+            )
+        )
@@ -10,6 +10,7 @@ from xblock.core import XBlock
 from openassessment.assessment import peer_api
 from openassessment.assessment import self_api
 from submissions import api as sub_api
+from submissions.caching import with_request_cache
 
 
 class GradeMixin(object):
@@ -24,6 +25,7 @@ class GradeMixin(object):
     """
 
     @XBlock.handler
+    @with_request_cache
     def render_grade(self, data, suffix=''):
         """
         Render the grade step.
@@ -126,6 +128,7 @@ class GradeMixin(object):
         )
 
     @XBlock.json_handler
+    @with_request_cache
     def submit_feedback(self, data, suffix=''):
         """
         Submit feedback on an assessment.
@@ -1,6 +1,7 @@
 """An XBlock where students can read a question and compose their response"""
 
 import datetime as dt
+import json
 import logging
 import dateutil
 import pkg_resources
@@ -27,6 +28,7 @@ from openassessment.xblock.workflow_mixin import WorkflowMixin
 from openassessment.workflow import api as workflow_api
 from openassessment.xblock.validation import validator
 from openassessment.xblock.resolve_dates import resolve_dates, DISTANT_PAST, DISTANT_FUTURE
+from submissions.caching import with_request_cache
 
 
 logger = logging.getLogger(__name__)
@@ -105,6 +107,12 @@ class OpenAssessmentBlock(
         help="The different parts of grading for students giving feedback."
     )
 
+    rubric_content_hash = String(
+        default=None,
+        scope=Scope.content,
+        help="The content hash of the rubric criteria, calculated when the rubric is updated."
+    )
+
     rubric_feedback_prompt = String(
         default=DEFAULT_RUBRIC_FEEDBACK_PROMPT,
         scope=Scope.content,
@@ -172,6 +180,7 @@ class OpenAssessmentBlock(
         )
         return student_item_dict
 
+    @with_request_cache
     def student_view(self, context=None):
         """The main view of OpenAssessmentBlock, displayed when viewing courses.
 
@@ -218,6 +227,45 @@ class OpenAssessmentBlock(
         frag.initialize_js('OpenAssessmentBlock')
         return frag
 
+    @XBlock.handler
+    @with_request_cache
+    def render_all_steps(self, data, suffix=''):
+        """
+        Render every step of the problem in one request.
+
+        The page uses this when it first loads, instead of rendering
+        each step with its own request.  The steps share a request cache,
+        so the workflow (for example) is only looked up once.
+
+        Args:
+            data: Passed on to the handler for each step.
+
+        Kwargs:
+            suffix: Not used.
+
+        Returns:
+            Response: A JSON object mapping each step ("submission",
+                "peer_assessment", "self_assessment" and "grade") to its HTML,
+                or to null if the step could not be rendered.
+        """
+        step_handlers = [
+            ("submission", self.render_submission),
+            ("peer_assessment", self.render_peer_assessment),
+            ("self_assessment", self.render_self_assessment),
+            ("grade", self.render_grade),
+        ]
+
+        steps = dict()
+        for step, handler in step_handlers:
+            try:
+                steps[step] = handler(data).text
+            except Exception:
+                # Let the page load the other steps, and request this one again
+                logger.exception(u"An error occurred while rendering the {} step.".format(step))
+                steps[step] = None
+
+        return Response(json.dumps(steps), content_type='application/json', charset='UTF-8')
+
     def staff_debug_template_context(self):
         """
         Template context dictionary for course staff debug panel.
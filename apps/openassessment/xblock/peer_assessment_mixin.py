@@ -7,6 +7,7 @@ from openassessment.assessment.peer_api import (
     PeerAssessmentWorkflowError
 )
 import openassessment.workflow.api as workflow_api
+from submissions.caching import with_request_cache
 from .resolve_dates import DISTANT_FUTURE
 
 logger = logging.getLogger(__name__)
@@ -26,6 +27,7 @@ class PeerAssessmentMixin(object):
     """
 
     @XBlock.json_handler
+    @with_request_cache
     def peer_assess(self, data, suffix=''):
         """Place a peer assessment into OpenAssessment system
 
@@ -69,7 +71,8 @@ class PeerAssessmentMixin(object):
                     self._clean_criterion_feedback(data['criterion_feedback']),
                     data['overall_feedback'],
                     rubric_dict,
-                    assessment_ui_model['must_be_graded_by']
+                    assessment_ui_model['must_be_graded_by'],
+                    rubric_content_hash=self.rubric_content_hash
                 )
 
                 # Emit analytics event...
@@ -95,12 +98,15 @@ class PeerAssessmentMixin(object):
             # Temp kludge until we fix JSON serialization for datetime
             assessment["scored_at"] = str(assessment["scored_at"])
 
+            self.prefetch_peer_submission(assessment_ui_model)
+
             return {'success': True, 'msg': u''}
 
         else:
             return {'success': False, 'msg': _('Could not load peer assessment.')}
 
     @XBlock.handler
+    @with_request_cache
     def render_peer_assessment(self, data, suffix=''):
         """Renders the Peer Assessment HTML section of the XBlock
 
@@ -204,6 +210,36 @@ class PeerAssessmentMixin(object):
 
         return path, context_dict
 
+    def prefetch_peer_submission(self, assessment):
+        """
+        Hand out the next submission to peer-assess after the student submits
+        an assessment, so that rendering the peer step again doesn't have to.
+
+        Nothing is prefetched for a student who has just completed the
+        required number of assessments, since they may not continue grading.
+        If the prefetched submission is never rendered, its lease expires
+        like any other.
+
+        Args:
+            assessment (dict): A dict describing the requirements for grading.
+
+        Returns:
+            None
+
+        """
+        try:
+            __, count = peer_api.has_finished_required_evaluating(
+                self.submission_uuid, assessment["must_grade"]
+            )
+            if count != assessment["must_grade"]:
+                peer_api.prefetch_submission_to_assess(
+                    self.submission_uuid,
+                    assessment["must_be_graded_by"],
+                    True
+                )
+        except (PeerAssessmentWorkflowError, PeerAssessmentInternalError):
+            logger.exception(u"Could not prefetch a peer submission for {}".format(self.submission_uuid))
+
     def get_peer_submission(self, student_item_dict, assessment):
         """
         Retrieve a submission to peer-assess.
@@ -218,11 +254,13 @@ class PeerAssessmentMixin(object):
         """
         peer_submission = False
         try:
-            peer_submission = peer_api.get_submission_to_assess(
-                self.submission_uuid,
-                assessment["must_be_graded_by"],
-                True
-            )
+            peer_submission = peer_api.get_prefetched_submission(self.submission_uuid)
+            if not peer_submission:
+                peer_submission = peer_api.get_submission_to_assess(
+                    self.submission_uuid,
+                    assessment["must_be_graded_by"],
+                    True
+                )
             self.runtime.publish(
                 self,
                 "openassessmentblock.get_peer_submission",
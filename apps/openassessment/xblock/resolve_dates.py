@@ -5,6 +5,7 @@ import datetime as dt
 import pytz
 from dateutil.parser import parse as parse_date
 from django.utils.translation import ugettext as _
+from submissions.caching import request_cached
 
 
 class InvalidDateFormat(Exception):
@@ -51,6 +52,7 @@ def _parse_date(value):
         raise InvalidDateFormat(_("'{date}' must be a date string or datetime").format(date=value))
 
 
+@request_cached()
 def resolve_dates(start, end, date_ranges):
     """
     Resolve date strings (including "default" dates) to datetimes.
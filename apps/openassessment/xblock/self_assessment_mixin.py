@@ -5,6 +5,7 @@ from xblock.core import XBlock
 from openassessment.assessment import self_api
 from openassessment.workflow import api as workflow_api
 from submissions import api as submission_api
+from submissions.caching import with_request_cache
 from .resolve_dates import DISTANT_FUTURE
 
 logger = logging.getLogger(__name__)
@@ -23,6 +24,7 @@ class SelfAssessmentMixin(object):
     """
 
     @XBlock.handler
+    @with_request_cache
     def render_self_assessment(self, data, suffix=''):
         try:
             path, context = self.self_path_and_context()
@@ -86,6 +88,7 @@ class SelfAssessmentMixin(object):
         return path, context
 
     @XBlock.json_handler
+    @with_request_cache
     def self_assess(self, data, suffix=''):
         """
         Create a self-assessment for a submission.
@@ -106,7 +109,8 @@ class SelfAssessmentMixin(object):
                 self.submission_uuid,
                 self.get_student_item_dict()['student_id'],
                 data['options_selected'],
-                {"criteria": self.rubric_criteria}
+                {"criteria": self.rubric_criteria},
+                rubric_content_hash=self.rubric_content_hash
             )
             self.runtime.publish(
                 self,
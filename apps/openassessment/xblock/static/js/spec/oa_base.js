@@ -25,6 +25,13 @@ describe("OpenAssessment.BaseView", function() {
                 defer.resolveWith(this, [server.fragments[component]]);
             }).promise();
         };
+
+        this.renderAll = function() {
+            var server = this;
+            return $.Deferred(function(defer) {
+                defer.resolveWith(this, [$.extend({}, server.fragments)]);
+            }).promise();
+        };
     };
 
     // Stub runtime
@@ -66,6 +73,41 @@ describe("OpenAssessment.BaseView", function() {
         view = new OpenAssessment.BaseView(runtime, el, server);
     });
 
+    it("Loads every step in a single request", function() {
+        spyOn(server, 'renderAll').andCallThrough();
+        spyOn(server, 'render').andCallThrough();
+        loadSubviews(function() {
+            expect(server.renderAll).toHaveBeenCalled();
+            expect(server.render).not.toHaveBeenCalled();
+            expect($('#openassessment__grade', view.element).length).toEqual(1);
+        });
+    });
+
+    it("Loads a step on its own if it could not be rendered with the others", function() {
+        spyOn(server, 'renderAll').andCallFake(function() {
+            var steps = $.extend({}, server.fragments, {grade: null});
+            return $.Deferred(function(defer) { defer.resolveWith(server, [steps]); }).promise();
+        });
+        spyOn(server, 'render').andCallThrough();
+        loadSubviews(function() {
+            expect(server.render).toHaveBeenCalledWith('grade');
+            expect(server.render.callCount).toEqual(1);
+        });
+    });
+
+    it("Loads each step on its own if the steps could not be rendered together", function() {
+        spyOn(server, 'renderAll').andCallFake(function() {
+            return $.Deferred(function(defer) { defer.rejectWith(server, ['Error']); }).promise();
+        });
+        spyOn(server, 'render').andCallThrough();
+        loadSubviews(function() {
+            expect(server.render).toHaveBeenCalledWith('submission');
+            expect(server.render).toHaveBeenCalledWith('peer_assessment');
+            expect(server.render).toHaveBeenCalledWith('self_assessment');
+            expect(server.render).toHaveBeenCalledWith('grade');
+        });
+    });
+
     it("Sends a self assessment to the server", function() {
         loadSubviews(function() {
             spyOn(server, 'selfAssess').andCallThrough();
@@ -51,6 +51,26 @@ describe("OpenAssessment.Server", function() {
         });
     });
 
+    it("renders every step of the XBlock in a single request", function() {
+        var steps = {
+            submission: "<div>Response</div>",
+            peer_assessment: "<div>Peer</div>",
+            self_assessment: "<div>Self</div>",
+            grade: null
+        };
+        stubAjax(true, steps);
+
+        var loadedSteps = null;
+        server.renderAll().done(function(data) {
+            loadedSteps = data;
+        });
+
+        expect(loadedSteps).toEqual(steps);
+        expect($.ajax).toHaveBeenCalledWith({
+            url: '/render_all_steps', type: "POST", dataType: "json"
+        });
+    });
+
     it("sends a submission to the XBlock", function() {
         // Status, student ID, attempt number
         stubAjax(true, [true, 1, 2]);
@@ -176,6 +196,17 @@ describe("OpenAssessment.Server", function() {
         expect(receivedMsg).toContain("This section could not be loaded");
     });
 
+    it("informs the caller of an Ajax error when rendering every step", function() {
+        stubAjax(false, null);
+
+        var receivedMsg = "";
+        server.renderAll().fail(function(msg) {
+            receivedMsg = msg;
+        });
+
+        expect(receivedMsg).toContain("This section could not be loaded");
+    });
+
     it("informs the caller of an Ajax error when sending a submission", function() {
         stubAjax(false, null);
 
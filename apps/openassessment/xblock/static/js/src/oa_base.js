@@ -59,12 +59,24 @@ OpenAssessment.BaseView.prototype = {
 
     /**
      * Asynchronously load each sub-view into the DOM.
+     *
+     * If the server can render every step in a single request, use it;
+     * otherwise, fall back to rendering each step with its own request.
      */
     load: function() {
-        this.responseView.load();
-        this.peerView.load();
-        this.renderSelfAssessmentStep();
-        this.gradeView.load();
+        var view = this;
+        if (this.server.renderAll instanceof Function) {
+            this.server.renderAll().done(
+                function(steps) {
+                    view.loadSteps(steps);
+                }
+            ).fail(function(errMsg) {
+                view.loadEachStep();
+            });
+        }
+        else {
+            this.loadEachStep();
+        }
 
         // Set up expand/collapse for course staff debug, if available
         courseStaffDebug = $('.wrapper--staff-info');
@@ -73,6 +85,38 @@ OpenAssessment.BaseView.prototype = {
         }
     },
 
+    /**
+    Render each step with its own request.
+    **/
+    loadEachStep: function() {
+        this.responseView.load();
+        this.peerView.load();
+        this.renderSelfAssessmentStep();
+        this.gradeView.load();
+    },
+
+    /**
+    Load the HTML of every step, rendered in a single request.
+    Steps that the server could not render are requested again on their own.
+
+    Args:
+        steps (object): Maps each component ("submission", "peer_assessment",
+            "self_assessment" and "grade") to its HTML, or to null.
+    **/
+    loadSteps: function(steps) {
+        if (steps.submission) { this.responseView.loadHtml(steps.submission); }
+        else { this.responseView.load(); }
+
+        if (steps.peer_assessment) { this.peerView.loadHtml(steps.peer_assessment); }
+        else { this.peerView.load(); }
+
+        if (steps.self_assessment) { this.loadSelfAssessmentHtml(steps.self_assessment); }
+        else { this.renderSelfAssessmentStep(); }
+
+        if (steps.grade) { this.gradeView.loadHtml(steps.grade); }
+        else { this.gradeView.load(); }
+    },
+
     /**
     Render the self-assessment step.
     **/
@@ -80,39 +124,50 @@ OpenAssessment.BaseView.prototype = {
         var view = this;
         this.server.render('self_assessment').done(
             function(html) {
+                view.loadSelfAssessmentHtml(html);
+            }
+        ).fail(function(errMsg) {
+            view.showLoadError('self-assessment');
+        });
+    },
 
-                // Load the HTML
-                $('#openassessment__self-assessment', view.element).replaceWith(html);
-                var sel = $('#openassessment__self-assessment', view.element);
-
-                // Install a click handler for collapse/expand
-                view.setUpCollapseExpand(sel);
-
-                // Install a change handler for rubric options to enable/disable the submit button
-                $("#self-assessment--001__assessment", view.element).change(
-                    function() {
-                        var numChecked = $('input[type=radio]:checked', this).length;
-                        var numAvailable = $('.field--radio.assessment__rubric__question', this).length;
-                        $("#self-assessment--001__assessment__submit", view.element).toggleClass(
-                            'is--disabled', numChecked != numAvailable
-                        );
-                    }
-                );
+    /**
+    Load the HTML of the self-assessment step and install event handlers.
+
+    Args:
+        html (string): The rendered self-assessment step.
+    **/
+    loadSelfAssessmentHtml: function(html) {
+        var view = this;
+
+        // Load the HTML
+        $('#openassessment__self-assessment', view.element).replaceWith(html);
+        var sel = $('#openassessment__self-assessment', view.element);
 
-                // Install a click handler for the submit button
-                sel.find('#self-assessment--001__assessment__submit').click(
-                    function(eventObject) {
-                        // Override default form submission
-                        eventObject.preventDefault();
+        // Install a click handler for collapse/expand
+        view.setUpCollapseExpand(sel);
 
-                        // Handle the click
-                        view.selfAssess();
-                    }
+        // Install a change handler for rubric options to enable/disable the submit button
+        $("#self-assessment--001__assessment", view.element).change(
+            function() {
+                var numChecked = $('input[type=radio]:checked', this).length;
+                var numAvailable = $('.field--radio.assessment__rubric__question', this).length;
+                $("#self-assessment--001__assessment__submit", view.element).toggleClass(
+                    'is--disabled', numChecked != numAvailable
                 );
             }
-        ).fail(function(errMsg) {
-            view.showLoadError('self-assessment');
-        });
+        );
+
+        // Install a click handler for the submit button
+        sel.find('#self-assessment--001__assessment__submit').click(
+            function(eventObject) {
+                // Override default form submission
+                eventObject.preventDefault();
+
+                // Handle the click
+                view.selfAssess();
+            }
+        );
     },
 
     /**
@@ -25,15 +25,24 @@ OpenAssessment.GradeView.prototype = {
         var baseView = this.baseView;
         this.server.render('grade').done(
             function(html) {
-                // Load the HTML and install event handlers
-                $('#openassessment__grade', view.element).replaceWith(html);
-                view.installHandlers();
+                view.loadHtml(html);
             }
         ).fail(function(errMsg) {
             baseView.showLoadError('grade', errMsg);
         });
     },
 
+    /**
+    Load the HTML of the grade view and install event handlers.
+
+    Args:
+        html (string): The rendered grade step.
+    **/
+    loadHtml: function(html) {
+        $('#openassessment__grade', this.element).replaceWith(html);
+        this.installHandlers();
+    },
+
     /**
     Install event handlers for the view.
     **/
@@ -25,15 +25,24 @@ OpenAssessment.PeerView.prototype = {
         var view = this;
         this.server.render('peer_assessment').done(
             function(html) {
-                // Load the HTML and install event handlers
-                $('#openassessment__peer-assessment', view.element).replaceWith(html);
-                view.installHandlers();
+                view.loadHtml(html);
             }
         ).fail(function(errMsg) {
             view.showLoadError('peer-assessment');
         });
     },
 
+    /**
+    Load the HTML of the peer assessment view and install event handlers.
+
+    Args:
+        html (string): The rendered peer assessment step.
+    **/
+    loadHtml: function(html) {
+        $('#openassessment__peer-assessment', this.element).replaceWith(html);
+        this.installHandlers();
+    },
+
     /**
     Load the continued grading version of the view.
     This is a version of the peer grading step that a student
@@ -25,15 +25,24 @@ OpenAssessment.ResponseView.prototype = {
         var view = this;
         this.server.render('submission').done(
             function(html) {
-                // Load the HTML and install event handlers
-                $('#openassessment__response', view.element).replaceWith(html);
-                view.installHandlers();
+                view.loadHtml(html);
             }
         ).fail(function(errMsg) {
             view.baseView.showLoadError('response');
         });
     },
 
+    /**
+    Load the HTML of the response (submission) view and install event handlers.
+
+    Args:
+        html (string): The rendered response step.
+    **/
+    loadHtml: function(html) {
+        $('#openassessment__response', this.element).replaceWith(html);
+        this.installHandlers();
+    },
+
     /**
     Install event handlers for the view.
     **/
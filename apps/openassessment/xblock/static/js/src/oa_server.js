@@ -61,6 +61,37 @@ OpenAssessment.Server.prototype = {
         }).promise();
     },
 
+    /**
+    Render every step of the XBlock in a single request.
+
+    Returns:
+        A JQuery promise, which resolves with an object mapping each component
+        ("submission", "peer_assessment", "self_assessment" and "grade") to its HTML,
+        and fails with an error message.  A component's HTML is null if the server
+        could not render it.
+
+    Example:
+        server.renderAll().done(
+            function(steps) { console.log(steps.submission); }
+        ).fail(
+            function(err) { console.log(err); }
+        )
+    **/
+    renderAll: function() {
+        var url = this.url('render_all_steps');
+        return $.Deferred(function(defer) {
+            $.ajax({
+                url: url,
+                type: "POST",
+                dataType: "json"
+            }).done(function(data) {
+                defer.resolveWith(this, [data]);
+            }).fail(function(data) {
+                defer.rejectWith(this, [gettext('This section could not be loaded.')]);
+            });
+        }).promise();
+    },
+
     /**
      Render the Peer Assessment Section after a complete workflow, in order to
      continue grading peers.
@@ -8,6 +8,7 @@ from django.template.loader import get_template
 from django.utils.translation import ugettext as _
 from xblock.core import XBlock
 from xblock.fragment import Fragment
+from submissions.caching import with_request_cache
 from openassessment.xblock.xml import serialize_content, update_from_xml_str, ValidationError, UpdateFromXmlError
 from openassessment.xblock.validation import validator
 
@@ -94,6 +95,7 @@ class StudioMixin(object):
             return {'success': True, 'msg': '', 'xml': xml}
 
     @XBlock.json_handler
+    @with_request_cache
     def check_released(self, data, suffix=''):
         """
         Check whether the problem has been released.
@@ -5,6 +5,7 @@ from django.utils.translation import ugettext as _
 from xblock.core import XBlock
 
 from submissions import api
+from submissions.caching import with_request_cache
 from openassessment.workflow import api as workflow_api
 from .resolve_dates import DISTANT_FUTURE
 
@@ -35,6 +36,7 @@ class SubmissionMixin(object):
     }
 
     @XBlock.json_handler
+    @with_request_cache
     def submit(self, data, suffix=''):
         """Place the submission text into Openassessment system
 
@@ -176,6 +178,7 @@ class SubmissionMixin(object):
         return _(u'This response has been saved but not submitted.') if self.has_saved else _(u'This response has not been saved.')
 
     @XBlock.handler
+    @with_request_cache
     def render_submission(self, data, suffix=''):
         """Renders the Submission HTML section of the XBlock
 
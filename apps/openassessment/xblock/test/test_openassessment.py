@@ -156,6 +156,25 @@ class TestOpenAssessment(XBlockHandlerTestCase):
         self.assertEqual(student_item['course_id'], 'test_course')
         self.assertEqual(student_item['student_id'], 'test_student')
 
+    @scenario('data/basic_scenario.xml', user_id='Bob')
+    def test_render_all_steps(self, xblock):
+        steps = self.request(xblock, 'render_all_steps', '', response_format='json')
+        self.assertItemsEqual(steps.keys(), ['submission', 'peer_assessment', 'self_assessment', 'grade'])
+        self.assertIn('openassessment__response', steps['submission'])
+        self.assertIn('openassessment__peer-assessment', steps['peer_assessment'])
+        self.assertIn('openassessment__self-assessment', steps['self_assessment'])
+        self.assertIn('openassessment__grade', steps['grade'])
+
+    @scenario('data/basic_scenario.xml', user_id='Bob')
+    def test_render_all_steps_error(self, xblock):
+        # If one step can't be rendered, the others are still returned
+        with patch.object(xblock, 'render_grade') as mock_render:
+            mock_render.side_effect = ValueError("Oh no!")
+            steps = self.request(xblock, 'render_all_steps', '', response_format='json')
+
+        self.assertIs(steps['grade'], None)
+        self.assertIn('openassessment__response', steps['submission'])
+
 
 class TestCourseStaff(XBlockHandlerTestCase):
     """
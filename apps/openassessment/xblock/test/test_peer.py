@@ -197,6 +197,40 @@ class TestPeerAssessment(XBlockHandlerTestCase):
         self.assertIn("Peer Assessments Complete", peer_response.body)
 
 
+    @scenario('data/over_grade_scenario.xml', user_id='Bob')
+    def test_prefetched_peer_submission(self, xblock):
+        student_item = xblock.get_student_item_dict()
+        sally_student_item = copy.deepcopy(student_item)
+        sally_student_item['student_id'] = "Sally"
+        sally_submission = xblock.create_submission(sally_student_item, u"Sally answers")
+        xblock.create_submission(student_item, u"Bob's answer")
+
+        # After Bob's assessment, his next submission is handed out and cached
+        xblock.prefetch_peer_submission(xblock.get_assessment_module('peer-assessment'))
+        prefetched = peer_api.get_prefetched_submission(xblock.submission_uuid)
+        self.assertEqual(prefetched['uuid'], sally_submission['uuid'])
+
+        # Rendering the peer step uses the prefetched submission
+        request = namedtuple('Request', 'params')
+        request.params = {}
+        with mock.patch.object(peer_api, 'get_submission_to_assess') as mock_get:
+            peer_response = xblock.render_peer_assessment(request)
+        self.assertFalse(mock_get.called)
+        self.assertIn(u"Sally answers".encode('utf-8'), peer_response.body)
+
+        # Once Bob assesses it, it's no longer prefetched
+        peer_api.create_assessment(
+            xblock.submission_uuid,
+            student_item['student_id'],
+            self.ASSESSMENT['options_selected'],
+            self.ASSESSMENT['criterion_feedback'],
+            self.ASSESSMENT['overall_feedback'],
+            {'criteria': xblock.rubric_criteria},
+            1
+        )
+        self.assertIsNone(peer_api.get_prefetched_submission(xblock.submission_uuid))
+
+
 @ddt.ddt
 class TestPeerAssessmentRender(XBlockHandlerTestCase):
     """
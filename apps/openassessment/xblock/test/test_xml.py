@@ -9,6 +9,7 @@ import pytz
 import dateutil.parser
 from django.test import TestCase
 from ddt import ddt, data, file_data, unpack
+from openassessment.assessment.models import Rubric
 from openassessment.xblock.openassessmentblock import OpenAssessmentBlock, UI_MODELS
 from openassessment.xblock.xml import (
     serialize_content, update_from_xml_str, ValidationError, UpdateFromXmlError
@@ -327,6 +328,10 @@ class TestUpdateFromXml(TestCase):
         self.assertEqual(self.oa_block.submission_due, data['submission_due'])
         self.assertEqual(self.oa_block.rubric_criteria, data['criteria'])
         self.assertEqual(self.oa_block.rubric_assessments, data['assessments'])
+        self.assertEqual(
+            self.oa_block.rubric_content_hash,
+            Rubric.content_hash_from_dict({'criteria': data['criteria']})
+        )
 
     @file_data('data/update_from_xml_error.json')
     def test_update_from_xml_error(self, data):
@@ -1,10 +1,12 @@
 from xblock.core import XBlock
 from openassessment.workflow import api as workflow_api
+from submissions.caching import with_request_cache
 
 
 class WorkflowMixin(object):
 
     @XBlock.json_handler
+    @with_request_cache
     def handle_workflow_info(self, data, suffix=''):
         return self.get_workflow_info()
 
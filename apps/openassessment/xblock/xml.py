@@ -6,6 +6,7 @@ import pytz
 import dateutil.parser
 import defusedxml.ElementTree as safe_etree
 from django.utils.translation import ugettext as _
+from openassessment.assessment.models import Rubric
 
 
 class UpdateFromXmlError(Exception):
@@ -535,6 +536,7 @@ def update_from_xml(oa_block, root, validator=DEFAULT_VALIDATOR):
     oa_block.title = title
     oa_block.prompt = rubric['prompt']
     oa_block.rubric_criteria = rubric['criteria']
+    oa_block.rubric_content_hash = Rubric.content_hash_from_dict({'criteria': rubric['criteria']})
     oa_block.rubric_assessments = assessments
     oa_block.rubric_feedback_prompt = rubric['feedbackprompt']
     oa_block.submission_start = submission_start
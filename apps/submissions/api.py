@@ -6,18 +6,25 @@ import copy
 import logging
 import json
 
-from django.core.cache import cache
-from django.db import IntegrityError, DatabaseError
+from django.db import IntegrityError, DatabaseError, transaction
+from django.db.models import Max
+from django.utils.timezone import now
 from dogapi import dog_stats_api
 
 from submissions.serializers import (
     SubmissionSerializer, StudentItemSerializer, ScoreSerializer, JsonFieldError
 )
+from submissions.caching import ImmutableCache, request_cached, clears_request_cache
 from submissions.models import Submission, StudentItem, Score, ScoreSummary
 
 logger = logging.getLogger("submissions.api")
 
 
+# Submissions and student items never change once they are created.
+SUBMISSION_CACHE = ImmutableCache("submissions.submission")
+STUDENT_ITEM_CACHE = ImmutableCache("submissions.student_item")
+
+
 class SubmissionError(Exception):
     """An error that occurs during submission actions.
 
@@ -61,6 +68,7 @@ class SubmissionRequestError(SubmissionError):
         self.field_errors = copy.deepcopy(field_errors)
 
 
+@clears_request_cache
 def create_submission(student_item_dict, answer, submitted_at=None,
                       attempt_number=None):
     """Creates a submission for assessment.
@@ -159,6 +167,7 @@ def create_submission(student_item_dict, answer, submitted_at=None,
         raise SubmissionInternalError(error_message)
 
 
+@request_cached()
 def get_submission(submission_uuid):
     """Retrieves a single submission by uuid.
 
@@ -186,38 +195,29 @@ def get_submission(submission_uuid):
             "submission_uuid ({!r}) must be a string type".format(submission_uuid)
         )
 
-    cache_key = "submissions.submission.{}".format(submission_uuid)
-    try:
-        cached_submission_data = cache.get(cache_key)
-    except Exception as ex:
-        # The cache backend could raise an exception
-        # (for example, memcache keys that contain spaces)
-        logger.exception("Error occurred while retrieving submission from the cache")
-        cached_submission_data = None
-
-    if cached_submission_data:
-        logger.info("Get submission {} (cached)".format(submission_uuid))
-        return cached_submission_data
+    def _get_submission_data():
+        """Serialize the submission from the database."""
+        try:
+            submission = Submission.objects.get(uuid=submission_uuid)
+            return SubmissionSerializer(submission).data
+        except Submission.DoesNotExist:
+            logger.error("Submission {} not found.".format(submission_uuid))
+            raise SubmissionNotFoundError(
+                u"No submission matching uuid {}".format(submission_uuid)
+            )
+        except Exception as exc:
+            # Something very unexpected has just happened (like DB misconfig)
+            err_msg = "Could not get submission due to error: {}".format(exc)
+            logger.exception(err_msg)
+            raise SubmissionInternalError(err_msg)
 
-    try:
-        submission = Submission.objects.get(uuid=submission_uuid)
-        submission_data = SubmissionSerializer(submission).data
-        cache.set(cache_key, submission_data)
-    except Submission.DoesNotExist:
-        logger.error("Submission {} not found.".format(submission_uuid))
-        raise SubmissionNotFoundError(
-            u"No submission matching uuid {}".format(submission_uuid)
-        )
-    except Exception as exc:
-        # Something very unexpected has just happened (like DB misconfig)
-        err_msg = "Could not get submission due to error: {}".format(exc)
-        logger.exception(err_msg)
-        raise SubmissionInternalError(err_msg)
+    submission_data = SUBMISSION_CACHE.get_or_compute(submission_uuid, _get_submission_data)
 
     logger.info("Get submission {}".format(submission_uuid))
     return submission_data
 
 
+@request_cached()
 def get_submission_and_student(uuid):
     """
     Retrieve a submission by its unique identifier, including the associated student item.
@@ -237,32 +237,24 @@ def get_submission_and_student(uuid):
     # This may raise API exceptions
     submission = get_submission(uuid)
 
-    # Retrieve the student item from the cache
-    cache_key = "submissions.student_item.{}".format(submission['student_item'])
-    try:
-        cached_student_item = cache.get(cache_key)
-    except:
-        # The cache backend could raise an exception
-        # (for example, memcache keys that contain spaces)
-        logger.exception("Error occurred while retrieving student item from the cache")
-        cached_student_item = None
-
-    if cached_student_item is not None:
-        submission['student_item'] = cached_student_item
-    else:
+    def _get_student_item_data():
+        """Serialize the student item from the database."""
         # There is probably a more idiomatic way to do this using the Django REST framework
         try:
             student_item = StudentItem.objects.get(id=submission['student_item'])
-            submission['student_item'] = StudentItemSerializer(student_item).data
-            cache.set(cache_key, submission['student_item'])
+            return StudentItemSerializer(student_item).data
         except Exception as ex:
             err_msg = "Could not get submission due to error: {}".format(ex)
             logger.exception(err_msg)
             raise SubmissionInternalError(err_msg)
 
+    submission['student_item'] = STUDENT_ITEM_CACHE.get_or_compute(
+        submission['student_item'], _get_student_item_data
+    )
     return submission
 
 
+@request_cached()
 def get_submissions(student_item_dict, limit=None):
     """Retrieves the submissions for the specified student item,
     ordered by most recent submitted date.
@@ -327,6 +319,7 @@ def get_submissions(student_item_dict, limit=None):
     return SubmissionSerializer(submission_models, many=True).data
 
 
+@request_cached()
 def get_score(student_item):
     """Get the score for a particular student item
 
@@ -378,6 +371,7 @@ def get_score(student_item):
         return ScoreSerializer(score).data
 
 
+@request_cached()
 def get_scores(course_id, student_id):
     """Return a dict mapping item_ids -> (points_earned, points_possible).
 
@@ -423,6 +417,7 @@ def get_scores(course_id, student_id):
     return scores
 
 
+@request_cached()
 def get_latest_score_for_submission(submission_uuid):
     """
     Retrieve the latest score for a particular submission.
@@ -446,6 +441,52 @@ def get_latest_score_for_submission(submission_uuid):
     return ScoreSerializer(score).data
 
 
+def get_latest_scores_for_submissions(submission_uuids):
+    """
+    Retrieve the latest score for many submissions at once.
+
+    This gives the same scores as calling `get_latest_score_for_submission()`
+    for each submission, but takes two queries however many submissions
+    there are.
+
+    Args:
+        submission_uuids (list of str): The UUIDs of the submissions.
+
+    Returns:
+        dict mapping the UUIDs of the submissions to their serialized
+        latest score.  Submissions with no score, or whose latest
+        score is hidden, are left out.
+
+    Raises:
+        SubmissionInternalError: An unexpected error occurred while retrieving the scores.
+
+    """
+    if not submission_uuids:
+        return dict()
+
+    try:
+        latest_ids = Score.objects.filter(
+            submission__uuid__in=submission_uuids
+        ).order_by().values('submission').annotate(
+            latest_id=Max('id')
+        ).values_list('latest_id', flat=True)
+        scores = Score.objects.filter(
+            id__in=list(latest_ids)
+        ).select_related('submission')
+        return {
+            score.submission.uuid: ScoreSerializer(score).data
+            for score in scores
+            if not score.is_hidden()
+        }
+    except DatabaseError:
+        msg = u"Could not fetch the latest scores for {} submissions".format(
+            len(submission_uuids)
+        )
+        logger.exception(msg)
+        raise SubmissionInternalError(msg)
+
+
+@clears_request_cache
 def reset_score(student_id, course_id, item_id):
     """
     Reset scores for a specific student on a specific problem.
@@ -493,6 +534,7 @@ def reset_score(student_id, course_id, item_id):
         logger.info(msg)
 
 
+@clears_request_cache
 def set_score(submission_uuid, points_earned, points_possible):
     """Set a score for a particular submission.
 
@@ -564,6 +606,104 @@ def set_score(submission_uuid, points_earned, points_possible):
         pass
 
 
+@clears_request_cache
+def set_scores(scores):
+    """Set the scores for many submissions at once.
+
+    This creates the same scores as calling `set_score()` for each
+    submission, using a few queries in total rather than a few per score.
+    Each submission should appear at most once.
+
+    The scores are written in the caller's transaction, so that a caller
+    can commit them along with its own changes; call this within
+    `transaction.commit_on_success()` to record all of the scores or none.
+
+    Args:
+        scores (list of dict): Each dict has the keys "submission_uuid",
+            "points_earned" and "points_possible", as for `set_score()`.
+
+    Returns:
+        None
+
+    Raises:
+        SubmissionInternalError: Thrown if there was an internal error while
+            attempting to save the scores.
+        SubmissionNotFoundError: Thrown if any of the submissions do not exist.
+
+    Examples:
+        >>> set_scores([
+        ...     {"submission_uuid": "a778b933-9fb3-11e3-9c0f-040ccee02800", "points_earned": 11, "points_possible": 12},
+        ...     {"submission_uuid": "b9af3c10-9fb3-11e3-9c0f-040ccee02800", "points_earned": 7, "points_possible": 12},
+        ... ])
+
+    """
+    if not scores:
+        return
+
+    submission_uuids = [score["submission_uuid"] for score in scores]
+    try:
+        submissions = dict(
+            (submission.uuid, submission)
+            for submission in Submission.objects.filter(
+                uuid__in=submission_uuids
+            ).select_related('student_item')
+        )
+    except DatabaseError:
+        error_msg = u"Could not retrieve submissions {}".format(submission_uuids)
+        logger.exception(error_msg)
+        raise SubmissionInternalError(error_msg)
+
+    missing = set(submission_uuids) - set(submissions)
+    if missing:
+        raise SubmissionNotFoundError(
+            u"No submissions matching uuids {}".format(list(missing))
+        )
+
+    created_at = now()
+    score_models = [
+        Score(
+            student_item=submissions[score["submission_uuid"]].student_item,
+            submission=submissions[score["submission_uuid"]],
+            points_earned=score["points_earned"],
+            points_possible=score["points_possible"],
+            created_at=created_at,
+        )
+        for score in scores
+    ]
+
+    savepoint = transaction.savepoint()
+    try:
+        Score.objects.bulk_create(score_models)
+
+        # Bulk inserts don't tell us the new ids, so we read them back
+        # to link the score summaries to the scores.
+        score_ids = dict(
+            Score.objects.filter(
+                submission__in=[score.submission for score in score_models],
+                created_at=created_at,
+            ).values_list('submission_id', 'id')
+        )
+        for score in score_models:
+            score.id = score_ids[score.submission_id]
+        ScoreSummary.update_for_scores(score_models)
+        transaction.savepoint_commit(savepoint)
+    except IntegrityError:
+        # Someone else created a score summary for one of the student items
+        # while we were writing ours, so we undo our writes (leaving the
+        # caller's transaction open) and score each submission in turn.
+        transaction.savepoint_rollback(savepoint)
+        for score in scores:
+            set_score(score["submission_uuid"], score["points_earned"], score["points_possible"])
+        return
+    except DatabaseError:
+        error_msg = u"Could not save scores for submissions {}".format(submission_uuids)
+        logger.exception(error_msg)
+        raise SubmissionInternalError(error_msg)
+
+    for score in score_models:
+        _log_score(score)
+
+
 def _log_submission(submission, student_item):
     """
     Log the creation of a submission.
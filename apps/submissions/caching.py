@@ -0,0 +1,536 @@
+"""
+Caching for objects that never change once they are written: submissions,
+student items, rubrics and completed assessments.
+
+Each kind of object gets its own `ImmutableCache`, which looks in a small
+cache in this process before the Django cache (e.g. memcached), and only
+then asks the caller to build the value from the database.  Because the
+objects never change, nothing is ever invalidated; bump a cache's `version`
+when the form of what it stores changes.
+
+Objects that *can* change (workflows, scores, feedback) are not cached
+between requests, but a read function can opt into being memoized for the
+rest of the request with `request_cached`.  Handlers (and the middleware,
+for Django views) open a `request_cache_scope`; the memoized values belong
+to the thread handling the request and are thrown away when the outermost
+scope ends, or as soon as a function decorated with `clears_request_cache`
+writes something.
+
+"""
+from contextlib import contextmanager
+import copy
+import cPickle as pickle
+from collections import OrderedDict
+from functools import wraps
+from hashlib import sha1
+import json
+import logging
+import threading
+import time
+
+from django.core.cache import cache
+from dogapi import dog_stats_api
+
+
+logger = logging.getLogger(__name__)
+
+
+# Every `ImmutableCache` created, so that tests can clear them all.
+_CACHES = []
+
+# Values memoized by `request_cached` for the request this thread is handling.
+# `values` is None when the thread is not inside a `request_cache_scope`.
+_request_state = threading.local()
+
+
+def clear_local_caches():
+    """
+    Forget everything cached in this process.
+
+    The Django cache is left alone.  Used by tests, since the database
+    (and so the IDs of the cached objects) is reset between them.
+
+    Returns:
+        None
+
+    """
+    for immutable_cache in _CACHES:
+        immutable_cache.clear_local()
+
+
+class LocalLRUCache(object):
+    """A small, bounded, in-process cache that evicts the least recently used key.
+
+    This sits in front of the Django cache for small immutable objects that
+    are read on almost every request, so that we don't pay for a cache
+    round trip and unpickling each time.  It is shared by every thread in
+    the process, so each operation holds a lock.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the value for `key`, or None if it is not cached."""
+        with self._lock:
+            try:
+                value = self._items.pop(key)
+            except KeyError:
+                return None
+            self._items[key] = value
+            return value
+
+    def set(self, key, value):
+        """Cache `value` for `key`, evicting the least recently used key if full."""
+        with self._lock:
+            self._items.pop(key, None)
+            self._items[key] = value
+            if len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        """Remove everything from the cache."""
+        with self._lock:
+            self._items.clear()
+
+
+class ImmutableCache(object):
+    """
+    A two-tier cache for one kind of immutable object.
+
+    Values are identified by a string, or a tuple of values that together
+    identify the object (e.g. an assessment's ID, submission UUID and
+    scored at time).  Keys in the Django cache are namespaced, versioned and
+    hashed, so they are always short and safe for memcached.
+
+    When a value is missing, one process takes a lock in the Django cache and
+    builds it, while the others wait briefly for it to appear instead of all
+    querying the database at once.
+
+    For each namespace, hits and misses in each tier and the time spent
+    reading the Django cache and building values are sent to DataDog.
+
+    Unless `copy_values` is False, every caller gets its own copy of a value,
+    so it is safe to change what you get back.  Values must be picklable.
+    """
+
+    # How long (in seconds) the lock for building a missing value is held
+    # before it expires, in case the process holding it dies.
+    LOCK_TIMEOUT = 10
+
+    # How long (in seconds) to wait between checks for a value that
+    # another process is building, and how many times to check before
+    # giving up and building it ourselves.
+    LOCK_WAIT_INTERVAL = 0.05
+    LOCK_WAIT_ATTEMPTS = 20
+
+    def __init__(self, namespace, version=1, local_size=1000, copy_values=True):
+        """
+        Args:
+            namespace (str): The kind of object cached, e.g. "submissions.submission".
+
+        Kwargs:
+            version (int): Increment this to ignore the values currently
+                in the Django cache when the form of the values changes.
+            local_size (int): The number of values to keep in this process.
+            copy_values (bool): If False, values cached in this process are
+                shared by every caller, so they must never be changed.
+
+        """
+        self.namespace = namespace
+        self.version = version
+        self.copy_values = copy_values
+        self._local = LocalLRUCache(local_size)
+        self._tags = [u"namespace:{}".format(namespace)]
+        _CACHES.append(self)
+
+    def key(self, identity):
+        """
+        Return the Django cache key for a value.
+
+        Args:
+            identity (str or tuple): Identifies the value.
+
+        Returns:
+            str
+
+        """
+        if not isinstance(identity, tuple):
+            identity = (identity,)
+        digest = sha1(u".".join(unicode(part) for part in identity).encode('utf-8')).hexdigest()
+        return "ora2.{namespace}.v{version}.{digest}".format(
+            namespace=self.namespace, version=self.version, digest=digest
+        )
+
+    def get(self, identity):
+        """
+        Return a cached value, or None if it isn't cached.
+
+        Args:
+            identity (str or tuple): Identifies the value.
+
+        Returns:
+            The cached value, or None.
+
+        """
+        key = self.key(identity)
+        value = self._get_local(key)
+        if value is not None:
+            return value
+
+        value = self._get_shared(key)
+        if value is not None:
+            self._set_local(key, value)
+        return value
+
+    def get_many(self, identities):
+        """
+        Return the cached values for several objects, using a single
+        round trip to the Django cache for the ones not cached in this process.
+
+        Args:
+            identities (list): Identifies the values.
+
+        Returns:
+            dict: Identities --> cached values.  Values that aren't
+                cached are left out.
+
+        """
+        values = dict()
+        missing_keys = dict()
+        for identity in identities:
+            key = self.key(identity)
+            value = self._get_local(key)
+            if value is not None:
+                values[identity] = value
+            else:
+                missing_keys[key] = identity
+
+        if missing_keys:
+            start = time.time()
+            try:
+                shared_values = cache.get_many(missing_keys.keys())
+            except Exception:
+                # The cache backend could raise an exception
+                # (for example, if memcached is unavailable)
+                logger.exception(u"Could not read {} from the cache".format(self.namespace))
+                shared_values = dict()
+            self._timing('openassessment.cache.latency', start)
+
+            num_hits = 0
+            for key, identity in missing_keys.iteritems():
+                value = shared_values.get(key)
+                if value is not None:
+                    self._set_local(key, value)
+                    values[identity] = value
+                    num_hits += 1
+            self._count('openassessment.cache.hit', num_hits, 'shared')
+            self._count('openassessment.cache.miss', len(missing_keys) - num_hits, 'shared')
+
+        return values
+
+    def set(self, identity, value):
+        """
+        Cache a value.
+
+        Args:
+            identity (str or tuple): Identifies the value.
+            value: The value to cache.  This must not be None.
+
+        Returns:
+            None
+
+        """
+        key = self.key(identity)
+        self._set_shared(key, value)
+        self._set_local(key, value)
+
+    def set_many(self, values):
+        """
+        Cache several values, using a single round trip to the Django cache.
+
+        Args:
+            values (dict): Identities --> values to cache.
+
+        Returns:
+            None
+
+        """
+        values_by_key = dict((self.key(identity), value) for identity, value in values.iteritems())
+        try:
+            cache.set_many(values_by_key)
+        except Exception:
+            logger.exception(u"Could not write {} to the cache".format(self.namespace))
+        for key, value in values_by_key.iteritems():
+            self._set_local(key, value)
+
+    def get_or_compute(self, identity, compute, should_cache=None):
+        """
+        Return a cached value, building and caching it if it's missing.
+
+        If another process is already building the value, wait a little
+        while for it to appear in the Django cache before building it here.
+
+        Args:
+            identity (str or tuple): Identifies the value.
+            compute (callable): Called with no arguments to build the value.
+                Any exceptions it raises are passed on and nothing is cached.
+
+        Kwargs:
+            should_cache (callable): Called with a value that was just built;
+                if it returns False, the value is returned without caching it.
+
+        Returns:
+            The cached or newly built value.
+
+        """
+        key = self.key(identity)
+        value = self._get_local(key)
+        if value is not None:
+            return value
+
+        value = self._get_shared(key)
+        if value is not None:
+            self._set_local(key, value)
+            return value
+
+        lock_key = key + ".lock"
+        locked = self._acquire_lock(lock_key)
+        if not locked:
+            for _ in range(self.LOCK_WAIT_ATTEMPTS):
+                time.sleep(self.LOCK_WAIT_INTERVAL)
+                value = self._get_shared(key, count=False)
+                if value is not None:
+                    self._count('openassessment.cache.lock_wait_hit', 1, 'shared')
+                    self._set_local(key, value)
+                    return value
+            self._count('openassessment.cache.lock_wait_timeout', 1, 'shared')
+
+        try:
+            start = time.time()
+            value = compute()
+            self._timing('openassessment.cache.compute_time', start)
+            if should_cache is None or should_cache(value):
+                self._set_shared(key, value)
+                self._set_local(key, value)
+            return value
+        finally:
+            if locked:
+                self._release_lock(lock_key)
+
+    def clear_local(self):
+        """
+        Forget the values cached in this process.
+
+        Returns:
+            None
+
+        """
+        self._local.clear()
+
+    def _get_local(self, key):
+        """Return a copy of a value cached in this process, or None."""
+        value = self._local.get(key)
+        if value is None:
+            return None
+        self._count('openassessment.cache.hit', 1, 'local')
+        if self.copy_values:
+            return pickle.loads(value)
+        return value
+
+    def _set_local(self, key, value):
+        """Cache a value in this process."""
+        if self.copy_values:
+            value = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        self._local.set(key, value)
+
+    def _get_shared(self, key, count=True):
+        """Return a value from the Django cache, or None."""
+        start = time.time()
+        try:
+            value = cache.get(key)
+        except Exception:
+            # The cache backend could raise an exception
+            # (for example, if memcached is unavailable)
+            logger.exception(u"Could not read {} from the cache".format(self.namespace))
+            value = None
+        self._timing('openassessment.cache.latency', start)
+        if count:
+            self._count(
+                'openassessment.cache.miss' if value is None else 'openassessment.cache.hit',
+                1, 'shared'
+            )
+        return value
+
+    def _set_shared(self, key, value):
+        """Store a value in the Django cache."""
+        try:
+            cache.set(key, value)
+        except Exception:
+            logger.exception(u"Could not write {} to the cache".format(self.namespace))
+
+    def _acquire_lock(self, lock_key):
+        """
+        Try to take the lock for building a value.
+
+        If the cache can't be reached, act as though we have the lock,
+        since there is nowhere to wait for the value to appear.
+        """
+        try:
+            return cache.add(lock_key, 1, self.LOCK_TIMEOUT)
+        except Exception:
+            logger.exception(u"Could not lock {} in the cache".format(self.namespace))
+            return True
+
+    def _release_lock(self, lock_key):
+        """Release the lock for building a value."""
+        try:
+            cache.delete(lock_key)
+        except Exception:
+            logger.exception(u"Could not unlock {} in the cache".format(self.namespace))
+
+    def _count(self, metric, value, tier):
+        """Send a count for this namespace and a cache tier to DataDog."""
+        if value:
+            dog_stats_api.increment(metric, value=value, tags=self._tags + [u"tier:{}".format(tier)])
+
+    def _timing(self, metric, start):
+        """Send the milliseconds since `start` for this namespace to DataDog."""
+        dog_stats_api.histogram(metric, (time.time() - start) * 1000, tags=self._tags)
+
+
+@contextmanager
+def request_cache_scope():
+    """
+    Memoize `request_cached` functions until the end of the block.
+
+    Scopes can be nested; the values are kept until the outermost one ends,
+    so a handler can call other handlers (or views) that open their own.
+
+    Example:
+        >>> with request_cache_scope():
+        ...     get_submission(uuid)  # Reads the submission
+        ...     get_submission(uuid)  # Returns a copy of the first result
+
+    """
+    depth = getattr(_request_state, 'depth', 0)
+    if depth == 0:
+        _request_state.values = dict()
+    _request_state.depth = depth + 1
+    try:
+        yield
+    finally:
+        _request_state.depth -= 1
+        if _request_state.depth == 0:
+            _request_state.values = None
+
+
+def with_request_cache(func):
+    """
+    Decorate a handler or view so that it runs in a `request_cache_scope`.
+    """
+    @wraps(func)
+    def _wrapped(*args, **kwargs):
+        with request_cache_scope():
+            return func(*args, **kwargs)
+    return _wrapped
+
+
+def clear_request_cache():
+    """
+    Forget the values memoized for the current request.
+
+    Returns:
+        None
+
+    """
+    values = getattr(_request_state, 'values', None)
+    if values is not None:
+        values.clear()
+
+
+def request_cached(key_func=None):
+    """
+    Memoize a read function for the rest of the current request.
+
+    Outside of a `request_cache_scope`, the function is always called.
+    Inside one, calls with the same arguments return a copy of the first
+    result, so it is safe to change what you get back.  Exceptions are
+    never memoized.
+
+    Kwargs:
+        key_func (callable): Called with the function's arguments to get
+            a key that identifies the result.  By default, the arguments
+            are serialized to JSON, which suits the API functions; methods
+            need a `key_func` since `self` is not serializable.
+
+    Returns:
+        decorator
+
+    Example:
+        >>> @request_cached()
+        ... def get_submission(submission_uuid):
+        ...     ...
+
+    """
+    def _decorator(func):
+        name = u"{}.{}".format(func.__module__, func.__name__)
+
+        @wraps(func)
+        def _wrapped(*args, **kwargs):
+            values = getattr(_request_state, 'values', None)
+            if values is None:
+                return func(*args, **kwargs)
+
+            if key_func is None:
+                key = (name, json.dumps([args, kwargs], sort_keys=True, default=repr))
+            else:
+                key = (name, key_func(*args, **kwargs))
+
+            if key in values:
+                return copy.deepcopy(values[key])
+
+            value = func(*args, **kwargs)
+            values[key] = copy.deepcopy(value)
+            return value
+        return _wrapped
+    return _decorator
+
+
+def clears_request_cache(func):
+    """
+    Decorate a function that writes something, so that values memoized
+    for the current request are not returned after it changes them.
+    """
+    @wraps(func)
+    def _wrapped(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            clear_request_cache()
+    return _wrapped
+
+
+class RequestCacheMiddleware(object):
+    """
+    Run each Django request in its own `request_cache_scope`.
+
+    A scope is started fresh for every request, so values from a request
+    whose response was never processed can't leak into the next request
+    handled by the same thread.
+    """
+
+    def process_request(self, request):
+        _request_state.values = dict()
+        _request_state.depth = 1
+
+    def process_response(self, request, response):
+        _request_state.values = None
+        _request_state.depth = 0
+        return response
+
+    def process_exception(self, request, exception):
+        _request_state.values = None
+        _request_state.depth = 0
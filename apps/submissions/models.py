@@ -258,3 +258,55 @@ class ScoreSummary(models.Model):
                 u"Error while updating score summary for student item {}"
                 .format(score.student_item)
             )
+
+    @classmethod
+    def update_for_scores(cls, scores):
+        """
+        Update the score summaries for many new scores at once.
+
+        `Score.objects.bulk_create()` does not send the `post_save` signal,
+        so scores created in bulk are summarized here instead, in the same
+        way as `update_score_summary()`.  Scores for the same student item
+        are applied in order, as if each had been saved in turn.
+
+        Args:
+            scores (list of Score): Saved scores, with their student items loaded.
+
+        Returns:
+            None
+
+        """
+        summaries = dict(
+            (summary.student_item_id, summary)
+            for summary in cls.objects.filter(
+                student_item__in=set(score.student_item_id for score in scores)
+            ).select_related('highest')
+        )
+
+        latest_by_item = dict()
+        highest_by_item = dict(
+            (student_item_id, summary.highest)
+            for student_item_id, summary in summaries.iteritems()
+        )
+        for score in scores:
+            highest = highest_by_item.get(score.student_item_id)
+            if highest is None or score.reset or score.to_float() > highest.to_float():
+                highest_by_item[score.student_item_id] = score
+            latest_by_item[score.student_item_id] = score
+
+        for student_item_id, summary in summaries.iteritems():
+            cls.objects.filter(pk=summary.pk).update(
+                latest=latest_by_item[student_item_id],
+                highest=highest_by_item[student_item_id],
+            )
+
+        # Student items without a summary get one
+        cls.objects.bulk_create([
+            cls(
+                student_item_id=student_item_id,
+                highest=highest_by_item[student_item_id],
+                latest=score,
+            )
+            for student_item_id, score in latest_by_item.iteritems()
+            if student_item_id not in summaries
+        ])
@@ -10,6 +10,7 @@ from mock import patch
 import pytz
 
 from submissions import api as api
+from submissions.caching import clear_local_caches
 from submissions.models import ScoreSummary, Submission, StudentItem
 from submissions.serializers import StudentItemSerializer
 
@@ -43,6 +44,7 @@ class TestSubmissionsApi(TestCase):
         Clear the cache.
         """
         cache.clear()
+        clear_local_caches()
 
     def test_create_submission(self):
         submission = api.create_submission(STUDENT_ITEM, ANSWER_ONE)
@@ -282,6 +284,82 @@ class TestSubmissionsApi(TestCase):
                 }
             )
 
+    def test_get_latest_scores_for_submissions(self):
+        tim_sub = api.create_submission(STUDENT_ITEM, ANSWER_ONE)
+        alice_sub = api.create_submission(SECOND_STUDENT_ITEM, ANSWER_ONE)
+        hidden_sub = api.create_submission(STUDENT_ITEM, ANSWER_TWO)
+        unscored_sub = api.create_submission(SECOND_STUDENT_ITEM, ANSWER_TWO)
+
+        api.set_score(tim_sub["uuid"], 11, 12)
+        api.set_score(tim_sub["uuid"], 4, 12)
+        api.set_score(alice_sub["uuid"], 3, 12)
+        api.set_score(hidden_sub["uuid"], 0, 0)
+
+        uuids = [sub["uuid"] for sub in [tim_sub, alice_sub, hidden_sub, unscored_sub]]
+        with self.assertNumQueries(2):
+            scores = api.get_latest_scores_for_submissions(uuids)
+        self.assertEqual(set(scores.keys()), {tim_sub["uuid"], alice_sub["uuid"]})
+        for uuid, score in scores.iteritems():
+            self.assertEqual(score, api.get_latest_score_for_submission(uuid))
+        self._assert_score(scores[tim_sub["uuid"]], 4, 12)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(api.get_latest_scores_for_submissions([]), {})
+
+    def test_set_scores(self):
+        tim_sub = api.create_submission(STUDENT_ITEM, ANSWER_ONE)
+        alice_sub = api.create_submission(SECOND_STUDENT_ITEM, ANSWER_ONE)
+
+        # Alice already has a higher score, which stays her highest
+        api.set_score(alice_sub["uuid"], 10, 12)
+
+        with self.assertNumQueries(6):
+            api.set_scores([
+                {"submission_uuid": tim_sub["uuid"], "points_earned": 11, "points_possible": 12},
+                {"submission_uuid": alice_sub["uuid"], "points_earned": 3, "points_possible": 12},
+            ])
+
+        self._assert_score(api.get_latest_score_for_submission(tim_sub["uuid"]), 11, 12)
+        self._assert_score(api.get_latest_score_for_submission(alice_sub["uuid"]), 3, 12)
+        self._assert_score(api.get_score(STUDENT_ITEM), 11, 12)
+        self._assert_score(api.get_score(SECOND_STUDENT_ITEM), 3, 12)
+        summary = ScoreSummary.objects.get(student_item__student_id=SECOND_STUDENT_ITEM["student_id"])
+        self.assertEqual((summary.highest.points_earned, summary.highest.points_possible), (10, 12))
+
+    def test_set_scores_same_student_item(self):
+        first_sub = api.create_submission(STUDENT_ITEM, ANSWER_ONE)
+        second_sub = api.create_submission(STUDENT_ITEM, ANSWER_TWO)
+
+        # The scores are summarized in order, as if set one at a time
+        api.set_scores([
+            {"submission_uuid": first_sub["uuid"], "points_earned": 11, "points_possible": 12},
+            {"submission_uuid": second_sub["uuid"], "points_earned": 3, "points_possible": 12},
+        ])
+        summary = ScoreSummary.objects.get(student_item__student_id=STUDENT_ITEM["student_id"])
+        self.assertEqual((summary.latest.points_earned, summary.latest.points_possible), (3, 12))
+        self.assertEqual((summary.highest.points_earned, summary.highest.points_possible), (11, 12))
+
+    def test_set_scores_no_scores(self):
+        with self.assertNumQueries(0):
+            api.set_scores([])
+
+    @raises(api.SubmissionNotFoundError)
+    def test_set_scores_missing_submission(self):
+        submission = api.create_submission(STUDENT_ITEM, ANSWER_ONE)
+        api.set_scores([
+            {"submission_uuid": submission["uuid"], "points_earned": 11, "points_possible": 12},
+            {"submission_uuid": u"no such uuid", "points_earned": 11, "points_possible": 12},
+        ])
+
+    @patch.object(ScoreSummary, 'update_for_scores')
+    @raises(api.SubmissionInternalError)
+    def test_error_on_set_scores(self, mock_update):
+        mock_update.side_effect = DatabaseError("Bad things happened")
+        submission = api.create_submission(STUDENT_ITEM, ANSWER_ONE)
+        api.set_scores([
+            {"submission_uuid": submission["uuid"], "points_earned": 11, "points_possible": 12},
+        ])
+
     @patch.object(ScoreSummary.objects, 'filter')
     @raises(api.SubmissionInternalError)
     def test_error_on_get_scores(self, mock_filter):
@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for caching immutable objects.
+"""
+import threading
+
+from django.core.cache import cache
+from django.test import TestCase
+from mock import patch, Mock
+
+from submissions.caching import (
+    ImmutableCache, LocalLRUCache, RequestCacheMiddleware, clear_local_caches,
+    clears_request_cache, request_cache_scope, request_cached, with_request_cache,
+)
+
+
+class TestImmutableCache(TestCase):
+    """
+    Test the two-tier cache.
+    """
+
+    def setUp(self):
+        cache.clear()
+        clear_local_caches()
+        self.cache = ImmutableCache("test.namespace")
+
+    def tearDown(self):
+        cache.clear()
+        clear_local_caches()
+
+    def test_get_and_set(self):
+        self.assertIs(self.cache.get("abc"), None)
+        self.cache.set("abc", {"answer": 42})
+        self.assertEqual(self.cache.get("abc"), {"answer": 42})
+
+        # The value is also in the Django cache
+        self.cache.clear_local()
+        self.assertEqual(self.cache.get("abc"), {"answer": 42})
+
+    def test_local_tier(self):
+        self.cache.set("abc", {"answer": 42})
+        cache.clear()
+        self.assertEqual(self.cache.get("abc"), {"answer": 42})
+
+    def test_values_are_copied(self):
+        self.cache.set("abc", {"answer": 42})
+        value = self.cache.get("abc")
+        value["answer"] = 0
+        self.assertEqual(self.cache.get("abc"), {"answer": 42})
+
+    def test_values_are_shared(self):
+        shared_cache = ImmutableCache("test.shared", copy_values=False)
+        value = {"answer": 42}
+        shared_cache.set("abc", value)
+        self.assertIs(shared_cache.get("abc"), value)
+
+    def test_keys(self):
+        key = self.cache.key(("abc", 1))
+        self.assertTrue(key.startswith("ora2.test.namespace.v1."))
+        self.assertNotEqual(key, self.cache.key(("abc", 2)))
+        self.assertNotEqual(key, ImmutableCache("test.namespace", version=2).key(("abc", 1)))
+
+        # Keys are hashed, so they stay short and contain no spaces
+        long_key = self.cache.key(u"☃ " * 1000)
+        self.assertLess(len(long_key), 250)
+        self.assertNotIn(" ", long_key)
+
+    def test_get_many_and_set_many(self):
+        self.cache.set_many({"a": 1, ("b", 2): 2})
+        self.cache.clear_local()
+        self.cache.set("c", 3)
+        self.assertEqual(
+            self.cache.get_many(["a", ("b", 2), "c", "d"]),
+            {"a": 1, ("b", 2): 2, "c": 3}
+        )
+
+    def test_get_or_compute(self):
+        compute = Mock(return_value={"answer": 42})
+        self.assertEqual(self.cache.get_or_compute("abc", compute), {"answer": 42})
+        self.assertEqual(self.cache.get_or_compute("abc", compute), {"answer": 42})
+        self.cache.clear_local()
+        self.assertEqual(self.cache.get_or_compute("abc", compute), {"answer": 42})
+        self.assertEqual(compute.call_count, 1)
+
+        # The lock is released once the value is cached
+        self.assertIs(cache.get(self.cache.key("abc") + ".lock"), None)
+
+    def test_get_or_compute_should_cache(self):
+        compute = Mock(return_value=[])
+        self.cache.get_or_compute("abc", compute, should_cache=bool)
+        self.cache.get_or_compute("abc", compute, should_cache=bool)
+        self.assertEqual(compute.call_count, 2)
+
+    def test_get_or_compute_error(self):
+        compute = Mock(side_effect=ValueError)
+        with self.assertRaises(ValueError):
+            self.cache.get_or_compute("abc", compute)
+
+        # Nothing is cached, and the lock is released
+        self.assertIs(self.cache.get("abc"), None)
+        self.assertIs(cache.get(self.cache.key("abc") + ".lock"), None)
+
+    @patch('submissions.caching.time.sleep')
+    def test_wait_for_locked_value(self, mock_sleep):
+        # Another process is building the value, and caches it while we wait
+        key = self.cache.key("abc")
+        cache.add(key + ".lock", 1)
+        mock_sleep.side_effect = lambda _: cache.set(key, "other process")
+
+        compute = Mock(return_value="this process")
+        self.assertEqual(self.cache.get_or_compute("abc", compute), "other process")
+        self.assertFalse(compute.called)
+
+        # We don't release a lock that we don't hold
+        self.assertEqual(cache.get(key + ".lock"), 1)
+
+    @patch('submissions.caching.time.sleep')
+    def test_lock_wait_timeout(self, mock_sleep):
+        cache.add(self.cache.key("abc") + ".lock", 1)
+        compute = Mock(return_value="this process")
+        self.assertEqual(self.cache.get_or_compute("abc", compute), "this process")
+        self.assertEqual(mock_sleep.call_count, ImmutableCache.LOCK_WAIT_ATTEMPTS)
+
+    @patch('submissions.caching.cache')
+    def test_cache_errors(self, mock_cache):
+        mock_cache.get.side_effect = Exception("Cache is down")
+        mock_cache.set.side_effect = Exception("Cache is down")
+        mock_cache.add.side_effect = Exception("Cache is down")
+        mock_cache.delete.side_effect = Exception("Cache is down")
+        self.assertEqual(self.cache.get_or_compute("abc", lambda: 42), 42)
+
+        # The value is still cached in this process
+        self.assertEqual(self.cache.get("abc"), 42)
+
+    @patch('submissions.caching.dog_stats_api')
+    def test_metrics(self, mock_stats):
+        self.cache.get_or_compute("abc", lambda: 42)
+        mock_stats.increment.assert_called_once_with(
+            'openassessment.cache.miss', value=1, tags=[u"namespace:test.namespace", u"tier:shared"]
+        )
+        metrics = [call[0][0] for call in mock_stats.histogram.call_args_list]
+        self.assertIn('openassessment.cache.latency', metrics)
+        self.assertIn('openassessment.cache.compute_time', metrics)
+
+        mock_stats.reset_mock()
+        self.cache.get("abc")
+        mock_stats.increment.assert_called_once_with(
+            'openassessment.cache.hit', value=1, tags=[u"namespace:test.namespace", u"tier:local"]
+        )
+
+    def test_lru_cache(self):
+        lru_cache = LocalLRUCache(2)
+        lru_cache.set("a", 1)
+        lru_cache.set("b", 2)
+
+        # Reading "a" makes "b" the least recently used
+        self.assertEqual(lru_cache.get("a"), 1)
+        lru_cache.set("c", 3)
+        self.assertIs(lru_cache.get("b"), None)
+        self.assertEqual(lru_cache.get("a"), 1)
+        self.assertEqual(lru_cache.get("c"), 3)
+
+        lru_cache.clear()
+        self.assertIs(lru_cache.get("a"), None)
+
+    def test_lru_cache_shared_by_threads(self):
+        lru_cache = LocalLRUCache(5)
+        errors = []
+
+        def use_cache(thread_num):
+            try:
+                for num in range(1000):
+                    key = (thread_num * num) % 7
+                    lru_cache.set(key, num)
+                    lru_cache.get(key + 1)
+            except Exception as ex:
+                errors.append(ex)
+
+        threads = [threading.Thread(target=use_cache, args=(num,)) for num in range(1, 5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertLessEqual(len(lru_cache._items), lru_cache.max_size)
+
+
+class TestRequestCache(TestCase):
+    """
+    Test memoizing reads for the rest of a request.
+    """
+
+    def setUp(self):
+        self.calls = []
+
+        def lookup(value):
+            self.calls.append(value)
+            return {"value": value}
+
+        self.lookup = lookup
+        self.cached_lookup = request_cached()(lookup)
+
+    def test_memoized_in_scope(self):
+        with request_cache_scope():
+            self.assertEqual(self.cached_lookup(1), {"value": 1})
+            self.assertEqual(self.cached_lookup(1), {"value": 1})
+            self.assertEqual(self.cached_lookup(value=1), {"value": 1})
+            self.cached_lookup(2)
+        self.assertEqual(len(self.calls), 3)
+
+    def test_not_memoized_outside_scope(self):
+        with request_cache_scope():
+            self.cached_lookup(1)
+        self.cached_lookup(1)
+        self.cached_lookup(1)
+        self.assertEqual(len(self.calls), 3)
+
+    def test_values_are_copied(self):
+        with request_cache_scope():
+            self.cached_lookup(1)["value"] = 0
+            self.assertEqual(self.cached_lookup(1), {"value": 1})
+
+    def test_none_is_memoized(self):
+        @request_cached()
+        def lookup():
+            self.calls.append(None)
+
+        with request_cache_scope():
+            lookup()
+            lookup()
+        self.assertEqual(len(self.calls), 1)
+
+    def test_errors_are_not_memoized(self):
+        @request_cached()
+        def lookup():
+            self.calls.append(None)
+            if len(self.calls) == 1:
+                raise ValueError
+            return "found"
+
+        with request_cache_scope():
+            with self.assertRaises(ValueError):
+                lookup()
+            self.assertEqual(lookup(), "found")
+
+    def test_key_func(self):
+        cached_lookup = request_cached(key_func=lambda value: value % 2)(self.lookup)
+        with request_cache_scope():
+            self.assertEqual(cached_lookup(1), {"value": 1})
+            self.assertEqual(cached_lookup(3), {"value": 1})
+
+    def test_nested_scopes(self):
+        with request_cache_scope():
+            with request_cache_scope():
+                self.cached_lookup(1)
+            self.cached_lookup(1)
+        self.assertEqual(len(self.calls), 1)
+
+    def test_writes_clear_cache(self):
+        @clears_request_cache
+        def write():
+            pass
+
+        with request_cache_scope():
+            self.cached_lookup(1)
+            write()
+            self.cached_lookup(1)
+        self.assertEqual(len(self.calls), 2)
+
+    def test_with_request_cache(self):
+        @with_request_cache
+        def handler():
+            self.cached_lookup(1)
+            return self.cached_lookup(1)
+
+        self.assertEqual(handler(), {"value": 1})
+        self.assertEqual(handler(), {"value": 1})
+        self.assertEqual(len(self.calls), 2)
+
+    def test_threads_are_isolated(self):
+        def lookup_in_thread():
+            self.cached_lookup(1)
+
+        with request_cache_scope():
+            self.cached_lookup(1)
+            thread = threading.Thread(target=lookup_in_thread)
+            thread.start()
+            thread.join()
+        self.assertEqual(len(self.calls), 2)
+
+    def test_middleware(self):
+        middleware = RequestCacheMiddleware()
+        middleware.process_request(Mock())
+        self.cached_lookup(1)
+        self.cached_lookup(1)
+        middleware.process_response(Mock(), Mock())
+        self.cached_lookup(1)
+        self.assertEqual(len(self.calls), 2)
@@ -9,6 +9,7 @@ import ddt
 from django.core.cache import cache
 from django.db import DatabaseError
 from submissions import api as sub_api
+from submissions.caching import clear_local_caches
 from submissions.models import Score
 
 
@@ -30,6 +31,7 @@ class TestResetScore(TestCase):
         Clear the cache.
         """
         cache.clear()
+        clear_local_caches()
 
     def test_reset_with_no_scores(self):
         sub_api.reset_score(
@@ -0,0 +1,6 @@
+"""
+Offline benchmarks for the submissions, peer, self and workflow APIs.
+
+These run against a throwaway database created using the configured
+Django settings, so they do not need an LMS.  See `run.py`.
+"""
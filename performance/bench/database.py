@@ -0,0 +1,22 @@
+"""
+Create the throwaway database that the benchmarks run against.
+"""
+from django.conf import settings
+from django.db import connection
+from south.management.commands import patch_for_test_db_setup
+
+
+def create_bench_db():
+    """
+    Create a test database for the benchmarks.
+
+    The tables are built from the models, along with the indexes in each
+    app's custom SQL, rather than by running the South migrations: South
+    rebuilds a SQLite table to alter it, which drops the table's indexes.
+
+    Returns:
+        The name of the original database, to pass to `destroy_test_db`.
+    """
+    settings.SOUTH_TESTS_MIGRATE = False
+    patch_for_test_db_setup()
+    return connection.creation.create_test_db(verbosity=0)
@@ -0,0 +1,213 @@
+"""
+Benchmark the Python APIs used by an open assessment problem.
+
+For each item, this seeds a number of students who submit, assess their
+peers and themselves, and then load their grade.  It reports the latency
+percentiles and the number of queries for each operation, and compares
+them to the baseline in `baseline.json`.
+
+Runs against a throwaway test database (SQLite by default, or the
+database of whichever settings module is configured):
+
+    cd ora2
+    DJANGO_SETTINGS_MODULE=settings.test python performance/bench/run.py
+
+Exits with status 1 if a regression from the baseline is found.  To
+record a new baseline:
+
+    python performance/bench/run.py --save-baseline
+"""
+
+import argparse
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings.test')
+
+from django.db import connection
+
+from openassessment.assessment import peer_api, self_api
+from openassessment.workflow import api as workflow_api
+from submissions import api as sub_api
+from submissions.caching import with_request_cache
+
+from performance.bench import stats
+from performance.bench.database import create_bench_db
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+COURSE_ID = u"bench/api/1"
+
+RUBRIC = {
+    "criteria": [
+        {
+            "name": u"clarity",
+            "prompt": u"How clear is the response?",
+            "options": [
+                {"name": u"unclear", "points": 0, "explanation": u""},
+                {"name": u"clear", "points": 2, "explanation": u""},
+                {"name": u"very clear", "points": 4, "explanation": u""},
+            ]
+        },
+        {
+            "name": u"accuracy",
+            "prompt": u"How accurate is the response?",
+            "options": [
+                {"name": u"inaccurate", "points": 0, "explanation": u""},
+                {"name": u"accurate", "points": 3, "explanation": u""},
+            ]
+        },
+    ]
+}
+
+OPTIONS_SELECTED = {u"clarity": u"clear", u"accuracy": u"accurate"}
+
+REQUIREMENTS = {
+    "peer": {
+        "must_grade": 2,
+        "must_be_graded_by": 2,
+    }
+}
+
+
+@with_request_cache
+def load_grade_complete(workflow):
+    """
+    Load the data shown to a student whose submission has been graded.
+    This makes the same API calls as `GradeMixin.render_grade_complete`,
+    in a request cache scope like the `render_grade` handler.
+    """
+    submission_uuid = workflow['submission_uuid']
+    peer_api.get_assessment_feedback(submission_uuid)
+    student_submission = sub_api.get_submission(submission_uuid)
+    peer_api.get_assessments(student_submission['uuid'])
+    self_api.get_assessment(student_submission['uuid'])
+    peer_api.get_assessment_feedback(submission_uuid)
+    peer_api.get_rubric_max_scores(submission_uuid)
+    peer_api.get_assessment_median_scores(student_submission['uuid'])
+
+
+def run_item(item_id, num_students, operations):
+    """
+    Have `num_students` students complete an item, recording each
+    benchmarked call in `operations`.
+    """
+    requirements = REQUIREMENTS["peer"]
+    students = []
+    for num in range(num_students):
+        student_item = {
+            'student_id': u"student_{}".format(num),
+            'course_id': COURSE_ID,
+            'item_id': item_id,
+            'item_type': u"openassessment",
+        }
+        submission = operations['create_submission'].call(
+            sub_api.create_submission, student_item, u"Answer from student {}".format(num)
+        )
+        workflow_api.create_workflow(submission['uuid'])
+        students.append((student_item['student_id'], submission['uuid']))
+
+    for student_id, submission_uuid in students:
+        for _ in range(requirements["must_grade"]):
+            peer_submission = operations['get_submission_to_assess'].call(
+                peer_api.get_submission_to_assess,
+                submission_uuid, requirements["must_be_graded_by"], True
+            )
+            if peer_submission is None:
+                break
+            operations['create_assessment'].call(
+                peer_api.create_assessment,
+                submission_uuid, student_id, OPTIONS_SELECTED, {},
+                u"Peer feedback", RUBRIC, requirements["must_be_graded_by"]
+            )
+        self_api.create_assessment(submission_uuid, student_id, OPTIONS_SELECTED, RUBRIC)
+
+    for student_id, submission_uuid in students:
+        workflow = operations['update_from_assessments'].call(
+            workflow_api.update_from_assessments, submission_uuid, REQUIREMENTS
+        )
+        if workflow['status'] == 'done':
+            operations['render_grade_complete'].call(load_grade_complete, workflow)
+
+
+def run(num_items, num_students):
+    """
+    Benchmark each item in turn.
+
+    Returns:
+        dict: Mapping of operation names to summaries.
+    """
+    names = [
+        'create_submission', 'get_submission_to_assess', 'create_assessment',
+        'update_from_assessments', 'render_grade_complete',
+    ]
+    operations = dict((name, stats.OperationStats(name)) for name in names)
+    for num in range(num_items):
+        run_item(u"item_{}".format(num), num_students, operations)
+    return dict(
+        (name, operation.summary())
+        for name, operation in operations.iteritems()
+        if operation.timings
+    )
+
+
+def main():
+    """
+    Run the benchmarks and compare them to the baseline.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the open assessment APIs.")
+    parser.add_argument('--items', type=int, default=2, help="Number of items to seed")
+    parser.add_argument('--students', type=int, default=100, help="Number of students per item")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument(
+        '--tolerance', type=float, default=stats.DEFAULT_LATENCY_TOLERANCE,
+        help="How many times its baseline a latency can be before it is flagged"
+    )
+    parser.add_argument('--save-baseline', action='store_true', help="Write the results as the new baseline")
+    options = parser.parse_args()
+
+    old_name = create_bench_db()
+    connection.use_debug_cursor = True
+    try:
+        results = run(options.items, options.students)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    print stats.format_report(results)
+
+    baseline = {
+        "items": options.items,
+        "students": options.students,
+        "operations": results,
+    }
+    if options.save_baseline:
+        stats.save_baseline(options.baseline, baseline)
+        print u"\nSaved baseline to {}".format(options.baseline)
+        return 0
+
+    if not os.path.exists(options.baseline):
+        print u"\nNo baseline found at {}".format(options.baseline)
+        return 0
+
+    expected = stats.load_baseline(options.baseline)
+    if (expected["items"], expected["students"]) != (options.items, options.students):
+        print u"\nThe baseline was recorded with {} items of {} students; not comparing.".format(
+            expected["items"], expected["students"]
+        )
+        return 0
+
+    regressions = stats.find_regressions(results, expected["operations"], options.tolerance)
+    if regressions:
+        print u"\nRegressions from the baseline:"
+        for regression in regressions:
+            print u"  " + regression
+        return 1
+
+    print u"\nNo regressions from the baseline."
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""
+Collect timings and query counts for benchmarked operations, and compare
+them against a stored baseline.
+"""
+import json
+import time
+
+from django.db import connection
+
+
+# A latency percentile is flagged when it is this many times its baseline.
+# Timings vary a lot between machines, so this only catches large changes.
+DEFAULT_LATENCY_TOLERANCE = 1.5
+
+# The number of queries per call is flagged when it grows by more than this,
+# which allows for the few calls that take a different code path.
+QUERY_TOLERANCE = 0.5
+
+PERCENTILES = [50, 95, 99]
+
+
+def percentile(values, pct):
+    """
+    Return the `pct` percentile of a list of values.
+    """
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(len(ordered) * pct / 100.0))
+    return ordered[index]
+
+
+class OperationStats(object):
+    """
+    Timings and query counts for each call to one operation.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.timings = []
+        self.query_counts = []
+
+    def call(self, func, *args, **kwargs):
+        """
+        Call `func`, recording how long it took and how many queries it made.
+
+        Returns:
+            The return value of `func`.
+        """
+        num_queries = len(connection.queries)
+        start = time.time()
+        result = func(*args, **kwargs)
+        self.timings.append((time.time() - start) * 1000)
+        self.query_counts.append(len(connection.queries) - num_queries)
+        return result
+
+    def summary(self):
+        """
+        Summarize the calls to the operation.
+
+        Returns:
+            dict with keys "calls", "p50", "p95", "p99" (milliseconds)
+            and "queries" (mean queries per call).
+        """
+        summary = {
+            "calls": len(self.timings),
+            "queries": round(sum(self.query_counts) / float(len(self.query_counts)), 2),
+        }
+        for pct in PERCENTILES:
+            summary["p{}".format(pct)] = round(percentile(self.timings, pct), 3)
+        return summary
+
+
+def format_report(results):
+    """
+    Format a table of results.
+
+    Args:
+        results (dict): Mapping of operation names to summaries.
+
+    Returns:
+        unicode
+    """
+    lines = [u"{:<28} {:>6} {:>10} {:>10} {:>10} {:>8}".format(
+        "operation", "calls", "p50 (ms)", "p95 (ms)", "p99 (ms)", "queries"
+    )]
+    for name, summary in sorted(results.items()):
+        lines.append(u"{:<28} {calls:>6} {p50:>10.2f} {p95:>10.2f} {p99:>10.2f} {queries:>8.2f}".format(
+            name, **summary
+        ))
+    return u"\n".join(lines)
+
+
+def find_regressions(results, baseline, latency_tolerance=DEFAULT_LATENCY_TOLERANCE):
+    """
+    Compare results against a baseline.
+
+    Args:
+        results (dict): Mapping of operation names to summaries.
+        baseline (dict): Mapping of operation names to summaries.
+
+    Kwargs:
+        latency_tolerance (float): How many times its baseline a latency
+            percentile can be before it is flagged.
+
+    Returns:
+        list of unicode descriptions of the regressions found.
+    """
+    regressions = []
+    for name, summary in sorted(results.items()):
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+
+        for pct in PERCENTILES:
+            key = "p{}".format(pct)
+            if summary[key] > expected[key] * latency_tolerance:
+                regressions.append(u"{}: {} latency {:.2f}ms (baseline {:.2f}ms)".format(
+                    name, key, summary[key], expected[key]
+                ))
+
+        if summary["queries"] > expected["queries"] + QUERY_TOLERANCE:
+            regressions.append(u"{}: {:.2f} queries per call (baseline {:.2f})".format(
+                name, summary["queries"], expected["queries"]
+            ))
+    return regressions
+
+
+def load_baseline(path):
+    """
+    Load a baseline written by `save_baseline`.
+
+    Returns:
+        dict
+    """
+    with open(path) as baseline_file:
+        return json.load(baseline_file)
+
+
+def save_baseline(path, baseline):
+    """
+    Write a baseline to a JSON file.
+    """
+    with open(path, 'w') as baseline_file:
+        json.dump(baseline, baseline_file, indent=4, sort_keys=True, separators=(',', ': '))
+        baseline_file.write("\n")
@@ -0,0 +1,93 @@
+"""
+Benchmark choosing a submission for over grading as the number of
+peer workflows for an item grows.
+
+Runs against a throwaway test database (SQLite by default):
+
+    cd ora2
+    DJANGO_SETTINGS_MODULE=settings.test python performance/over_grading.py
+
+The latency of `_get_submission_for_over_grading` should stay flat
+from one thousand to one hundred thousand workflows.
+"""
+
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings.test')
+
+from django.db import connection, transaction
+
+from openassessment.assessment import peer_api
+from openassessment.assessment.models import PeerWorkflow, PeerWorkflowItem
+from performance.bench.database import create_bench_db
+from performance.bench.stats import OperationStats
+
+
+COURSE_ID = u"bench/over_grading/1"
+WORKFLOW_COUNTS = [1000, 10000, 100000]
+NUM_CALLS = 200
+BATCH_SIZE = 1000
+
+# Number of submissions the scorer has already been handed,
+# which over grading must skip.
+NUM_ALREADY_SCORED = 20
+
+
+def seed_workflows(item_id, num_workflows):
+    """
+    Create `num_workflows` peer workflows for an item, with review counts
+    spread over a few values, and return the workflow of a scorer who has
+    already been handed some of the submissions.
+    """
+    for start in range(0, num_workflows, BATCH_SIZE):
+        PeerWorkflow.objects.bulk_create([
+            PeerWorkflow(
+                student_id=u"student_{}".format(num),
+                item_id=item_id,
+                course_id=COURSE_ID,
+                submission_uuid=u"{}_{}".format(item_id, num),
+                review_count=num % 4,
+            )
+            for num in range(start, min(start + BATCH_SIZE, num_workflows))
+        ])
+        transaction.commit_unless_managed()
+
+    workflows = PeerWorkflow.objects.filter(course_id=COURSE_ID, item_id=item_id)
+    scorer = workflows.order_by('-id')[0]
+    PeerWorkflowItem.objects.bulk_create([
+        PeerWorkflowItem(
+            scorer=scorer,
+            author=author,
+            submission_uuid=author.submission_uuid,
+        )
+        for author in workflows.exclude(id=scorer.id).filter(review_count=0)[:NUM_ALREADY_SCORED]
+    ])
+    transaction.commit_unless_managed()
+    return scorer
+
+
+def run():
+    """
+    Seed each item and time over grading against it.
+    """
+    print u"{:>10} {:>10} {:>10} {:>10}".format("workflows", "p50 (ms)", "p95 (ms)", "queries")
+    for num_workflows in WORKFLOW_COUNTS:
+        scorer = seed_workflows(u"item_{}".format(num_workflows), num_workflows)
+
+        stats = OperationStats("over_grading")
+        for _ in range(NUM_CALLS):
+            stats.call(peer_api._get_submission_for_over_grading, scorer)
+        summary = stats.summary()
+
+        print u"{:>10} {p50:>10.2f} {p95:>10.2f} {queries:>10.2f}".format(num_workflows, **summary)
+
+
+if __name__ == "__main__":
+    old_name = create_bench_db()
+    try:
+        run()
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)